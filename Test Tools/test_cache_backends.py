@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Check the cache backend selection in utils/cache.py without a Redis server:
+the Redis config mapping, a working (fake) Redis backend, and the fallback
+to the per-process 'simple' cache when Redis is unavailable.
+"""
+
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from flask_caching.backends import SimpleCache
+
+import utils.cache as cache_module
+from utils.config import clear_config_cache
+
+
+class FakeRedisCache(SimpleCache):
+    """In-memory stand-in for RedisCache, loaded through CACHE_TYPE"""
+
+
+class DownRedisCache(FakeRedisCache):
+    """Redis client whose server can't be reached"""
+
+    def set(self, key, value, timeout=None):
+        raise ConnectionError('Error 111 connecting to localhost:6379. Connection refused.')
+
+
+def init_with(backend, cache_type=None, **env):
+    """Run init_cache on a fresh app with CACHE_* env vars, optionally swapping the Redis class"""
+    for key in ('CACHE_BACKEND', 'CACHE_DIR', 'CACHE_REDIS_URL'):
+        os.environ.pop(key, None)
+    os.environ['CACHE_BACKEND'] = backend
+    os.environ.update(env)
+    clear_config_cache()
+
+    original = cache_module._backend_config
+
+    def patched(name, settings):
+        config = original(name, settings)
+        if cache_type and config['CACHE_TYPE'] == 'RedisCache':
+            config['CACHE_TYPE'] = cache_type
+        return config
+
+    cache_module._backend_config = patched
+    try:
+        cache_module.init_cache(Flask(__name__))
+    finally:
+        cache_module._backend_config = original
+    return cache_module.cache_backend
+
+
+def check(name, ok, detail=''):
+    print(f"{'✅' if ok else '❌'} {name}{f' ({detail})' if detail else ''}")
+    return ok
+
+
+def main():
+    results = []
+
+    config = cache_module._backend_config('redis', {'redis_url': 'redis://cache.local:6380/2'})
+    results.append(check(
+        'Redis config mapping',
+        config['CACHE_TYPE'] == 'RedisCache'
+        and config['CACHE_REDIS_URL'] == 'redis://cache.local:6380/2'
+        and config['CACHE_KEY_PREFIX'] == f'{cache_module.CACHE_NAMESPACE}-v{cache_module.CACHE_VERSION}:',
+        str(config)
+    ))
+
+    backend = init_with('redis', f'{__name__}.FakeRedisCache')
+    results.append(check('Reachable Redis is used', backend == 'redis', backend))
+
+    backend = init_with('redis', f'{__name__}.DownRedisCache')
+    results.append(check('Unreachable Redis falls back to simple', backend == 'simple', backend))
+
+    # Real RedisCache: falls back whether the redis package is missing or nothing listens on port 1
+    backend = init_with('redis', CACHE_REDIS_URL='redis://127.0.0.1:1/0')
+    results.append(check('Real Redis client without a server falls back to simple', backend == 'simple', backend))
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        backend = init_with('sqlite', CACHE_DIR=cache_dir)
+        results.append(check('SQLite backend starts', backend == 'sqlite', backend))
+
+    print(f"\n{sum(results)}/{len(results)} checks passed")
+    return all(results)
+
+
+if __name__ == '__main__':
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Check that the pooled sessions in utils/http_session.py don't carry cookies
+between calls: a Set-Cookie from one response must not be sent on the next
+request to the same host. Runs against a throwaway local HTTP server.
+"""
+
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.http_session import SessionPool
+
+
+class CookieHandler(BaseHTTPRequestHandler):
+    """/login sets a cookie, /echo returns the Cookie header it received"""
+
+    def do_GET(self):
+        body = (self.headers.get('Cookie') or '').encode()
+        self.send_response(200)
+        if self.path == '/login':
+            self.send_header('Set-Cookie', 'session=secret; Path=/')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def check(name, ok, detail=''):
+    print(f"{'✅' if ok else '❌'} {name}{f' ({detail})' if detail else ''}")
+    return ok
+
+
+def main():
+    results = []
+    server = ThreadingHTTPServer(('127.0.0.1', 0), CookieHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f'http://127.0.0.1:{server.server_address[1]}'
+    pool = SessionPool()
+
+    try:
+        first = pool.get(f'{base_url}/login', timeout=5)
+        results.append(check('Upstream sets a cookie', 'session=secret' in first.headers.get('Set-Cookie', '')))
+
+        session = pool.session_for(base_url)
+        results.append(check('Cookie is not stored in the shared session', len(session.cookies) == 0,
+                             f'{len(session.cookies)} stored'))
+
+        second = pool.get(f'{base_url}/echo', timeout=5)
+        results.append(check('Cookie is not sent on the next call', second.text == '', second.text or 'no Cookie header'))
+
+        third = pool.get(f'{base_url}/echo', cookies={'explicit': '1'}, timeout=5)
+        results.append(check('Per-request cookies are still sent', third.text == 'explicit=1', third.text))
+    finally:
+        pool.close()
+        server.shutdown()
+
+    print(f"\n{sum(results)}/{len(results)} checks passed")
+    return all(results)
+
+
+if __name__ == '__main__':
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Check the streaming Met Éireann parser in utils/met_forecast.py against the
+original DOM parser from blueprints/weather.py, on a small locationforecast
+fixture: same point fields, and the same symbol (first covering interval in
+the document) and precipitation (last covering interval) for each point,
+where an interval covers a point when from <= time < to.
+"""
+
+import io
+import os
+import sys
+import xml.etree.ElementTree as ET
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.met_forecast import parse_forecast
+
+
+def point(time, temperature, wind=4.0, cloud=50.0):
+    return f'''
+  <time datatype="forecast" from="{time}" to="{time}">
+   <location altitude="9" latitude="53.2631" longitude="-6.1083">
+    <temperature id="TTT" unit="celsius" value="{temperature}"/>
+    <windDirection id="dd" deg="225.0" name="SW"/>
+    <windSpeed id="ff" mps="{wind}" beaufort="3" name="Lett bris"/>
+    <humidity value="78.0" unit="percent"/>
+    <pressure id="pr" unit="hPa" value="1015.0"/>
+    <cloudiness id="NN" percent="{cloud}"/>
+   </location>
+  </time>'''
+
+
+def interval(start, end, symbol=None, precipitation=None):
+    parts = []
+    if precipitation is not None:
+        parts.append(f'<precipitation unit="mm" value="{precipitation}"/>')
+    if symbol is not None:
+        parts.append(f'<symbol id="{symbol}" number="3"/>')
+    return f'''
+  <time datatype="forecast" from="{start}" to="{end}">
+   <location altitude="9" latitude="53.2631" longitude="-6.1083">
+    {''.join(parts)}
+   </location>
+  </time>'''
+
+
+H = '2024-06-21T{:02d}:00:00Z'.format
+
+FIXTURE = f'''<?xml version="1.0" encoding="UTF-8"?>
+<weatherdata>
+ <meta>
+  <model name="harmonie" termin="{H(6)}" runended="{H(8)}" nextrun="{H(11)}" from="{H(9)}" to="{H(14)}"/>
+ </meta>
+ <product class="pointData">
+  {point(H(9), 14.1)}
+  {interval(H(8), H(9), 'Sun', 0.0)}
+  {point(H(10), 15.2, wind=5.5, cloud=60.0)}
+  {interval(H(9), H(10), 'Light_Cloud', 0.1)}
+  {interval(H(10), H(13), 'Cloud', 2.4)}
+  {interval(H(10), H(11), 'Rain', 0.6)}
+  {point(H(11), 15.8)}
+  {interval(H(11), H(12), None, 0.3)}
+  {interval(H(11), H(12), 'Drizzle', None)}
+  {point(H(12), 16.0)}
+  {interval(H(12), H(13), 'Light_Rain')}
+  {point(H(13), 16.4)}
+  {point(H(14), 16.9, cloud=90.0)}
+  {interval(H(14), H(15), None, 1.2)}
+  {interval(H(14), H(15), 'Fog', None)}
+ </product>
+</weatherdata>
+'''.encode()
+
+
+def baseline_parse(content):
+    """The pre-streaming parser from blueprints/weather.py (get_weather), without the request handling"""
+    root = ET.fromstring(content)
+    current_weather = {}
+    hourly_forecast = []
+
+    for time_elem in root.findall('.//time'):
+        from_time = time_elem.get('from')
+        to_time = time_elem.get('to')
+        if not from_time or from_time != to_time:
+            continue
+        location = time_elem.find('.//location')
+        if location is None:
+            continue
+
+        temp_elem = location.find('.//temperature')
+        wind_speed_elem = location.find('.//windSpeed')
+        wind_dir_elem = location.find('.//windDirection')
+        humidity_elem = location.find('.//humidity')
+        pressure_elem = location.find('.//pressure')
+        cloud_elem = location.find('.//cloudiness')
+
+        symbol_elem = None
+        precip_value = 0
+        for interval_time in root.findall('.//time'):
+            interval_from = interval_time.get('from')
+            interval_to = interval_time.get('to')
+            if interval_from and interval_to and interval_from != interval_to:
+                if interval_from == from_time or (interval_from < from_time < interval_to):
+                    interval_loc = interval_time.find('.//location')
+                    if interval_loc is not None:
+                        if symbol_elem is None:
+                            symbol_elem = interval_loc.find('.//symbol')
+                        precip_elem = interval_loc.find('.//precipitation')
+                        if precip_elem is not None:
+                            precip_value = float(precip_elem.get('value', 0))
+
+        weather_data = {
+            'time': from_time,
+            'temperature': float(temp_elem.get('value')) if temp_elem is not None else 0,
+            'windSpeed': float(wind_speed_elem.get('mps', 0)) * 3.6 if wind_speed_elem is not None else 0,
+            'windDirection': float(wind_dir_elem.get('deg', 0)) if wind_dir_elem is not None else 0,
+            'humidity': float(humidity_elem.get('value', 0)) if humidity_elem is not None else 0,
+            'pressure': float(pressure_elem.get('value', 0)) if pressure_elem is not None else 0,
+            'cloudCover': float(cloud_elem.get('percent', 0)) if cloud_elem is not None else 0,
+            'precipitation': precip_value,
+            'symbol': symbol_elem.get('id', 'Cloud') if symbol_elem is not None else 'Cloud',
+            'visibility': 10000
+        }
+
+        if not current_weather:
+            current_weather = weather_data.copy()
+            current_weather['description'] = (
+                symbol_elem.get('id', 'Cloud').replace('_', ' ') if symbol_elem is not None else 'Cloudy'
+            )
+        if len(hourly_forecast) < 168:
+            hourly_forecast.append(weather_data)
+
+    return current_weather, hourly_forecast
+
+
+def check(name, ok, detail=''):
+    print(f"{'✅' if ok else '❌'} {name}{f' ({detail})' if detail else ''}")
+    return ok
+
+
+def main():
+    results = []
+    expected_current, expected_hourly = baseline_parse(FIXTURE)
+    forecast = parse_forecast(io.BytesIO(FIXTURE))
+    hourly = forecast.hourly()
+    by_time = {entry['time']: entry for entry in hourly}
+
+    results.append(check(
+        'Same points in document order',
+        [entry['time'] for entry in hourly] == [entry['time'] for entry in expected_hourly],
+        f'{len(hourly)} points'
+    ))
+    results.append(check('Hourly entries match the DOM parser', hourly == expected_hourly))
+    results.append(check('Current conditions match the DOM parser', forecast.current() == expected_current,
+                         forecast.current().get('description', '')))
+
+    symbols = [(entry['symbol'], entry['precipitation']) for entry in hourly]
+    results.append(check(
+        'Symbol from the first covering interval, precipitation from the last',
+        by_time[H(10)]['symbol'] == 'Cloud' and by_time[H(10)]['precipitation'] == 0.6,
+        str(symbols)
+    ))
+    results.append(check(
+        'Intervals with only a symbol or only precipitation combine',
+        by_time[H(11)]['symbol'] == 'Cloud' and by_time[H(11)]['precipitation'] == 0.3
+        and by_time[H(12)]['symbol'] == 'Cloud' and by_time[H(12)]['precipitation'] == 2.4
+        and by_time[H(14)]['symbol'] == 'Fog' and by_time[H(14)]['precipitation'] == 1.2
+    ))
+    results.append(check(
+        'An interval covers a point when from <= time < to',
+        by_time[H(9)]['symbol'] == 'Light_Cloud' and by_time[H(9)]['precipitation'] == 0.1
+        and by_time[H(13)]['symbol'] == 'Cloud' and by_time[H(13)]['precipitation'] == 0
+    ))
+    results.append(check(
+        'Model nextrun is read',
+        forecast.next_run == datetime(2024, 6, 21, 11, tzinfo=timezone.utc).timestamp()
+    ))
+
+    print(f"\n{sum(results)}/{len(results)} checks passed")
+    return all(results)
+
+
+if __name__ == '__main__':
+    sys.exit(0 if main() else 1)
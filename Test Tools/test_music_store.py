@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""
+Check utils/music_store.py against the JSON-file logic it replaced: a fixed
+pseudo-random sequence of searches, listens, skips, backs and current
+lookups is applied to both and every response compared. The SQLite
+snapshot is flushed and reloaded along the way, and a legacy
+music_recommendations.json is migrated into a fresh store.
+"""
+
+import copy
+import json
+import os
+import random
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.music_store import MIGRATED_SUFFIX, MusicStore, NoPreviousRecommendation
+
+SEED = 2024
+OPERATIONS = 300
+RELOAD_EVERY = 50
+
+SEARCHES = ['Radiohead', 'Björk', 'Massive Attack', 'Portishead']
+NAMES = [f'Artist {i}' for i in range(30)]
+
+# State fields compared between the two implementations
+STATE_FIELDS = ('search_artist', 'all_recommendations', 'pending', 'listened', 'history', 'current_index')
+
+
+class JsonReference:
+    """The music_recommendations.json logic from the original blueprints/music_next.py"""
+
+    def __init__(self):
+        self.config = {'artists': {}, 'current_search': None}
+
+    @staticmethod
+    def _response(artist, data, current):
+        return {
+            'search_artist': artist,
+            'current_recommendation': current,
+            'total_count': len(data['all_recommendations']),
+            'listened_count': len(data['listened']),
+            'current_index': data.get('current_index', 0)
+        }
+
+    def search(self, artist, similar_artists):
+        artist_key = artist.lower()
+        artists = self.config['artists']
+        if artist_key in artists:
+            existing = set(artists[artist_key].get('all_recommendations', []))
+            new_artists = [a for a in similar_artists if a not in existing]
+            if new_artists:
+                artists[artist_key]['all_recommendations'].extend(new_artists)
+                artists[artist_key]['pending'].extend(new_artists)
+        else:
+            artists[artist_key] = {
+                'search_artist': artist,
+                'all_recommendations': similar_artists.copy(),
+                'pending': similar_artists.copy(),
+                'listened': [],
+                'history': [similar_artists[0]] if similar_artists else [],
+                'current_index': 0
+            }
+        self.config['current_search'] = artist_key
+        data = artists[artist_key]
+        return self._response(artist, data, data['pending'][0] if data['pending'] else None)
+
+    def _advance(self, data):
+        if data['current_index'] < len(data['history']) - 1:
+            data['current_index'] += 1
+            return data['history'][data['current_index']]
+        next_rec = data['pending'][0] if data['pending'] else None
+        if next_rec:
+            data['history'].append(next_rec)
+            data['current_index'] += 1
+        return next_rec
+
+    def listened(self, artist, recommended):
+        data = self.config['artists'].get(artist.lower())
+        if data is None:
+            return None
+        if recommended in data['pending']:
+            data['pending'].remove(recommended)
+            if recommended not in data['listened']:
+                data['listened'].append(recommended)
+        return self._response(artist, data, self._advance(data))
+
+    def skip(self, artist, recommended):
+        data = self.config['artists'].get(artist.lower())
+        if data is None:
+            return None
+        if recommended in data['pending']:
+            data['pending'].remove(recommended)
+            data['pending'].append(recommended)
+        return self._response(artist, data, self._advance(data))
+
+    def back(self, artist):
+        data = self.config['artists'].get(artist.lower())
+        if data is None:
+            return None
+        if data['current_index'] <= 0:
+            return 'no previous'
+        data['current_index'] -= 1
+        return self._response(artist, data, data['history'][data['current_index']])
+
+    def current(self):
+        current_search = self.config.get('current_search')
+        if not current_search or current_search not in self.config['artists']:
+            return {}
+        data = self.config['artists'][current_search]
+        current_rec = data['pending'][0] if data['pending'] else None
+        if not data['history'] and current_rec:
+            data['history'] = [current_rec]
+            data['current_index'] = 0
+        elif data['history'] and data['current_index'] < len(data['history']):
+            current_rec = data['history'][data['current_index']]
+        return self._response(data['search_artist'], data, current_rec)
+
+    def history(self):
+        return [data['search_artist'] for data in self.config['artists'].values()]
+
+
+def store_back(store, artist):
+    try:
+        return store.back(artist)
+    except NoPreviousRecommendation:
+        return 'no previous'
+
+
+def store_state(store):
+    """Search states in the music_recommendations.json shape, plus current_search"""
+    with store._lock:
+        artists = {key: data.to_dict() for key, data in store._state().items()}
+        current_search = store._current_search
+    return {
+        'artists': {key: {field: data[field] for field in STATE_FIELDS} for key, data in artists.items()},
+        'current_search': current_search
+    }
+
+
+def reference_state(reference):
+    return {
+        'artists': {
+            key: {field: data[field] for field in STATE_FIELDS}
+            for key, data in reference.config['artists'].items()
+        },
+        'current_search': reference.config['current_search']
+    }
+
+
+def random_operation(rng, reference):
+    """Pick an operation and its arguments, mostly on searches that exist"""
+    searched = [data['search_artist'] for data in reference.config['artists'].values()]
+    kind = rng.choice(['search', 'listened', 'listened', 'skip', 'skip', 'back', 'current'])
+    if kind == 'search' or not searched:
+        return 'search', (rng.choice(SEARCHES), rng.sample(NAMES, rng.randint(1, 8)))
+    if kind == 'current':
+        return 'current', ()
+
+    artist = rng.choice(searched + ['Unknown Artist'])
+    if kind == 'back':
+        return 'back', (artist,)
+    data = reference.config['artists'].get(artist.lower())
+    candidates = (data['pending'][:3] + data['history'][-2:]) if data else []
+    return kind, (artist, rng.choice(candidates or NAMES))
+
+
+def check(name, ok, detail=''):
+    print(f"{'✅' if ok else '❌'} {name}{f' ({detail})' if detail else ''}")
+    return ok
+
+
+def main():
+    results = []
+    rng = random.Random(SEED)
+
+    with tempfile.TemporaryDirectory() as directory:
+        db_path = os.path.join(directory, 'music.sqlite3')
+        store = MusicStore(db_path, legacy_json=None)
+        reference = JsonReference()
+
+        mismatches = []
+        reload_mismatches = []
+        for step in range(1, OPERATIONS + 1):
+            kind, args = random_operation(rng, reference)
+            expected = getattr(reference, kind)(*copy.deepcopy(args))
+            if kind == 'back':
+                actual = store_back(store, *args)
+            elif kind == 'listened':
+                actual = store.mark_listened(*args)
+            else:
+                actual = getattr(store, kind)(*args)
+            if actual != expected:
+                mismatches.append((step, kind, args, expected, actual))
+
+            if step % RELOAD_EVERY == 0:
+                store.flush()
+                store = MusicStore(db_path, legacy_json=None)
+                if store_state(store) != reference_state(reference):
+                    reload_mismatches.append(step)
+
+        results.append(check(
+            f'{OPERATIONS} operations match the JSON implementation',
+            not mismatches,
+            f'first mismatch: {mismatches[0]}' if mismatches else f'{len(reference.config["artists"])} searches'
+        ))
+        results.append(check(
+            'Flushed state reloads unchanged',
+            not reload_mismatches,
+            f'differs after steps {reload_mismatches}' if reload_mismatches
+            else f'{OPERATIONS // RELOAD_EVERY} reloads'
+        ))
+        results.append(check(
+            'Search history keeps search order',
+            store.search_history() == reference.history(),
+            str(store.search_history())
+        ))
+
+        # Legacy JSON file -> fresh SQLite store
+        legacy_path = os.path.join(directory, 'music_recommendations.json')
+        with open(legacy_path, 'w') as f:
+            json.dump(reference.config, f, indent=2)
+
+        migrated = MusicStore(os.path.join(directory, 'migrated.sqlite3'), legacy_json=legacy_path)
+        results.append(check(
+            'Legacy JSON is imported',
+            store_state(migrated) == reference_state(reference)
+            and migrated.current() == reference.current()
+            and migrated.search_history() == reference.history()
+        ))
+        results.append(check(
+            'Legacy JSON is renamed to .json.migrated',
+            not os.path.exists(legacy_path) and os.path.exists(legacy_path + MIGRATED_SUFFIX)
+        ))
+
+        # A later legacy file must not be imported over existing searches
+        with open(legacy_path, 'w') as f:
+            json.dump({'artists': {}, 'current_search': None}, f)
+        reopened = MusicStore(os.path.join(directory, 'migrated.sqlite3'), legacy_json=legacy_path)
+        results.append(check(
+            'Migration only runs into an empty store',
+            store_state(reopened) == reference_state(reference) and os.path.exists(legacy_path)
+        ))
+
+    print(f"\n{sum(results)}/{len(results)} checks passed")
+    return all(results)
+
+
+if __name__ == '__main__':
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Check the local sunrise/sunset calculator in utils/solar.py against known
+NOAA Solar Calculator values, the polar day/night cases and the per-year
+table used by the sun chart.
+"""
+
+import os
+import sys
+from datetime import date, datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.solar import day_length, sun_times, sun_times_for_year
+
+# Reference times from the NOAA Solar Calculator (UTC)
+DUBLIN = (53.3498, -6.2603)
+SYDNEY = (-33.8688, 151.2093)
+LONGYEARBYEN = (78.2232, 15.6267)
+TOLERANCE_SECONDS = 120
+
+
+def check(name, ok, detail=''):
+    print(f"{'✅' if ok else '❌'} {name}{f' ({detail})' if detail else ''}")
+    return ok
+
+
+def near(actual, expected):
+    return actual is not None and abs((actual - expected).total_seconds()) <= TOLERANCE_SECONDS
+
+
+def utc(*args):
+    return datetime(*args, tzinfo=timezone.utc)
+
+
+def main():
+    results = []
+
+    times = sun_times(*DUBLIN, date(2024, 6, 21))
+    results.append(check(
+        'Dublin midsummer sunrise/sunset',
+        near(times['sunrise'], utc(2024, 6, 21, 3, 56)) and near(times['sunset'], utc(2024, 6, 21, 20, 57)),
+        f"{times['sunrise']:%H:%M} / {times['sunset']:%H:%M} UTC"
+    ))
+    results.append(check(
+        'Dublin midsummer civil twilight',
+        near(times['civil_twilight_begin'], utc(2024, 6, 21, 3, 4))
+        and near(times['civil_twilight_end'], utc(2024, 6, 21, 21, 50)),
+        f"{times['civil_twilight_begin']:%H:%M} / {times['civil_twilight_end']:%H:%M} UTC"
+    ))
+
+    times = sun_times(*DUBLIN, date(2024, 12, 21))
+    results.append(check(
+        'Dublin midwinter sunrise/sunset',
+        near(times['sunrise'], utc(2024, 12, 21, 8, 39)) and near(times['sunset'], utc(2024, 12, 21, 16, 8)),
+        f"{times['sunrise']:%H:%M} / {times['sunset']:%H:%M} UTC"
+    ))
+
+    # Sydney's winter sunrise is on the previous UTC day
+    times = sun_times(*SYDNEY, date(2024, 6, 21))
+    results.append(check(
+        'Sydney sunrise before UTC midnight',
+        near(times['sunrise'], utc(2024, 6, 20, 21, 0)) and near(times['sunset'], utc(2024, 6, 21, 6, 54)),
+        f"{times['sunrise']:%d %H:%M} / {times['sunset']:%d %H:%M} UTC"
+    ))
+
+    polar_day = sun_times(*LONGYEARBYEN, date(2024, 6, 21))
+    polar_night = sun_times(*LONGYEARBYEN, date(2024, 12, 21))
+    results.append(check(
+        'Polar day and polar night have no events',
+        all(value is None for value in polar_day.values())
+        and all(value is None for value in polar_night.values())
+        and day_length(polar_night) == 0
+    ))
+
+    sun_times_for_year.cache_clear()
+    leap = sun_times_for_year(*DUBLIN, 2024)
+    common = sun_times_for_year(*DUBLIN, 2023)
+    results.append(check(
+        'Year table has a row per day',
+        all(len(column) == 366 for column in leap.values())
+        and all(len(column) == 365 for column in common.values())
+        and leap['dates'][0] == '2024-01-01' and leap['dates'][-1] == '2024-12-31',
+        f"{len(leap['dates'])} / {len(common['dates'])} days"
+    ))
+
+    index = leap['dates'].index('2024-06-21')
+    results.append(check(
+        'Year table matches sun_times',
+        leap['sunrise'][index] == '03:56' and leap['sunset'][index] == '20:57'
+        and leap['day_length'][index] == day_length(sun_times(*DUBLIN, date(2024, 6, 21))),
+        f"{leap['sunrise'][index]} / {leap['sunset'][index]}"
+    ))
+
+    again = sun_times_for_year(*DUBLIN, 2024)
+    info = sun_times_for_year.cache_info()
+    results.append(check('Year table is cached', again is leap and info.hits == 1, str(info)))
+
+    print(f"\n{sum(results)}/{len(results)} checks passed")
+    return all(results)
+
+
+if __name__ == '__main__':
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Check the price series helpers in utils/timeseries.py: as-of lookups
+(forward-fill and tolerance), the as-of join used by the multi-series
+endpoints, and the merge/trim steps of the incremental chart refresh.
+"""
+
+import os
+import sys
+from math import isnan
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.timeseries import DAY, PriceSeries, asof_join
+
+WEEK = 7 * DAY
+
+
+def check(name, ok, detail=''):
+    print(f"{'✅' if ok else '❌'} {name}{f' ({detail})' if detail else ''}")
+    return ok
+
+
+def show(values):
+    return [None if isnan(value) else value for value in values]
+
+
+def main():
+    results = []
+
+    series = PriceSeries('FX', [100, 200, 500], [1.0, 2.0, 5.0])
+
+    filled = show(series.asof([50, 100, 150, 300, 499, 500, 900]))
+    results.append(check(
+        'asof forward-fills across gaps, NaN before the first bar',
+        filled == [None, 1.0, 1.0, 2.0, 2.0, 5.0, 5.0],
+        str(filled)
+    ))
+
+    filled = show(series.asof([150, 300, 301, 600, 601], tolerance=100))
+    results.append(check(
+        'asof tolerance cut-off (a bar exactly tolerance old still counts)',
+        filled == [1.0, 2.0, None, 5.0, None],
+        str(filled)
+    ))
+
+    # Stock bars on weekdays, FX starting a day later with a gap
+    stock = PriceSeries('AMZN', [1 * DAY, 2 * DAY, 3 * DAY, 4 * DAY, 8 * DAY], [10.0, 11.0, 12.0, 13.0, 14.0])
+    fx = PriceSeries('EURUSD=X', [2 * DAY, 3 * DAY], [1.1, 1.2])
+
+    timestamps, (closes, rates) = asof_join(stock, fx)
+    results.append(check(
+        'asof_join drops base bars before the other series starts',
+        list(timestamps) == [2 * DAY, 3 * DAY, 4 * DAY, 8 * DAY]
+        and list(closes) == [11.0, 12.0, 13.0, 14.0]
+        and list(rates) == [1.1, 1.2, 1.2, 1.2],
+        f'{list(timestamps)} {list(rates)}'
+    ))
+
+    timestamps, (closes, rates) = asof_join(stock, fx, tolerance=2 * DAY)
+    results.append(check(
+        'asof_join drops base bars whose fill is older than tolerance',
+        list(timestamps) == [2 * DAY, 3 * DAY, 4 * DAY] and list(rates) == [1.1, 1.2, 1.2],
+        f'{list(timestamps)} {list(rates)}'
+    ))
+
+    timestamps, columns = asof_join(stock)
+    results.append(check(
+        'asof_join with no other series returns the base',
+        list(timestamps) == list(stock.timestamps) and [list(c) for c in columns] == [list(stock.closes)]
+    ))
+
+    # Incremental refresh: the cached last bar is partial (week in progress)
+    cached = PriceSeries('AMZN', [0, WEEK, 2 * WEEK], [100.0, 101.0, 102.5])
+    newer = PriceSeries('AMZN', [2 * WEEK, 3 * WEEK], [103.0, 104.0])
+    merged = cached.merge(newer)
+    results.append(check(
+        'merge replaces the partial last bar and appends new ones',
+        list(merged.timestamps) == [0, WEEK, 2 * WEEK, 3 * WEEK]
+        and list(merged.closes) == [100.0, 101.0, 103.0, 104.0],
+        f'{list(merged.closes)}'
+    ))
+
+    # Fetched from one step before the newest bar: overlaps two bars
+    overlap = PriceSeries('AMZN', [WEEK, 2 * WEEK, 3 * WEEK], [101.5, 103.0, 104.0])
+    merged = cached.merge(overlap)
+    results.append(check(
+        'merge replaces every overlapping bar',
+        list(merged.timestamps) == [0, WEEK, 2 * WEEK, 3 * WEEK]
+        and list(merged.closes) == [100.0, 101.5, 103.0, 104.0],
+        f'{list(merged.closes)}'
+    ))
+
+    results.append(check(
+        'merge leaves the cached series unchanged',
+        list(cached.closes) == [100.0, 101.0, 102.5]
+    ))
+
+    trimmed = merged.trim(WEEK)
+    results.append(check(
+        'trim drops bars before start',
+        list(trimmed.timestamps) == [WEEK, 2 * WEEK, 3 * WEEK] and len(merged.trim(10 * WEEK)) == 0,
+        f'{list(trimmed.timestamps)}'
+    ))
+
+    parsed = PriceSeries.from_yahoo({'chart': {'result': [{
+        'meta': {'symbol': 'ORCL'},
+        'timestamp': [1, 2, 3, 4],
+        'indicators': {'quote': [{'close': [1.0, None, 3.0, None]}]}
+    }]}})
+    results.append(check(
+        'from_yahoo masks out null bars',
+        parsed is not None and parsed.symbol == 'ORCL'
+        and list(parsed.timestamps) == [1, 3] and list(parsed.closes) == [1.0, 3.0]
+    ))
+
+    print(f"\n{sum(results)}/{len(results)} checks passed")
+    return all(results)
+
+
+if __name__ == '__main__':
+    sys.exit(0 if main() else 1)
@@ -7,7 +7,7 @@ import importlib.util
 import atexit
 
 # Flask imports
-from flask import Flask, render_template, jsonify, request
+from flask import Flask, Response, render_template, jsonify, request
 
 # Load environment variables from .env file
 try:
@@ -23,18 +23,29 @@ app = Flask(__name__)
 # ============================================================================
 
 # Import logging system
-from utils.logging_setup import setup_logging, log_storage, log_storage_lock
+from utils.logging_setup import log_queue_handler, setup_logging, shutdown_logging
 setup_logging(app)
 
 # Import utilities
 from utils import load_config, get_config_value, handle_api_errors, require_config_key
 from utils.cache import init_cache
 from utils.circuit_breaker import circuit_registry
+from utils.api_client import api_client
+from utils.prefetch import prefetch_scheduler
+from utils.log_archive import log_archive
+from utils.metrics import PROMETHEUS_CONTENT_TYPE, get_summary, init_metrics, metrics
+from utils.artist_images import artist_images
+from utils.artist_thumbs import artist_thumbs
+from utils.music_graph import music_graph
+from utils.music_store import music_store
 from datetime import datetime
 
 # Initialize cache
 init_cache(app)
 
+# Time every request
+init_metrics(app)
+
 # ============================================================================
 # BLUEPRINTS
 # ============================================================================
@@ -137,9 +148,28 @@ def health_check():
     return jsonify({
         'status': 'healthy' if all_healthy else 'degraded',
         'timestamp': datetime.utcnow().isoformat() + 'Z',
-        'services': services
+        'services': services,
+        'coalescing': api_client.inflight.get_stats(),
+        'series_cache': api_client.series.get_status(),
+        'prefetch': prefetch_scheduler.get_status(),
+        'log_archive': log_archive.get_status(),
+        'log_queue': log_queue_handler.get_status(),
+        'music_store': music_store.get_status(),
+        'music_graph': music_graph.get_status(),
+        'artist_images': artist_images.get_status(),
+        'artist_thumbs': artist_thumbs.get_status()
     }), 200 if all_healthy else 503
 
+@app.route('/metrics')
+def prometheus_metrics():
+    """Request, upstream and cache metrics in the Prometheus text format"""
+    return Response(metrics.render(), content_type=PROMETHEUS_CONTENT_TYPE)
+
+@app.route('/api/metrics')
+def metrics_summary():
+    """Slowest routes, upstream hosts and cache hit rates for the logs page"""
+    return jsonify(get_summary())
+
 @app.route('/api/readme')
 def get_readme():
     """Get README content for help modal"""
@@ -228,14 +258,36 @@ def graceful_shutdown(signum=None, frame=None):
 
     app.logger.info(f"Shutdown signal received (signal: {signum}). Cleaning up...")
 
-    # Clear caches
+    # Clear in-process caches (persistent backends are kept for the next start)
     try:
-        from utils.cache import cache
-        cache.clear()
-        app.logger.info("Cache cleared")
+        from utils.cache import cache, is_persistent_cache
+        if not is_persistent_cache():
+            cache.clear()
+            app.logger.info("Cache cleared")
     except Exception as e:
         app.logger.warning(f"Failed to clear cache: {e}")
 
+    # Stop background prefetching
+    try:
+        prefetch_scheduler.stop()
+        app.logger.info("Prefetch scheduler stopped")
+    except Exception as e:
+        app.logger.warning(f"Failed to stop prefetch scheduler: {e}")
+
+    # Write any unsaved Music Next changes
+    try:
+        music_store.flush()
+        app.logger.info("Music Next state saved")
+    except Exception as e:
+        app.logger.warning(f"Failed to save Music Next state: {e}")
+
+    # Close pooled upstream connections
+    try:
+        api_client.sessions.close()
+        app.logger.info("HTTP sessions closed")
+    except Exception as e:
+        app.logger.warning(f"Failed to close HTTP sessions: {e}")
+
     # Reset circuit breakers
     try:
         for name, breaker in circuit_registry._breakers.items():
@@ -245,6 +297,13 @@ def graceful_shutdown(signum=None, frame=None):
         app.logger.warning(f"Failed to reset circuit breakers: {e}")
 
     app.logger.info("Skye shutdown complete")
+
+    # Flush queued log records and seal the log archive last, so the
+    # messages above are kept
+    try:
+        shutdown_logging()
+    except Exception:
+        pass
     sys.exit(0)
 
 # Register shutdown handlers
@@ -256,4 +315,10 @@ atexit.register(graceful_shutdown)
 app.logger.info("Skye application started")
 
 if __name__ == '__main__':
+    # Keep hot dashboard series warm. Only the server process does this:
+    # importing app starts nothing, and the reloader's file-watcher process
+    # never serves requests. SKYE_PREFETCH=0 disables prefetching.
+    if os.environ.get('SKYE_PREFETCH', '1') != '0' and os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        prefetch_scheduler.start(app)
+
     app.run(debug=True, port=5001, use_reloader=True, reloader_type='stat')
\ No newline at end of file
@@ -7,6 +7,7 @@ This module provides endpoints for:
 - Gold prices
 - Portfolio calculations
 - Sell recommendations
+- Batched current quotes
 """
 from .blueprint import dashboard_bp
 
@@ -17,5 +18,6 @@ from . import crypto
 from . import gold
 from . import portfolio
 from . import recommendations
+from . import quotes
 
 __all__ = ['dashboard_bp']
@@ -1,49 +1,33 @@
 """Cryptocurrency data endpoints (XRP)"""
 from __future__ import annotations
 from flask import jsonify, request, Response
-import requests
 
-from utils.api_client import api_client, PERIOD_MAP, YAHOO_FINANCE_URL, USER_AGENT
-from utils.cache import cache, CACHE_TIMEOUT_PRICE, CACHE_TIMEOUT_CHART
+from utils.api_client import (
+    api_client, PERIOD_MAP, YAHOO_FINANCE_URL, USER_AGENT, CIRCUIT_YAHOO
+)
+from utils.cache import (
+    cached_swr, CACHE_TIMEOUT_PRICE, CACHE_TIMEOUT_CHART, CACHE_MAX_AGE_CHART, CACHE_MAX_AGE_PRICE
+)
 
 from .blueprint import dashboard_bp
 
 
 @dashboard_bp.route('/api/xrp-data')
-@cache.cached(timeout=CACHE_TIMEOUT_CHART, query_string=True)
+@cached_swr(CACHE_TIMEOUT_CHART, CACHE_MAX_AGE_CHART, query_string=True, circuit_name=CIRCUIT_YAHOO)
 def get_xrp_data() -> Response | tuple[Response, int]:
     """Get XRP price data in EUR using Yahoo Finance"""
     try:
         period = request.args.get('period', '1y')
         range_param, interval_param = PERIOD_MAP.get(period, ('1y', '1wk'))
 
-        url = f'{YAHOO_FINANCE_URL}/XRP-EUR?range={range_param}&interval={interval_param}'
-        headers = {'User-Agent': USER_AGENT}
-
-        response = requests.get(url, headers=headers, timeout=10)
-
-        if response.status_code == 200:
-            data = response.json()
-            if 'chart' in data and data['chart']['result']:
-                result = data['chart']['result'][0]
-                if 'timestamp' in result and 'indicators' in result:
-                    timestamps = result['timestamp']
-                    closes = result['indicators']['quote'][0]['close']
-
-                    dates: list[str] = []
-                    prices: list[float] = []
-
-                    for ts, close in zip(timestamps, closes):
-                        if close is not None:
-                            dates.append(api_client.format_date(ts, period))
-                            prices.append(round(close, 4))
+        series = api_client.get_price_series('XRP-EUR', range_param, interval_param)
 
-                    if dates and prices:
-                        return jsonify({
-                            'dates': dates,
-                            'prices': prices,
-                            'symbol': 'XRP-EUR'
-                        })
+        if series:
+            return jsonify({
+                'dates': series.labels(period),
+                'prices': series.values(4),
+                'symbol': 'XRP-EUR'
+            })
 
         return jsonify({'error': 'XRP chart data unavailable'}), 503
 
@@ -52,14 +36,14 @@ def get_xrp_data() -> Response | tuple[Response, int]:
 
 
 @dashboard_bp.route('/api/xrp-price')
-@cache.cached(timeout=CACHE_TIMEOUT_PRICE)
+@cached_swr(CACHE_TIMEOUT_PRICE, CACHE_MAX_AGE_PRICE, circuit_name=CIRCUIT_YAHOO)
 def get_xrp_price() -> Response | tuple[Response, int]:
     """Get current XRP price in EUR using Yahoo Finance"""
     try:
         url = f'{YAHOO_FINANCE_URL}/XRP-EUR'
         headers = {'User-Agent': USER_AGENT}
 
-        response = requests.get(url, headers=headers, timeout=10)
+        response = api_client.get(url, headers=headers, timeout=10)
 
         if response.status_code == 200:
             data = response.json()
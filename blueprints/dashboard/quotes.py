@@ -0,0 +1,54 @@
+"""Batched current-price endpoint for the dashboard price strip"""
+from __future__ import annotations
+from flask import jsonify, request, current_app, Response
+
+from utils.api_client import api_client, CIRCUIT_YAHOO
+from utils.cache import cached_swr, CACHE_TIMEOUT_PRICE, CACHE_MAX_AGE_PRICE
+from utils import handle_api_errors
+
+from .blueprint import dashboard_bp
+
+# Upper bound on symbols per request to keep the upstream fan-out small
+MAX_QUOTE_SYMBOLS = 20
+
+
+@dashboard_bp.route('/api/quotes')
+@cached_swr(CACHE_TIMEOUT_PRICE, CACHE_MAX_AGE_PRICE, query_string=True, circuit_name=CIRCUIT_YAHOO)
+@handle_api_errors
+def get_quotes() -> Response | tuple[Response, int]:
+    """Get current prices for several symbols in one request"""
+    symbols = [
+        s.strip().upper()
+        for s in request.args.get('symbols', '').split(',')
+        if s.strip()
+    ]
+    symbols = list(dict.fromkeys(symbols))
+
+    if not symbols:
+        return jsonify({'error': 'At least one symbol required'}), 400
+    if len(symbols) > MAX_QUOTE_SYMBOLS:
+        return jsonify({'error': f'At most {MAX_QUOTE_SYMBOLS} symbols allowed'}), 400
+
+    batch = api_client.get_yahoo_quotes(symbols)
+
+    quotes = {}
+    for symbol, quote in batch['quotes'].items():
+        if quote is None:
+            quotes[symbol] = None
+            continue
+        quotes[symbol] = {
+            'price': round(quote['price'], 4),
+            'currency': quote['currency'],
+            'priceEur': round(quote['price_eur'], 4) if 'price_eur' in quote else None
+        }
+
+    if all(q is None for q in quotes.values()):
+        current_app.logger.error(f"Quotes unavailable for {', '.join(symbols)}")
+        return jsonify({'error': 'Quotes unavailable'}), 503
+
+    eur_usd_rate = batch['eur_usd_rate']
+    return jsonify({
+        'quotes': quotes,
+        'eurUsdRate': round(eur_usd_rate, 4),
+        'usdEurRate': round(1 / eur_usd_rate, 4)
+    })
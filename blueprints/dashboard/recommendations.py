@@ -1,29 +1,70 @@
 """Sell recommendation analysis endpoints"""
 from __future__ import annotations
-from datetime import datetime
-from flask import jsonify, Response
-import requests
+from flask import jsonify, request, Response
 
-from utils.api_client import api_client, YAHOO_FINANCE_URL, USER_AGENT
-from utils.cache import cache, CACHE_TIMEOUT_RECOMMENDATION
+from utils.api_client import (
+    api_client, CIRCUIT_YAHOO, DASHBOARD_SYMBOLS, EUR_USD_SYMBOL, STOCK_SCALE, CURRENCY_SCALE
+)
+from utils.cache import cached_swr, CACHE_TIMEOUT_RECOMMENDATION, CACHE_MAX_AGE_RECOMMENDATION
+from utils.timeseries import PriceSeries, asof_join, format_timestamp, INTERVAL_SECONDS
 
 from .blueprint import dashboard_bp
 
+# Overall score weighting
+STOCK_WEIGHT = 0.7
+CURRENCY_WEIGHT = 0.3
+
+# History periods: period -> (Yahoo range, interval)
+HISTORY_PERIODS: dict[str, tuple[str, str]] = {
+    '1y': ('1y', '1wk'),
+    '5y': ('5y', '1d')
+}
+
+# How many bars an EUR/USD close may be carried forward onto stock bars
+FX_FILL_BARS = 2
+
+
+def score_history(
+    stock: PriceSeries | None,
+    eur_usd: PriceSeries | None,
+    tolerance: int | None = None
+) -> tuple[list[int], list[int]] | None:
+    """
+    Score every stock bar against the start of the series in one pass.
+    Each bar is joined to the EUR/USD close as of its timestamp (FX trades
+    when stocks don't, so indexes don't line up); bars with no rate within
+    tolerance seconds are skipped. Returns (timestamps, scores).
+    """
+    if not stock or not eur_usd:
+        return None
+
+    timestamps, (closes, rates) = asof_join(stock, eur_usd, tolerance=tolerance)
+    if not timestamps:
+        return None
+
+    start_price, start_rate = closes[0], rates[0]
+    # USD/EUR change = (1/rate - 1/start) / (1/start) = start/rate - 1
+    stock_scores = STOCK_SCALE.scores(((close - start_price) / start_price) * 100 for close in closes)
+    currency_scores = CURRENCY_SCALE.scores((start_rate / rate - 1) * 100 for rate in rates)
+    scores = [
+        int((stock_score * STOCK_WEIGHT) + (currency_score * CURRENCY_WEIGHT))
+        for stock_score, currency_score in zip(stock_scores, currency_scores)
+    ]
+    return timestamps.tolist(), scores
+
 
 @dashboard_bp.route('/api/sell-recommendation')
-@cache.cached(timeout=CACHE_TIMEOUT_RECOMMENDATION)
+@cached_swr(CACHE_TIMEOUT_RECOMMENDATION, CACHE_MAX_AGE_RECOMMENDATION, circuit_name=CIRCUIT_YAHOO)
 def get_sell_recommendation() -> Response | tuple[Response, int]:
     """Analyze AMZN stock and USD/EUR trends to recommend selling with percentage score"""
     try:
-        headers = {'User-Agent': USER_AGENT}
-
-        # Get 12 months of AMZN data
-        amzn_url = f'{YAHOO_FINANCE_URL}/AMZN?range=1y&interval=1wk'
-        amzn_response = requests.get(amzn_url, headers=headers, timeout=10)
-
-        # Get 12 months of EUR/USD data
-        eur_url = f'{YAHOO_FINANCE_URL}/EURUSD=X?range=1y&interval=1wk'
-        eur_response = requests.get(eur_url, headers=headers, timeout=10)
+        # Get 12 months of AMZN and EUR/USD data in parallel
+        results = api_client.fetch_concurrently({
+            'amzn': lambda: api_client.get_price_series('AMZN', '1y', '1wk'),
+            'eur': lambda: api_client.get_price_series(EUR_USD_SYMBOL, '1y', '1wk')
+        })
+        amzn_series = results['amzn']
+        eur_series = results['eur']
 
         stock_score = 50
         currency_score = 50
@@ -31,39 +72,16 @@ def get_sell_recommendation() -> Response | tuple[Response, int]:
         currency_trend = "Unknown"
 
         # Analyze AMZN stock trend
-        if amzn_response.status_code == 200:
-            amzn_data = amzn_response.json()
-            if 'chart' in amzn_data and amzn_data['chart']['result']:
-                result = amzn_data['chart']['result'][0]
-                if 'indicators' in result:
-                    closes = result['indicators']['quote'][0]['close']
-                    valid_closes = [c for c in closes if c is not None]
-
-                    if len(valid_closes) >= 2:
-                        start_price = valid_closes[0]
-                        end_price = valid_closes[-1]
-                        change_pct = ((end_price - start_price) / start_price) * 100
-                        stock_score, stock_trend = api_client.calculate_stock_score(change_pct)
-
-        # Analyze EUR/USD currency trend
-        if eur_response.status_code == 200:
-            eur_data = eur_response.json()
-            if 'chart' in eur_data and eur_data['chart']['result']:
-                result = eur_data['chart']['result'][0]
-                if 'indicators' in result:
-                    closes = result['indicators']['quote'][0]['close']
-                    valid_closes = [c for c in closes if c is not None]
-
-                    if len(valid_closes) >= 2:
-                        start_rate = valid_closes[0]
-                        end_rate = valid_closes[-1]
-                        start_usd_eur = 1 / start_rate
-                        end_usd_eur = 1 / end_rate
-                        rate_change_pct = ((end_usd_eur - start_usd_eur) / start_usd_eur) * 100
-                        currency_score, currency_trend = api_client.calculate_currency_score(rate_change_pct)
+        if amzn_series and len(amzn_series) >= 2:
+            stock_score, stock_trend = api_client.calculate_stock_score(amzn_series.change_pct())
+
+        # Analyze USD/EUR currency trend
+        if eur_series and len(eur_series) >= 2:
+            rate_change_pct = eur_series.map(lambda rate: 1 / rate).change_pct()
+            currency_score, currency_trend = api_client.calculate_currency_score(rate_change_pct)
 
         # Calculate overall score (weighted: 70% stock, 30% currency)
-        overall_score = int((stock_score * 0.7) + (currency_score * 0.3))
+        overall_score = int((stock_score * STOCK_WEIGHT) + (currency_score * CURRENCY_WEIGHT))
 
         # Generate recommendation text
         if overall_score >= 80:
@@ -105,80 +123,36 @@ def get_sell_recommendation() -> Response | tuple[Response, int]:
 
 
 @dashboard_bp.route('/api/recommendation-history')
-@cache.cached(timeout=CACHE_TIMEOUT_RECOMMENDATION)
+@cached_swr(
+    CACHE_TIMEOUT_RECOMMENDATION, CACHE_MAX_AGE_RECOMMENDATION,
+    query_string=True, circuit_name=CIRCUIT_YAHOO
+)
 def get_recommendation_history() -> Response | tuple[Response, int]:
-    """Get historical recommendation scores over 12 months"""
+    """Get historical recommendation scores (12 months weekly by default)"""
     try:
-        headers = {'User-Agent': USER_AGENT}
-
-        # Get 12 months of AMZN data (weekly intervals)
-        amzn_url = f'{YAHOO_FINANCE_URL}/AMZN?range=1y&interval=1wk'
-        amzn_response = requests.get(amzn_url, headers=headers, timeout=10)
-
-        # Get 12 months of EUR/USD data (weekly intervals)
-        eur_url = f'{YAHOO_FINANCE_URL}/EURUSD=X?range=1y&interval=1wk'
-        eur_response = requests.get(eur_url, headers=headers, timeout=10)
-
-        dates: list[str] = []
-        scores: list[int] = []
-
-        if amzn_response.status_code == 200 and eur_response.status_code == 200:
-            amzn_data = amzn_response.json()
-            eur_data = eur_response.json()
-
-            if ('chart' in amzn_data and amzn_data['chart']['result'] and
-                    'chart' in eur_data and eur_data['chart']['result']):
-
-                amzn_result = amzn_data['chart']['result'][0]
-                eur_result = eur_data['chart']['result'][0]
-
-                if ('timestamp' in amzn_result and 'indicators' in amzn_result and
-                        'timestamp' in eur_result and 'indicators' in eur_result):
-
-                    amzn_timestamps = amzn_result['timestamp']
-                    amzn_closes = amzn_result['indicators']['quote'][0]['close']
-                    eur_closes = eur_result['indicators']['quote'][0]['close']
-
-                    for i in range(len(amzn_timestamps)):
-                        if (i < len(amzn_closes) and i < len(eur_closes) and
-                                amzn_closes[i] is not None and eur_closes[i] is not None):
-
-                            # Calculate stock performance from start to current point
-                            if i > 0:
-                                start_price = next(
-                                    (p for p in amzn_closes[:i+1] if p is not None),
-                                    amzn_closes[i]
-                                )
-                                stock_change = ((amzn_closes[i] - start_price) / start_price) * 100
-                            else:
-                                stock_change = 0
-
-                            stock_score, _ = api_client.calculate_stock_score(stock_change)
-
-                            # Calculate currency change
-                            if i > 0:
-                                start_rate = next(
-                                    (r for r in eur_closes[:i+1] if r is not None),
-                                    eur_closes[i]
-                                )
-                                start_usd_eur = 1 / start_rate
-                                current_usd_eur = 1 / eur_closes[i]
-                                currency_change = ((current_usd_eur - start_usd_eur) / start_usd_eur) * 100
-                            else:
-                                currency_change = 0
-
-                            currency_score, _ = api_client.calculate_currency_score(currency_change)
-
-                            # Calculate overall score (70% stock, 30% currency)
-                            overall_score = int((stock_score * 0.7) + (currency_score * 0.3))
-
-                            date_obj = datetime.fromtimestamp(amzn_timestamps[i])
-                            dates.append(date_obj.strftime('%b %d'))
-                            scores.append(overall_score)
-
-        if dates and scores:
+        # Only dashboard symbols: each new symbol costs upstream fetches and cache entries
+        symbol = request.args.get('symbol', 'AMZN').upper()
+        if symbol not in DASHBOARD_SYMBOLS:
+            return jsonify({'error': f'Unsupported symbol: {symbol}'}), 400
+        period = request.args.get('period', '1y')
+        if period not in HISTORY_PERIODS:
+            period = '1y'
+        range_param, interval_param = HISTORY_PERIODS[period]
+
+        # Get stock and EUR/USD series in parallel
+        results = api_client.fetch_concurrently({
+            'stock': lambda: api_client.get_price_series(symbol, range_param, interval_param),
+            'eur': lambda: api_client.get_price_series(EUR_USD_SYMBOL, range_param, interval_param)
+        })
+        history = score_history(
+            results['stock'], results['eur'],
+            tolerance=FX_FILL_BARS * INTERVAL_SECONDS[interval_param]
+        )
+
+        if history:
+            timestamps, scores = history
             return jsonify({
-                'dates': dates,
+                'dates': [format_timestamp(ts, period) for ts in timestamps],
                 'scores': scores
             })
         else:
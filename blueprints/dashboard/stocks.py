@@ -2,15 +2,17 @@
 from __future__ import annotations
 from flask import jsonify, request, current_app, Response
 
-from utils.api_client import api_client, PERIOD_MAP
-from utils.cache import cache, CACHE_TIMEOUT_PRICE, CACHE_TIMEOUT_CHART
+from utils.api_client import api_client, PERIOD_MAP, CIRCUIT_YAHOO
+from utils.cache import (
+    cached_swr, CACHE_TIMEOUT_PRICE, CACHE_TIMEOUT_CHART, CACHE_MAX_AGE_CHART, CACHE_MAX_AGE_PRICE
+)
 from utils import handle_api_errors
 
 from .blueprint import dashboard_bp
 
 
 @dashboard_bp.route('/api/stock-data')
-@cache.cached(timeout=CACHE_TIMEOUT_CHART, query_string=True)
+@cached_swr(CACHE_TIMEOUT_CHART, CACHE_MAX_AGE_CHART, query_string=True, circuit_name=CIRCUIT_YAHOO)
 @handle_api_errors
 def get_stock_data() -> Response | tuple[Response, int]:
     """Get stock data using Yahoo Finance API"""
@@ -20,20 +22,22 @@ def get_stock_data() -> Response | tuple[Response, int]:
 
     range_param, interval_param = PERIOD_MAP.get(period, ('1y', '1wk'))
 
-    data = api_client.get_yahoo_chart_data(symbol, range_param, interval_param)
-    dates, prices = api_client.parse_yahoo_chart(data, period)
+    series = api_client.get_price_series(symbol, range_param, interval_param)
 
-    if dates and prices:
-        prices = [round(p, 2) for p in prices]
-        current_app.logger.info(f"Stock data retrieved for {symbol}: {len(dates)} data points")
-        return jsonify({'dates': dates, 'prices': prices, 'symbol': symbol})
+    if series:
+        current_app.logger.info(f"Stock data retrieved for {symbol}: {len(series)} data points")
+        return jsonify({
+            'dates': series.labels(period),
+            'prices': series.values(2),
+            'symbol': symbol
+        })
 
     current_app.logger.error(f"Stock data unavailable for {symbol}")
     return jsonify({'error': 'Chart data unavailable'}), 503
 
 
 @dashboard_bp.route('/api/current-price')
-@cache.cached(timeout=CACHE_TIMEOUT_PRICE, query_string=True)
+@cached_swr(CACHE_TIMEOUT_PRICE, CACHE_MAX_AGE_PRICE, query_string=True, circuit_name=CIRCUIT_YAHOO)
 def get_current_price() -> Response | tuple[Response, int]:
     """Get current stock price using Yahoo Finance API"""
     try:
@@ -2,12 +2,42 @@
 Logs API blueprint
 Handles log viewing, filtering, and clearing
 """
-from datetime import datetime, timedelta
-from flask import Blueprint, jsonify, request, current_app
-from utils.logging_setup import log_storage, log_storage_lock
+import json
+import queue
+import time
+from datetime import datetime
+from flask import Blueprint, Response, jsonify, request, current_app
+from utils.log_archive import ARCHIVE_PAGE_SIZE, log_archive
+from utils.logging_setup import log_store
 
 logs_bp = Blueprint('logs', __name__)
 
+# Live log stream settings
+STREAM_HEARTBEAT = 15      # Seconds between keep-alive comments
+STREAM_RETRY_MS = 3000     # Browser reconnect delay
+MAX_LOG_STREAMS = 8        # Concurrent stream clients (each holds a worker thread)
+
+
+def _sse(data: dict, event: str | None = None, event_id: int | None = None) -> str:
+    """Format one Server-Sent Events message"""
+    lines = []
+    if event:
+        lines.append(f'event: {event}')
+    if event_id is not None:
+        lines.append(f'id: {event_id}')
+    lines.append(f'data: {json.dumps(data)}')
+    return '\n'.join(lines) + '\n\n'
+
+
+def _parse_time_arg(value: str | None) -> float | None:
+    """Parse a start/end argument given as Unix seconds or an ISO timestamp"""
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return datetime.fromisoformat(value.replace('Z', '+00:00')).timestamp()
+
 
 @logs_bp.route('/api/test-log', methods=['GET'])
 def test_log():
@@ -15,53 +45,70 @@ def test_log():
     current_app.logger.info("TEST INFO LOG")
     current_app.logger.warning("TEST WARNING LOG")
     current_app.logger.error("TEST ERROR LOG")
-    return jsonify({'message': 'Test logs generated', 'storage_size': len(log_storage)})
+    return jsonify({'message': 'Test logs generated', 'storage_size': len(log_store)})
 
 
 @logs_bp.route('/api/logs', methods=['GET'])
 def get_logs():
-    """Get filtered logs"""
+    """
+    Get filtered logs, newest first, optionally only those after since_seq.
+    With source=archive (or a start/end range) the on-disk archive is
+    searched instead of the in-memory buffer.
+    """
     try:
         time_filter = request.args.get('time', '5')
         level_filter = request.args.get('level', 'all')
-        search_filter = request.args.get('search', '').lower()
-
-        with log_storage_lock:
-            logs = list(log_storage)
+        search_filter = request.args.get('search', '')
+        since_seq = request.args.get('since_seq', type=int)
+        limit = request.args.get('limit', type=int)
+        offset = max(request.args.get('offset', 0, type=int), 0)
 
         # Time filtering
+        start_time = None
         if time_filter != 'all':
             try:
-                minutes = int(time_filter)
-                cutoff_time = datetime.now() - timedelta(minutes=minutes)
-                logs = [
-                    log for log in logs
-                    if datetime.fromisoformat(log['timestamp']) >= cutoff_time
-                ]
+                start_time = time.time() - int(time_filter) * 60
             except ValueError:
                 pass
 
-        # Level filtering
-        if level_filter != 'all':
-            logs = [log for log in logs if log['level'] == level_filter]
-
-        # Search filtering
-        if search_filter:
-            logs = [log for log in logs if search_filter in log['message'].lower()]
-
-        # Calculate stats
-        stats = {
-            'total': len(logs),
-            'errors': sum(1 for log in logs if log['level'] == 'ERROR'),
-            'warnings': sum(1 for log in logs if log['level'] == 'WARNING')
-        }
-
-        # Return most recent logs first
-        logs.reverse()
+        source = request.args.get('source', 'memory')
+        if source == 'archive' or 'start' in request.args or 'end' in request.args:
+            if not log_archive.enabled:
+                return jsonify({'error': 'Log archive is disabled'}), 404
+            try:
+                start_time = _parse_time_arg(request.args.get('start')) or start_time
+                end_time = _parse_time_arg(request.args.get('end'))
+            except ValueError:
+                return jsonify({'error': 'start and end must be Unix seconds or ISO timestamps'}), 400
+
+            logs, stats = log_archive.query(
+                start_time=start_time,
+                end_time=end_time,
+                level=level_filter if level_filter != 'all' else None,
+                search=search_filter,
+                limit=max(limit, 0) if limit is not None else ARCHIVE_PAGE_SIZE,
+                offset=offset
+            )
+            return jsonify({
+                'logs': logs,
+                'stats': stats,
+                'last_seq': log_store.last_seq,
+                'source': 'archive'
+            })
+
+        logs, stats, last_seq = log_store.query(
+            since_seq=since_seq,
+            start_time=start_time,
+            level=level_filter if level_filter != 'all' else None,
+            search=search_filter,
+            limit=max(limit, 0) if limit is not None else None,
+            offset=offset
+        )
 
         return jsonify({
             'logs': logs,
-            'stats': stats
+            'stats': stats,
+            'last_seq': last_seq
         })
 
     except Exception as e:
@@ -69,12 +116,70 @@ def get_logs():
         return jsonify({'error': str(e)}), 500
 
 
+@logs_bp.route('/api/logs/stream', methods=['GET'])
+def stream_logs():
+    """
+    Live log tail as Server-Sent Events.
+    Sends entries newer than since_seq (or the Last-Event-ID header on
+    reconnect) and then each new entry matching level/search as it is
+    logged, with a heartbeat comment while idle. If the client falls too far
+    behind, an 'overflow' event reports how many entries were dropped.
+    """
+    level_filter = request.args.get('level', 'all')
+    level = level_filter if level_filter != 'all' else None
+    search = request.args.get('search', '')
+    since_seq = request.headers.get('Last-Event-ID', type=int)
+    if since_seq is None:
+        since_seq = request.args.get('since_seq', type=int)
+
+    # Subscribe before reading the backlog so nothing logged in between is missed
+    subscription = log_store.subscribe(level, search, max_subscribers=MAX_LOG_STREAMS)
+    if subscription is None:
+        return jsonify({'error': 'Too many live log streams'}), 503
+
+    backlog: list[dict] = []
+    if since_seq is not None:
+        backlog, _, _ = log_store.query(since_seq=since_seq, level=level, search=search)
+        backlog.reverse()
+
+    def generate():
+        try:
+            yield f'retry: {STREAM_RETRY_MS}\n\n'
+            last_sent = since_seq or 0
+            for entry in backlog:
+                last_sent = entry['seq']
+                yield _sse(entry, event_id=entry['seq'])
+
+            while True:
+                try:
+                    entry = subscription.queue.get(timeout=STREAM_HEARTBEAT)
+                except queue.Empty:
+                    yield ': heartbeat\n\n'
+                    continue
+
+                dropped = subscription.take_dropped()
+                if dropped:
+                    yield _sse({'dropped': dropped}, event='overflow')
+                if entry['seq'] > last_sent:
+                    last_sent = entry['seq']
+                    yield _sse(entry, event_id=entry['seq'])
+        finally:
+            log_store.unsubscribe(subscription)
+
+    response = Response(generate(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+    # Also covers clients that disconnect before the stream starts
+    response.call_on_close(lambda: log_store.unsubscribe(subscription))
+    return response
+
+
 @logs_bp.route('/api/logs/clear', methods=['POST'])
 def clear_logs():
-    """Clear all logs"""
+    """Clear the in-memory logs (the on-disk archive is kept)"""
     try:
-        with log_storage_lock:
-            log_storage.clear()
+        log_store.clear()
 
         current_app.logger.info("Logs cleared by user")
 
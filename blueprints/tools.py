@@ -3,7 +3,7 @@ Tools API blueprint
 Handles VRT calculator for vehicle imports
 """
 from flask import Blueprint, jsonify, request, current_app
-import requests
+from utils.api_client import api_client
 
 tools_bp = Blueprint('tools', __name__)
 
@@ -28,7 +28,7 @@ def vrt_calculate():
 
         # Get current GBP to EUR exchange rate
         try:
-            rate_response = requests.get(
+            rate_response = api_client.get(
                 'https://api.exchangerate-api.com/v4/latest/GBP',
                 timeout=10
             )
@@ -7,9 +7,8 @@ import tempfile
 import base64
 from urllib.parse import urlparse
 from flask import Blueprint, jsonify, request, current_app, session
-import requests
 import yt_dlp
-from utils import load_config
+from utils import load_config, api_client
 
 youtube_bp = Blueprint('youtube', __name__)
 
@@ -49,7 +48,7 @@ def get_youtube_playlists():
                     'key': api_key
                 }
 
-                channels_response = requests.get(
+                channels_response = api_client.get(
                     channels_url, params=channels_params, timeout=10
                 )
                 if channels_response.status_code == 200:
@@ -81,7 +80,7 @@ def get_youtube_playlists():
                     'maxResults': 5
                 }
 
-                search_response = requests.get(
+                search_response = api_client.get(
                     search_url, params=search_params, timeout=10
                 )
                 if search_response.status_code == 200:
@@ -127,7 +126,7 @@ def get_youtube_playlists():
                 'key': api_key
             }
 
-            channels_response = requests.get(
+            channels_response = api_client.get(
                 channels_url, params=channels_params, timeout=10
             )
             if channels_response.status_code == 200:
@@ -151,7 +150,7 @@ def get_youtube_playlists():
             if next_page_token:
                 playlists_params['pageToken'] = next_page_token
 
-            playlists_response = requests.get(
+            playlists_response = api_client.get(
                 playlists_url, params=playlists_params, timeout=10
             )
             if playlists_response.status_code != 200:
@@ -222,7 +221,7 @@ def get_playlist_videos():
             if next_page_token:
                 params['pageToken'] = next_page_token
 
-            response = requests.get(
+            response = api_client.get(
                 'https://www.googleapis.com/youtube/v3/playlistItems',
                 params=params,
                 timeout=10
@@ -325,7 +324,7 @@ def youtube_oauth_callback():
             'redirect_uri': redirect_uri
         }
 
-        token_response = requests.post(token_url, data=token_data)
+        token_response = api_client.post(token_url, data=token_data)
         if token_response.status_code == 200:
             token_info = token_response.json()
             # Store tokens separately for source and destination
@@ -415,7 +414,7 @@ def copy_playlists():
                     f'https://www.googleapis.com/youtube/v3/playlists?'
                     f'part=snippet,status&id={playlist_id}&key={api_key}'
                 )
-                playlist_response = requests.get(playlist_url, timeout=10)
+                playlist_response = api_client.get(playlist_url, timeout=10)
 
                 if playlist_response.status_code != 200:
                     continue
@@ -450,7 +449,7 @@ def copy_playlists():
                     'Content-Type': 'application/json'
                 }
 
-                create_response = requests.post(
+                create_response = api_client.post(
                     'https://www.googleapis.com/youtube/v3/playlists?'
                     'part=snippet,status',
                     json=create_data,
@@ -468,7 +467,7 @@ def copy_playlists():
                         f'part=snippet&playlistId={playlist_id}&maxResults=50'
                         f'&key={api_key}'
                     )
-                    videos_response = requests.get(videos_url, timeout=10)
+                    videos_response = api_client.get(videos_url, timeout=10)
 
                     if videos_response.status_code == 200:
                         videos_data = videos_response.json()
@@ -488,7 +487,7 @@ def copy_playlists():
                                     }
                                 }
 
-                                requests.post(
+                                api_client.post(
                                     'https://www.googleapis.com/youtube/v3/'
                                     'playlistItems?part=snippet',
                                     json=add_video_data,
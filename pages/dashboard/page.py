@@ -555,27 +555,34 @@ def get_content():
             document.getElementById('cashValue').textContent = 'Value unavailable';
         }
         
-        async function fetchPrice(url, elementId, formatter, name) {
-            try {
-                const data = await fetchWithRetry(url);
-                const value = data.price || data.rate;
-                document.getElementById(elementId).textContent = formatter(value);
-                console.log(`${name} updated:`, value);
-            } catch (error) {
-                console.error(`${name} fetch failed:`, error);
-                document.getElementById(elementId).textContent = 'Price unavailable';
+        function showPrice(elementId, value, formatter, name) {
+            const element = document.getElementById(elementId);
+            if (value === undefined || value === null) {
+                console.error(`${name} unavailable`);
+                element.textContent = 'Price unavailable';
+                return;
             }
+            element.textContent = formatter(value);
+            console.log(`${name} updated:`, value);
         }
         
         async function fetchCurrentPrices() {
             console.log('Fetching current prices...');
-            await Promise.all([
-                fetchPrice('/api/current-price?symbol=AMZN', 'amznPrice', v => `$${Math.round(v)}`, 'AMZN price'),
-                fetchPrice('/api/currency-rate', 'eurRate', v => `${v.toFixed(2)} EUR`, 'USD/EUR rate'),
-                fetchPrice('/api/current-price?symbol=ORCL', 'orclPrice', v => `$${Math.round(v)}`, 'ORCL price'),
-                fetchPrice('/api/xrp-price', 'xrpPrice', v => `€${v.toFixed(2)}`, 'XRP price'),
-                fetchPrice('/api/gold-price', 'goldPrice', v => `€${Math.round(v)}`, 'Gold price')
-            ]);
+            let quotes = {};
+            let usdEurRate = null;
+            try {
+                const data = await fetchWithRetry('/api/quotes?symbols=AMZN,ORCL,XRP-EUR,GC=F,EURUSD=X');
+                quotes = data.quotes || {};
+                usdEurRate = data.usdEurRate;
+            } catch (error) {
+                console.error('Quotes fetch failed:', error);
+            }
+            const quote = symbol => quotes[symbol] || {};
+            showPrice('amznPrice', quote('AMZN').price, v => `$${Math.round(v)}`, 'AMZN price');
+            showPrice('eurRate', usdEurRate, v => `${v.toFixed(2)} EUR`, 'USD/EUR rate');
+            showPrice('orclPrice', quote('ORCL').price, v => `$${Math.round(v)}`, 'ORCL price');
+            showPrice('xrpPrice', quote('XRP-EUR').priceEur, v => `€${v.toFixed(2)}`, 'XRP price');
+            showPrice('goldPrice', quote('GC=F').priceEur, v => `€${Math.round(v)}`, 'Gold price');
         }
         
         async function fetchRecommendationHistory() {
@@ -20,6 +20,9 @@ def get_content():
                         <option value="360">Last 6 hours</option>
                         <option value="1440">Last 24 hours</option>
                         <option value="all">All logs</option>
+                        <option value="10080" data-source="archive">Last 7 days (archive)</option>
+                        <option value="43200" data-source="archive">Last 30 days (archive)</option>
+                        <option value="all" data-source="archive">All history (archive)</option>
                     </select>
                 </div>
 
@@ -56,6 +59,13 @@ def get_content():
         <div class="logs-display" id="logsDisplay">
             <div class="loading">Loading logs...</div>
         </div>
+
+        <details class="metrics-section" id="metricsSection">
+            <summary><i class="fas fa-tachometer-alt"></i> Performance</summary>
+            <div id="metricsDisplay">
+                <div class="loading">Loading metrics...</div>
+            </div>
+        </details>
     </div>
 
     <style>
@@ -292,6 +302,44 @@ def get_content():
         opacity: 0.5;
     }
 
+    .metrics-section {
+        background: white;
+        padding: 1rem 1.5rem;
+        border-radius: 12px;
+        box-shadow: 0 2px 8px rgba(0, 0, 0, 0.1);
+        margin-top: 2rem;
+    }
+
+    .metrics-section summary {
+        font-weight: 600;
+        color: #555;
+        cursor: pointer;
+    }
+
+    .metrics-table {
+        width: 100%;
+        border-collapse: collapse;
+        margin-top: 1rem;
+        font-size: 0.9rem;
+    }
+
+    .metrics-table caption {
+        text-align: left;
+        font-weight: 600;
+        color: #333;
+        padding-bottom: 0.5rem;
+    }
+
+    .metrics-table th, .metrics-table td {
+        padding: 0.4rem 0.6rem;
+        border-bottom: 1px solid #dee2e6;
+        text-align: right;
+    }
+
+    .metrics-table th:first-child, .metrics-table td:first-child {
+        text-align: left;
+    }
+
     /* Scrollbar styling for logs display */
     .logs-display::-webkit-scrollbar {
         width: 10px;
@@ -331,12 +379,15 @@ def get_content():
     js_code = '''
     <script>
     let currentLogs = [];
-    let autoRefreshInterval = null;
+    let currentStats = {};
+    let lastSeq = 0;
+    let logStream = null;
     let isLiveWatchActive = false;
 
     async function fetchLogs() {
         try {
-            const timeFilter = document.getElementById('timeFilter').value;
+            const timeSelect = document.getElementById('timeFilter');
+            const timeFilter = timeSelect.value;
             const levelFilter = document.getElementById('levelFilter').value;
             const searchFilter = document.getElementById('searchFilter').value;
 
@@ -345,6 +396,11 @@ def get_content():
                 level: levelFilter,
                 search: searchFilter
             });
+            // Longer ranges are read from the on-disk archive
+            const source = timeSelect.selectedOptions[0].dataset.source;
+            if (source) {
+                params.set('source', source);
+            }
 
             const response = await fetch(`/api/logs?${params}`);
             const data = await response.json();
@@ -355,8 +411,10 @@ def get_content():
             }
 
             currentLogs = data.logs || [];
+            lastSeq = data.last_seq || lastSeq;
             displayLogs(currentLogs);
-            updateStats(data.stats || {});
+            currentStats = data.stats || {};
+            updateStats(currentStats);
 
         } catch (error) {
             console.error('Failed to fetch logs:', error);
@@ -422,6 +480,45 @@ def get_content():
         return String(text).replace(/[&<>"']/g, m => map[m]);
     }
 
+    // Render one metrics table; columns are [header, key] pairs
+    function metricsTable(caption, rows, columns) {
+        if (!rows || rows.length === 0) {
+            return '';
+        }
+        const head = columns.map(([label]) => `<th>${label}</th>`).join('');
+        const body = rows.map(row =>
+            '<tr>' + columns.map(([, key]) => `<td>${escapeHtml(row[key] ?? '-')}</td>`).join('') + '</tr>'
+        ).join('');
+        return `<table class="metrics-table"><caption>${caption}</caption><tr>${head}</tr>${body}</table>`;
+    }
+
+    async function fetchMetrics() {
+        const container = document.getElementById('metricsDisplay');
+        try {
+            const response = await fetch('/api/metrics');
+            const data = await response.json();
+
+            const routes = data.routes.map(r => ({ ...r, route: `${r.method} ${r.route}` }));
+            const html =
+                metricsTable('Slowest routes (total time)', routes, [
+                    ['Route', 'route'], ['Requests', 'count'], ['5xx', 'errors'],
+                    ['Avg ms', 'avg_ms'], ['p95 ms', 'p95_ms']
+                ]) +
+                metricsTable('Upstream hosts', data.upstream, [
+                    ['Host', 'host'], ['Requests', 'count'], ['Errors', 'errors'], ['Retries', 'retries'],
+                    ['Avg ms', 'avg_ms'], ['p95 ms', 'p95_ms'], ['JSON decode ms', 'decode_avg_ms'], ['Bytes', 'bytes']
+                ]) +
+                metricsTable('Caches', data.cache, [
+                    ['Cache', 'cache'], ['Hits', 'hit'], ['Stale', 'stale'], ['Misses', 'miss'], ['Hit rate', 'hit_rate']
+                ]);
+
+            container.innerHTML = html || '<div class="empty-state"><p>No requests recorded yet</p></div>';
+        } catch (error) {
+            console.error('Failed to fetch metrics:', error);
+            container.innerHTML = '<div class="empty-state"><p>Failed to load metrics</p></div>';
+        }
+    }
+
     async function clearLogs() {
         if (!confirm('Are you sure you want to clear all logs?')) {
             return;
@@ -465,22 +562,63 @@ def get_content():
     }
 
     function startAutoRefresh() {
-        // Refresh every 5 seconds
-        autoRefreshInterval = setInterval(fetchLogs, 5000);
+        // Server pushes each new entry matching the filters as it is logged
+        const params = new URLSearchParams({
+            level: document.getElementById('levelFilter').value,
+            search: document.getElementById('searchFilter').value,
+            since_seq: lastSeq
+        });
+        logStream = new EventSource(`/api/logs/stream?${params}`);
+
+        logStream.onmessage = (event) => {
+            const log = JSON.parse(event.data);
+            if (log.seq <= lastSeq) {
+                return;
+            }
+            lastSeq = log.seq;
+            currentLogs = [log].concat(currentLogs).slice(0, 500);
+            currentStats.total = (currentStats.total || 0) + 1;
+            if (log.level === 'ERROR') currentStats.errors = (currentStats.errors || 0) + 1;
+            if (log.level === 'WARNING') currentStats.warnings = (currentStats.warnings || 0) + 1;
+            displayLogs(currentLogs);
+            updateStats(currentStats);
+        };
+
+        // We fell behind and entries were dropped - resync from the API
+        logStream.addEventListener('overflow', () => fetchLogs());
     }
 
     function stopAutoRefresh() {
-        if (autoRefreshInterval) {
-            clearInterval(autoRefreshInterval);
-            autoRefreshInterval = null;
+        if (logStream) {
+            logStream.close();
+            logStream = null;
+        }
+    }
+
+    // Reload with the new filters, reopening the live stream if it is on
+    function onFiltersChanged() {
+        fetchLogs();
+        if (isLiveWatchActive) {
+            stopAutoRefresh();
+            startAutoRefresh();
         }
     }
 
     // Event listeners
-    document.getElementById('timeFilter').addEventListener('change', fetchLogs);
-    document.getElementById('levelFilter').addEventListener('change', fetchLogs);
-    document.getElementById('searchFilter').addEventListener('input', debounce(fetchLogs, 500));
-    document.getElementById('refreshBtn').addEventListener('click', fetchLogs);
+    document.getElementById('timeFilter').addEventListener('change', onFiltersChanged);
+    document.getElementById('levelFilter').addEventListener('change', onFiltersChanged);
+    document.getElementById('searchFilter').addEventListener('input', debounce(onFiltersChanged, 500));
+    document.getElementById('refreshBtn').addEventListener('click', () => {
+        fetchLogs();
+        if (document.getElementById('metricsSection').open) {
+            fetchMetrics();
+        }
+    });
+    document.getElementById('metricsSection').addEventListener('toggle', (event) => {
+        if (event.target.open) {
+            fetchMetrics();
+        }
+    });
     document.getElementById('liveWatchBtn').addEventListener('click', toggleLiveWatch);
     document.getElementById('clearBtn').addEventListener('click', clearLogs);
 
@@ -315,28 +315,21 @@ def get_content():
         }
     }
 
-    async function loadArtistImage(artistName) {
+    function loadArtistImage(artistName) {
         const artistImage = document.getElementById('artistImage');
         const imagePlaceholder = document.getElementById('imagePlaceholder');
 
-        try {
-            const response = await fetch(`/api/music-next/artist-image?artist=${encodeURIComponent(artistName)}`);
-            const data = await response.json();
-
-            if (data.image_url) {
-                artistImage.src = data.image_url;
-                artistImage.alt = artistName;
-                artistImage.style.display = 'block';
-                imagePlaceholder.style.display = 'none';
-            } else {
-                artistImage.style.display = 'none';
-                imagePlaceholder.style.display = 'flex';
-            }
-        } catch (error) {
-            console.error('Failed to load artist image:', error);
+        // The thumbnail endpoint 404s when the artist has no image
+        artistImage.onload = () => {
+            artistImage.style.display = 'block';
+            imagePlaceholder.style.display = 'none';
+        };
+        artistImage.onerror = () => {
             artistImage.style.display = 'none';
             imagePlaceholder.style.display = 'flex';
-        }
+        };
+        artistImage.alt = artistName;
+        artistImage.src = `/api/music-next/artist-image/${encodeURIComponent(artistName)}/thumb`;
     }
 
     function displayRecommendation() {
@@ -1,12 +1,17 @@
 """Shared API client utilities for external API calls"""
 from __future__ import annotations
 import requests
-from functools import lru_cache
-from datetime import datetime
-from typing import Any, Callable
+import threading
+from bisect import bisect_right
+from typing import Any, Callable, Iterable
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_EXCEPTION
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
 import time
 
 from utils.circuit_breaker import circuit_registry, CircuitOpenError
+from utils.http_session import SessionPool
+from utils.metrics import CACHE_REQUESTS, UPSTREAM_BYTES, UPSTREAM_DECODE, UPSTREAM_DURATION, UPSTREAM_RETRIES
+from utils.timeseries import PriceSeries, SeriesCache, format_timestamp, INCREMENTAL_RANGES
 
 # =============================================================================
 # CONSTANTS
@@ -29,6 +34,9 @@ PERIOD_MAP: dict[str, tuple[str, str]] = {
     '1y': ('1y', '1wk')
 }
 
+# Stock symbols shown on the dashboard
+DASHBOARD_SYMBOLS: tuple[str, ...] = ('AMZN', 'ORCL')
+
 # Stock score thresholds: (min_change_pct, score)
 STOCK_SCORE_THRESHOLDS: list[tuple[float, int, str]] = [
     (30, 95, "Exceptional growth"),
@@ -59,13 +67,183 @@ USER_AGENT: str = 'Mozilla/5.0'
 # Yahoo Finance base URL
 YAHOO_FINANCE_URL: str = 'https://query1.finance.yahoo.com/v8/finance/chart'
 
+# Yahoo Finance symbol for the EUR/USD rate
+EUR_USD_SYMBOL: str = 'EURUSD=X'
+
+# Fallback EUR/USD provider
+EXCHANGE_RATE_API_URL: str = 'https://api.exchangerate-api.com/v4/latest/EUR'
+
+# How long a fetched EUR/USD rate is reused (seconds)
+FX_RATE_TTL: int = 300
+
+# Worker threads shared by concurrent fan-out fetches
+FANOUT_WORKERS: int = 16
+
+
+# =============================================================================
+# SCORING
+# =============================================================================
+
+class ScoreScale:
+    """
+    Maps a percentage change to a (score, description) pair using binary
+    search over the threshold table, so whole series can be scored without
+    a linear threshold scan per point.
+    """
+
+    def __init__(
+        self,
+        thresholds: list[tuple[float, int, str]],
+        floor_score: int,
+        floor_description: str
+    ) -> None:
+        ordered = sorted(thresholds, key=lambda entry: entry[0])
+        self._bounds: list[float] = [threshold for threshold, _, _ in ordered]
+        self._scores: list[int] = [score for _, score, _ in ordered]
+        self._descriptions: list[str] = [description for _, _, description in ordered]
+        self.floor_score = floor_score
+        self.floor_description = floor_description
+
+    def _index(self, change_pct: float) -> int:
+        """Index of the highest threshold <= change_pct, or -1 below them all"""
+        return bisect_right(self._bounds, change_pct) - 1
+
+    def lookup(self, change_pct: float) -> tuple[int, str]:
+        i = self._index(change_pct)
+        if i < 0:
+            return self.floor_score, self.floor_description
+        return self._scores[i], self._descriptions[i]
+
+    def scores(self, changes: Iterable[float]) -> list[int]:
+        """Score every change in one pass"""
+        scores, floor = self._scores, self.floor_score
+        return [scores[i] if i >= 0 else floor for i in map(self._index, changes)]
+
+
+STOCK_SCALE = ScoreScale(STOCK_SCORE_THRESHOLDS, 10, "Major decline")
+CURRENCY_SCALE = ScoreScale(CURRENCY_SCORE_THRESHOLDS, 20, "USD very weak")
+
+
+# =============================================================================
+# REQUEST COALESCING
+# =============================================================================
+
+def normalize_url(url: str) -> str:
+    """Normalize a URL so equivalent upstream requests share one key"""
+    parts = urlsplit(url)
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path, query, ''))
+
+
+class _InFlightCall:
+    """A single upstream call that concurrent callers can wait on"""
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException | None = None
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls sharing a key into one execution.
+    Callers that arrive while a call is in flight wait for it and share
+    its result (or exception) instead of issuing their own request.
+    """
+
+    def __init__(self) -> None:
+        self._calls: dict[str, _InFlightCall] = {}
+        self._lock = threading.Lock()
+        self._requests = 0
+        self._executed = 0
+        self._coalesced = 0
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        """Run fn for key, or wait for the identical call already in flight"""
+        with self._lock:
+            self._requests += 1
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _InFlightCall()
+                self._calls[key] = call
+                self._executed += 1
+            else:
+                self._coalesced += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+        return call.result
+
+    def get_stats(self) -> dict[str, int]:
+        """Get request, upstream execution and coalesce counters"""
+        with self._lock:
+            return {
+                'requests': self._requests,
+                'executed': self._executed,
+                'coalesced': self._coalesced,
+                'in_flight': len(self._calls)
+            }
+
 
 class APIClient:
     """Centralized API client with retry logic and caching"""
 
-    def __init__(self) -> None:
+    def __init__(self, sessions: SessionPool | None = None) -> None:
         self.headers: dict[str, str] = {'User-Agent': USER_AGENT}
         self.timeout: int = REQUEST_TIMEOUT
+        self.sessions: SessionPool = sessions or SessionPool()
+        self.inflight: SingleFlight = SingleFlight()
+        self.fx_rates: FXRateService = FXRateService(self)
+        self.series: SeriesCache = SeriesCache()
+        self._fanout = ThreadPoolExecutor(
+            max_workers=FANOUT_WORKERS, thread_name_prefix='api-fanout'
+        )
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """
+        Send a request over the pooled keep-alive session for the URL's host,
+        recording its duration, status and body size per host. Streamed
+        responses are timed to the headers and sized by Content-Length.
+        """
+        host = urlsplit(url).netloc.lower()
+        start = time.perf_counter()
+        try:
+            response = self.sessions.request(method, url, **kwargs)
+        except requests.exceptions.RequestException:
+            UPSTREAM_DURATION.observe(time.perf_counter() - start, host, method, 'error')
+            raise
+        UPSTREAM_DURATION.observe(time.perf_counter() - start, host, method, str(response.status_code))
+
+        if kwargs.get('stream'):
+            length = response.headers.get('Content-Length', '')
+            size = int(length) if length.isdigit() else 0
+        else:
+            size = len(response.content)
+        UPSTREAM_BYTES.inc(host, amount=size)
+        return response
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        """Send a pooled GET request"""
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        """Send a pooled POST request"""
+        return self.request('POST', url, **kwargs)
 
     def fetch_with_retry(
         self,
@@ -73,19 +251,41 @@ class APIClient:
         retries: int = 3,
         circuit_name: str = CIRCUIT_YAHOO
     ) -> dict[str, Any] | None:
-        """Fetch URL with retry logic and circuit breaker protection"""
+        """
+        Fetch URL with retry logic and circuit breaker protection.
+        Concurrent fetches of the same normalized URL share one upstream
+        request and its parsed JSON, which callers must treat as read-only.
+        """
+        return self.inflight.do(
+            normalize_url(url),
+            lambda: self._fetch_with_retry(url, retries, circuit_name)
+        )
+
+    def _fetch_with_retry(
+        self,
+        url: str,
+        retries: int,
+        circuit_name: str
+    ) -> dict[str, Any] | None:
+        """Uncoalesced retry loop behind fetch_with_retry"""
         circuit = circuit_registry.get(circuit_name)
 
         # Check if circuit is open - fail fast with clear error
         circuit.check_state()
 
+        host = urlsplit(url).netloc.lower()
         for attempt in range(retries):
+            if attempt:
+                UPSTREAM_RETRIES.inc(host)
             try:
                 timeout = self.timeout + (attempt * 2)
-                response = requests.get(url, headers=self.headers, timeout=timeout)
+                response = self.get(url, headers=self.headers, timeout=timeout)
                 if response.status_code == 200:
                     circuit.record_success()
-                    return response.json()
+                    start = time.perf_counter()
+                    data = response.json()
+                    UPSTREAM_DECODE.observe(time.perf_counter() - start, host)
+                    return data
             except requests.exceptions.RequestException:
                 if attempt == retries - 1:
                     circuit.record_failure()
@@ -94,6 +294,35 @@ class APIClient:
         circuit.record_failure()
         return None
 
+    def fetch_concurrently(
+        self,
+        calls: dict[str, Callable[[], Any]],
+        timeout: float = TIMEOUT_LONG
+    ) -> dict[str, Any]:
+        """
+        Run independent upstream calls in parallel and return results by name.
+        Wall-clock time is the slowest leg rather than the sum. If any leg
+        raises, legs that have not started are cancelled and the error is
+        re-raised; if the legs don't all finish within timeout, raises
+        requests.Timeout. Each leg keeps its own per-request timeout.
+        """
+        futures = {self._fanout.submit(fn): name for name, fn in calls.items()}
+        done, pending = wait(futures, timeout=timeout, return_when=FIRST_EXCEPTION)
+
+        for future in pending:
+            future.cancel()
+
+        for future in done:
+            error = future.exception()
+            if error is not None:
+                raise error
+
+        if pending:
+            names = ', '.join(sorted(futures[f] for f in pending))
+            raise requests.Timeout(f"Upstream calls timed out after {timeout}s: {names}")
+
+        return {futures[future]: future.result() for future in done}
+
     def get_yahoo_chart_data(
         self,
         symbol: str,
@@ -104,26 +333,135 @@ class APIClient:
         url = f'{YAHOO_FINANCE_URL}/{symbol}?range={range_param}&interval={interval_param}'
         return self.fetch_with_retry(url)
 
-    def get_yahoo_current_price(self, symbol: str) -> float | None:
-        """Get current price from Yahoo Finance"""
+    def get_yahoo_chart_window(
+        self,
+        symbol: str,
+        period1: int,
+        period2: int,
+        interval_param: str = '1wk'
+    ) -> dict[str, Any] | None:
+        """Get chart data from Yahoo Finance between two Unix timestamps"""
+        url = (f'{YAHOO_FINANCE_URL}/{symbol}?period1={period1}&period2={period2}'
+               f'&interval={interval_param}')
+        return self.fetch_with_retry(url)
+
+    def get_price_series(
+        self,
+        symbol: str,
+        range_param: str = '1y',
+        interval_param: str = '1wk'
+    ) -> PriceSeries | None:
+        """
+        Get a parsed chart series from Yahoo Finance.
+        Parsed series are cached per (symbol, range, interval) so endpoints
+        deriving different views of the same data share one fetch and parse.
+        Once expired, long ranges (INCREMENTAL_RANGES) are extended with only
+        the bars since the newest cached one instead of re-downloaded.
+        """
+        series = self.series.get(symbol, range_param, interval_param)
+        if series is not None:
+            CACHE_REQUESTS.inc('series', 'hit')
+            return series
+
+        window = INCREMENTAL_RANGES.get((range_param, interval_param))
+        stale = self.series.get_stale(symbol, range_param, interval_param) if window else None
+        if stale is not None:
+            series = self._extend_series(stale, interval_param, *window)
+            if series is not None:
+                CACHE_REQUESTS.inc('series', 'stale')
+                self.series.put(symbol, range_param, interval_param, series, incremental=True)
+                return series
+
+        CACHE_REQUESTS.inc('series', 'miss')
+
+        series = PriceSeries.from_yahoo(
+            self.get_yahoo_chart_data(symbol, range_param, interval_param), symbol
+        )
+        if series is not None:
+            self.series.put(symbol, range_param, interval_param, series)
+        return series
+
+    def _extend_series(
+        self,
+        stale: PriceSeries,
+        interval_param: str,
+        range_seconds: int,
+        step: int
+    ) -> PriceSeries | None:
+        """
+        Fetch the bars from one step before the newest cached bar, merge them
+        in (replacing the cached, possibly partial, last bar) and drop bars
+        that have fallen out of the range.
+        """
+        now = int(time.time())
+        newer = PriceSeries.from_yahoo(
+            self.get_yahoo_chart_window(
+                stale.symbol, stale.timestamps[-1] - step, now, interval_param
+            ),
+            stale.symbol
+        )
+        if newer is None:
+            return None
+        return stale.merge(newer).trim(now - range_seconds)
+
+    def get_yahoo_quote(self, symbol: str) -> dict[str, Any] | None:
+        """Get current price and quote currency from Yahoo Finance"""
         data = self.get_yahoo_chart_data(symbol, '1d', '5m')
         if data and 'chart' in data and data['chart']['result']:
             result = data['chart']['result'][0]
             if 'meta' in result and 'regularMarketPrice' in result['meta']:
-                return result['meta']['regularMarketPrice']
+                return {
+                    'price': result['meta']['regularMarketPrice'],
+                    'currency': result['meta'].get('currency')
+                }
         return None
 
+    def get_yahoo_current_price(self, symbol: str) -> float | None:
+        """Get current price from Yahoo Finance"""
+        quote = self.get_yahoo_quote(symbol)
+        return quote['price'] if quote else None
+
+    def get_yahoo_quotes(self, symbols: list[str]) -> dict[str, Any]:
+        """
+        Get current quotes for several symbols in one concurrent batch.
+        Adds a 'price_eur' to every quote using one EUR/USD rate, fetched
+        in the same batch unless the FX service has it cached; symbols that
+        fail map to None.
+        """
+        batch = list(dict.fromkeys(symbols))
+        if self.fx_rates.get_cached_rate() is None and EUR_USD_SYMBOL not in batch:
+            batch.append(EUR_USD_SYMBOL)
+
+        def fetch_quote(symbol: str) -> dict[str, Any] | None:
+            try:
+                return self.get_yahoo_quote(symbol)
+            except (requests.RequestException, CircuitOpenError, KeyError, ValueError):
+                return None
+
+        fetched = self.fetch_concurrently(
+            {symbol: (lambda s=symbol: fetch_quote(s)) for symbol in batch}
+        )
+
+        eur_usd_quote = fetched.get(EUR_USD_SYMBOL)
+        if eur_usd_quote and eur_usd_quote['price'] > 0:
+            self.fx_rates.record_rate(eur_usd_quote['price'], CIRCUIT_YAHOO)
+        eur_usd_rate = self.fx_rates.get_eur_usd_rate()
+
+        quotes: dict[str, dict[str, Any] | None] = {}
+        for symbol in symbols:
+            quote = fetched[symbol]
+            if quote is not None:
+                if quote['currency'] == 'USD':
+                    quote['price_eur'] = quote['price'] / eur_usd_rate
+                elif quote['currency'] == 'EUR':
+                    quote['price_eur'] = quote['price']
+            quotes[symbol] = quote
+
+        return {'quotes': quotes, 'eur_usd_rate': eur_usd_rate}
+
     def format_date(self, timestamp: int, period: str) -> str:
         """Format timestamp based on period for chart display"""
-        date_obj = datetime.fromtimestamp(timestamp)
-        if period == '1d':
-            return date_obj.strftime('%H:%M')
-        elif period == '1wk':
-            return date_obj.strftime('%a %H:%M')
-        elif period == '1mo':
-            return date_obj.strftime('%b %d')
-        else:
-            return date_obj.strftime('%b %d')
+        return format_timestamp(timestamp, period)
 
     def parse_yahoo_chart(
         self,
@@ -131,104 +469,104 @@ class APIClient:
         period: str = '1y'
     ) -> tuple[list[str], list[float]] | tuple[None, None]:
         """Parse Yahoo Finance chart data into dates and values"""
-        if not data or 'chart' not in data or not data['chart']['result']:
+        series = PriceSeries.from_yahoo(data)
+        if series is None:
             return None, None
+        return series.labels(period), series.closes.tolist()
 
-        result = data['chart']['result'][0]
-        if 'timestamp' not in result or 'indicators' not in result:
-            return None, None
+    def calculate_stock_score(self, change_pct: float) -> tuple[int, str]:
+        """Calculate stock score and trend description from percentage change"""
+        score, description = STOCK_SCALE.lookup(change_pct)
+        sign = '+' if change_pct >= 0 else ''
+        return score, f"{description} ({sign}{change_pct:.1f}%)"
 
-        timestamps = result['timestamp']
-        closes = result['indicators']['quote'][0]['close']
+    def calculate_currency_score(self, change_pct: float) -> tuple[int, str]:
+        """Calculate currency score and trend description from percentage change"""
+        score, description = CURRENCY_SCALE.lookup(change_pct)
+        sign = '+' if change_pct >= 0 else ''
+        return score, f"{description} ({sign}{change_pct:.1f}%)"
 
-        dates: list[str] = []
-        values: list[float] = []
+    def get_eur_usd_rate(self) -> float:
+        """Get EUR/USD exchange rate from the shared FX rate service"""
+        return self.fx_rates.get_eur_usd_rate()
 
-        for ts, close in zip(timestamps, closes):
-            if close is not None and ts is not None:
-                try:
-                    dates.append(self.format_date(ts, period))
-                    values.append(close)
-                except (ValueError, OSError):
-                    continue
 
-        return dates, values
+# =============================================================================
+# FX RATES
+# =============================================================================
 
-    def calculate_stock_score(self, change_pct: float) -> tuple[int, str]:
-        """Calculate stock score and trend description from percentage change"""
-        for threshold, score, description in STOCK_SCORE_THRESHOLDS:
-            if change_pct >= threshold:
-                sign = '+' if change_pct >= 0 else ''
-                return score, f"{description} ({sign}{change_pct:.1f}%)"
-        return 10, f"Major decline ({change_pct:.1f}%)"
+class FXRateService:
+    """
+    EUR/USD rate shared by every dashboard endpoint.
+    Caches the rate for a TTL and tries each provider in turn, each behind
+    its own circuit breaker. If every provider fails it returns the last
+    known rate, then DEFAULT_EUR_USD_RATE.
+    """
 
-    def calculate_currency_score(self, change_pct: float) -> tuple[int, str]:
-        """Calculate currency score and trend description from percentage change"""
-        for threshold, score, description in CURRENCY_SCORE_THRESHOLDS:
-            if change_pct >= threshold:
-                sign = '+' if change_pct >= 0 else ''
-                return score, f"{description} ({sign}{change_pct:.1f}%)"
-        return 20, f"USD very weak ({change_pct:.1f}%)"
+    def __init__(self, client: APIClient, ttl: int = FX_RATE_TTL) -> None:
+        self.client = client
+        self.ttl = ttl
+        self.providers: list[tuple[str, Callable[[], float | None]]] = [
+            ('yahoo_finance', self._fetch_from_yahoo),
+            ('exchangerate_api', self._fetch_from_exchange_rate_api),
+        ]
+        self._rate: float | None = None
+        self._source: str | None = None
+        self._fetched_at: float = 0.0
+        self._lock = threading.Lock()
+
+    def _fetch_from_yahoo(self) -> float | None:
+        return self.client.get_yahoo_current_price(EUR_USD_SYMBOL)
+
+    def _fetch_from_exchange_rate_api(self) -> float | None:
+        data = self.client.fetch_with_retry(
+            EXCHANGE_RATE_API_URL, retries=1, circuit_name=CIRCUIT_EXCHANGE
+        )
+        if data and 'rates' in data and 'USD' in data['rates']:
+            return data['rates']['USD']
+        return None
+
+    def get_cached_rate(self) -> float | None:
+        """Get the cached rate if it is still within the TTL"""
+        with self._lock:
+            if self._rate is not None and time.time() - self._fetched_at < self.ttl:
+                return self._rate
+        return None
+
+    def record_rate(self, rate: float, source: str) -> None:
+        """Store a rate fetched elsewhere (e.g. in a quote batch)"""
+        with self._lock:
+            self._rate = rate
+            self._source = source
+            self._fetched_at = time.time()
 
-    @lru_cache(maxsize=32)
     def get_eur_usd_rate(self) -> float:
-        """Get EUR/USD exchange rate with caching"""
-        try:
-            data = self.get_yahoo_chart_data('EURUSD=X', '1d', '5m')
-            if data and 'chart' in data and data['chart']['result']:
-                result = data['chart']['result'][0]
-                if 'meta' in result and 'regularMarketPrice' in result['meta']:
-                    return result['meta']['regularMarketPrice']
-        except (requests.RequestException, KeyError, ValueError):
-            pass
-
-        # Fallback to alternative API
-        try:
-            response = requests.get(
-                'https://api.exchangerate-api.com/v4/latest/EUR',
-                timeout=3
-            )
-            if response.status_code == 200:
-                data = response.json()
-                if 'rates' in data and 'USD' in data['rates']:
-                    return data['rates']['USD']
-        except (requests.RequestException, KeyError, ValueError):
-            pass
-
-        return DEFAULT_EUR_USD_RATE
-
-    def get_eur_usd_rate_with_fallback(self) -> float:
-        """Get EUR/USD rate with multiple fallback attempts (uncached)"""
-        # Try Yahoo Finance first
-        try:
-            response = requests.get(
-                f'{YAHOO_FINANCE_URL}/EURUSD=X',
-                headers=self.headers,
-                timeout=5
-            )
-            if response.status_code == 200:
-                data = response.json()
-                if 'chart' in data and data['chart']['result']:
-                    result = data['chart']['result'][0]
-                    if 'meta' in result and 'regularMarketPrice' in result['meta']:
-                        return result['meta']['regularMarketPrice']
-        except (requests.RequestException, KeyError, ValueError):
-            pass
-
-        # Fallback to alternative API
-        try:
-            response = requests.get(
-                'https://api.exchangerate-api.com/v4/latest/EUR',
-                timeout=3
-            )
-            if response.status_code == 200:
-                data = response.json()
-                if 'rates' in data and 'USD' in data['rates']:
-                    return data['rates']['USD']
-        except (requests.RequestException, KeyError, ValueError):
-            pass
+        """Get EUR/USD rate from cache or the first provider that answers"""
+        cached = self.get_cached_rate()
+        if cached is not None:
+            return cached
 
-        return DEFAULT_EUR_USD_RATE
+        for source, provider in self.providers:
+            try:
+                rate = provider()
+            except (requests.RequestException, CircuitOpenError, KeyError, ValueError, TypeError):
+                continue
+            if rate and rate > 0:
+                self.record_rate(rate, source)
+                return rate
+
+        with self._lock:
+            return self._rate if self._rate is not None else DEFAULT_EUR_USD_RATE
+
+    def get_status(self) -> dict[str, Any]:
+        """Get the cached rate, where it came from and how old it is"""
+        with self._lock:
+            return {
+                'rate': self._rate,
+                'source': self._source,
+                'age_seconds': round(time.time() - self._fetched_at) if self._rate else None,
+                'ttl': self.ttl
+            }
 
 
 # =============================================================================
@@ -250,7 +588,7 @@ def fetch_with_timeout(
     if headers:
         default_headers.update(headers)
 
-    return requests.request(
+    return api_client.request(
         method,
         url,
         headers=default_headers,
@@ -0,0 +1,315 @@
+"""
+Wikipedia artist image resolver for Music Next
+
+Artist image URLs are cached in memory and in SQLite for IMAGE_TTL, and
+artists with no image are remembered for MISSING_TTL so they aren't
+looked up on every page view. Uncached artists are resolved together:
+one batched pageimages query for all their titles, then an opensearch per
+artist still missing (a few at a time) and one more batched pageimages
+query for the titles those searches found. A background worker resolves
+the next few pending recommendations ahead of time.
+"""
+from __future__ import annotations
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+from typing import Any, Iterable
+
+import requests
+
+from utils.api_client import api_client, TIMEOUT_SHORT
+from utils.metrics import CACHE_REQUESTS
+from utils.music_store import MUSIC_DB_PATH
+
+logger = logging.getLogger(__name__)
+
+# =============================================================================
+# CONSTANTS
+# =============================================================================
+
+WIKIPEDIA_API = 'https://en.wikipedia.org/w/api.php'
+WIKIPEDIA_HEADERS = {'User-Agent': 'Skye/1.0'}
+
+IMAGE_TTL = 30 * 24 * 3600     # Keep a found image URL this long
+MISSING_TTL = 3 * 24 * 3600    # Remember that an artist has no image this long
+
+PAGEIMAGES_BATCH = 50          # Max titles per pageimages query (API limit)
+SEARCH_CONCURRENCY = 4         # Opensearch requests run at once for one batch
+PREFETCH_COUNT = 5             # Upcoming recommendations resolved in the background
+PREFETCH_MAX_QUEUE = 100       # Artists waiting to be prefetched before new ones are dropped
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS artist_images (
+    artist_key TEXT PRIMARY KEY,
+    image_url TEXT,
+    checked_at REAL NOT NULL
+)
+'''
+
+
+class ArtistImageResolver:
+    """Artist -> Wikipedia image URL (or None), cached in memory and SQLite"""
+
+    def __init__(self, path: str = MUSIC_DB_PATH) -> None:
+        self.path = path
+        self._local = threading.local()
+        self._ready = False
+        # artist_key -> (image_url or None, checked_at)
+        self._entries: dict[str, tuple[str | None, float]] = {}
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'lookups': 0, 'failed': 0}
+
+        self._prefetch_queue: queue.Queue[str] = queue.Queue(PREFETCH_MAX_QUEUE)
+        self._queued: set[str] = set()
+        self._worker: threading.Thread | None = None
+
+    # -------------------------------------------------------------------------
+    # Storage
+    # -------------------------------------------------------------------------
+
+    def _conn(self) -> sqlite3.Connection:
+        """Get this thread's connection, creating the table on first use"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        if not self._ready:
+            conn.execute(SCHEMA)
+            self._ready = True
+        return conn
+
+    def _cached(self, artist_key: str) -> tuple[bool, str | None]:
+        """(whether a fresh entry exists, its image URL)"""
+        with self._lock:
+            entry = self._entries.get(artist_key)
+        if entry is None:
+            row = self._conn().execute(
+                'SELECT image_url, checked_at FROM artist_images WHERE artist_key = ?', (artist_key,)
+            ).fetchone()
+            if row is None:
+                return False, None
+            entry = (row[0], row[1])
+            with self._lock:
+                self._entries[artist_key] = entry
+
+        image_url, checked_at = entry
+        ttl = IMAGE_TTL if image_url else MISSING_TTL
+        return time.time() - checked_at < ttl, image_url
+
+    def _save(self, images: dict[str, str | None]) -> None:
+        now = time.time()
+        rows = [(artist.lower(), image_url, now) for artist, image_url in images.items()]
+        with self._lock:
+            for artist_key, image_url, checked_at in rows:
+                self._entries[artist_key] = (image_url, checked_at)
+        self._conn().executemany(
+            'INSERT OR REPLACE INTO artist_images (artist_key, image_url, checked_at) VALUES (?, ?, ?)', rows
+        )
+
+    def _count(self, stat: str, amount: int = 1) -> None:
+        with self._lock:
+            self._stats[stat] += amount
+
+    # -------------------------------------------------------------------------
+    # Wikipedia lookups
+    # -------------------------------------------------------------------------
+
+    def _pageimages(self, titles: list[str]) -> dict[str, str | None]:
+        """
+        Original image URL of each title's page (None if it has none),
+        following redirects. Titles containing '|' (the separator, never
+        part of a real title) can't be queried and are left out.
+        """
+        images: dict[str, str | None] = {}
+        titles = [title for title in titles if '|' not in title]
+
+        for i in range(0, len(titles), PAGEIMAGES_BATCH):
+            batch = titles[i:i + PAGEIMAGES_BATCH]
+            response = api_client.get(WIKIPEDIA_API, params={
+                'action': 'query',
+                'format': 'json',
+                'formatversion': 2,
+                'prop': 'pageimages',
+                'piprop': 'original',
+                'redirects': 1,
+                'titles': '|'.join(batch)
+            }, headers=WIKIPEDIA_HEADERS, timeout=TIMEOUT_SHORT)
+            response.raise_for_status()
+            self._count('lookups')
+
+            query = response.json().get('query', {})
+            renamed = {item['from']: item['to'] for item in query.get('normalized', []) + query.get('redirects', [])}
+            sources = {page['title']: page['original']['source'] for page in query.get('pages', []) if 'original' in page}
+
+            for title in batch:
+                # Requested title -> normalized title -> redirect target
+                page_title = title
+                for _ in range(2):
+                    page_title = renamed.get(page_title, page_title)
+                images[title] = sources.get(page_title)
+        return images
+
+    def _search_title(self, artist: str) -> str | None:
+        """Title of the first Wikipedia search result for an artist"""
+        response = api_client.get(WIKIPEDIA_API, params={
+            'action': 'opensearch',
+            'format': 'json',
+            'search': artist,
+            'limit': 1
+        }, headers=WIKIPEDIA_HEADERS, timeout=TIMEOUT_SHORT)
+        response.raise_for_status()
+        self._count('lookups')
+
+        search_data = response.json()
+        if len(search_data) > 1 and search_data[1]:
+            return search_data[1][0]
+        return None
+
+    def _search_titles(self, artists: list[str]) -> dict[str, str | None]:
+        """
+        Search titles for artists, SEARCH_CONCURRENCY at a time. An artist
+        whose search fails is left out (and logged) so the rest of the
+        batch still resolves.
+        """
+        def search(artist: str) -> tuple[bool, str | None]:
+            try:
+                return True, self._search_title(artist)
+            except (requests.exceptions.RequestException, ValueError) as e:
+                self._count('failed')
+                logger.warning(f"Wikipedia search failed for {artist}: {e}")
+                return False, None
+
+        titles: dict[str, str | None] = {}
+        for i in range(0, len(artists), SEARCH_CONCURRENCY):
+            chunk = artists[i:i + SEARCH_CONCURRENCY]
+            results = api_client.fetch_concurrently({
+                artist: (lambda artist=artist: search(artist)) for artist in chunk
+            })
+            titles.update({artist: title for artist, (ok, title) in results.items() if ok})
+        return titles
+
+    def _lookup(self, artists: list[str]) -> dict[str, str | None]:
+        """
+        Resolve uncached artists against Wikipedia. Only artists that were
+        actually looked up are returned, so a miss is never recorded for
+        one that couldn't be queried.
+        """
+        images = self._pageimages(artists)
+
+        # Artists whose name isn't a page with an image (or can't be queried
+        # as a title): search for their page
+        unresolved = [artist for artist in artists if not images.get(artist)]
+        if unresolved:
+            titles = self._search_titles(unresolved)
+            found = {artist: title for artist, title in titles.items() if title}
+            title_images = self._pageimages(sorted(set(found.values()))) if found else {}
+            for artist in unresolved:
+                title = found.get(artist)
+                if artist not in titles:
+                    # Search failed: try again next time rather than caching a miss
+                    images.pop(artist, None)
+                elif title is None:
+                    images[artist] = None
+                elif title in title_images:
+                    images[artist] = title_images[title]
+                else:
+                    images.pop(artist, None)
+        return images
+
+    def resolve_many(self, artists: Iterable[str]) -> dict[str, str | None]:
+        """Image URL (or None) for each artist; uncached artists are looked up together"""
+        results: dict[str, str | None] = {}
+        uncached: dict[str, str] = {}
+        for artist in artists:
+            fresh, image_url = self._cached(artist.lower())
+            if fresh:
+                results[artist] = image_url
+            else:
+                uncached.setdefault(artist.lower(), artist)
+
+        self._count('hits', len(results))
+        CACHE_REQUESTS.inc('artist_image', 'hit', amount=len(results))
+        if uncached:
+            self._count('misses', len(uncached))
+            CACHE_REQUESTS.inc('artist_image', 'miss', amount=len(uncached))
+            images = self._lookup(list(uncached.values()))
+            self._save(images)
+            for artist in uncached.values():
+                results[artist] = images.get(artist)
+        return results
+
+    def resolve(self, artist: str) -> str | None:
+        """Image URL for one artist (None if Wikipedia has none)"""
+        artist_key = artist.lower()
+        fresh, image_url = self._cached(artist_key)
+        if fresh:
+            self._count('hits')
+            CACHE_REQUESTS.inc('artist_image', 'hit')
+            return image_url
+        # Shares the lookup with a prefetch or request already resolving this artist
+        return api_client.inflight.do(f'artist-image:{artist_key}', lambda: self.resolve_many([artist])[artist])
+
+    # -------------------------------------------------------------------------
+    # Background prefetch
+    # -------------------------------------------------------------------------
+
+    def prefetch(self, artists: Iterable[str]) -> None:
+        """Queue artists not looked up yet to be resolved in the background"""
+        for artist in artists:
+            artist_key = artist.lower()
+            with self._lock:
+                if artist_key in self._queued or artist_key in self._entries:
+                    continue
+                self._queued.add(artist_key)
+                if self._worker is None:
+                    self._worker = threading.Thread(
+                        target=self._prefetch_loop, name='artist-image-prefetch', daemon=True
+                    )
+                    self._worker.start()
+            try:
+                self._prefetch_queue.put_nowait(artist)
+            except queue.Full:
+                with self._lock:
+                    self._queued.discard(artist_key)
+                return
+
+    def _prefetch_loop(self) -> None:
+        while True:
+            # Resolve everything queued so far in one batch
+            batch = [self._prefetch_queue.get()]
+            while True:
+                try:
+                    batch.append(self._prefetch_queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self.resolve_many(batch)
+            except (requests.exceptions.RequestException, ValueError) as e:
+                self._count('failed')
+                logger.warning(f"Artist image prefetch failed: {e}")
+            except Exception as e:
+                self._count('failed')
+                logger.error(f"Artist image prefetch error: {e}")
+            finally:
+                with self._lock:
+                    for artist in batch:
+                        self._queued.discard(artist.lower())
+
+    def get_status(self) -> dict[str, Any]:
+        """Get cache counters and prefetch state"""
+        with self._lock:
+            return {
+                'cached': len(self._entries),
+                'prefetch_queue': len(self._queued),
+                **self._stats
+            }
+
+
+# Global instance
+artist_images = ArtistImageResolver()
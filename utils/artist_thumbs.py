@@ -0,0 +1,299 @@
+"""
+Artist image thumbnails for Music Next
+
+Wikipedia's original artist images are often multi-megabyte JPEGs shown
+in a 250px box. Each one is downloaded once, scaled so its shorter side
+is the requested size (Pillow, optional), and stored in a content-addressed
+disk cache: blobs are named by the SHA-256 of their bytes, and an index
+in the Music Next SQLite database maps (image URL, size) to a blob, so
+the digest doubles as a strong ETag. Without Pillow the original bytes
+are cached and served unchanged.
+"""
+from __future__ import annotations
+import hashlib
+import io
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any
+
+from utils.api_client import api_client, TIMEOUT_DEFAULT
+from utils.artist_images import WIKIPEDIA_HEADERS
+from utils.cache import DEFAULT_CACHE_DIR
+from utils.config import get_config_value
+from utils.metrics import CACHE_REQUESTS
+from utils.music_store import MUSIC_DB_PATH
+
+logger = logging.getLogger(__name__)
+
+# =============================================================================
+# CONSTANTS
+# =============================================================================
+
+THUMB_SIZE = 500               # Default shorter side (px): the 250px box at 2x
+THUMB_MIN_SIZE = 32
+THUMB_MAX_SIZE = 1024
+THUMB_QUALITY = 85             # JPEG quality of resized thumbnails
+THUMB_MAX_AGE = 7 * 24 * 3600  # Cache-Control max-age for served thumbnails
+THUMB_DIR_NAME = 'artist-thumbs'
+
+MAX_SOURCE_BYTES = 25 * 1024 * 1024  # Refuse to download larger originals
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+EXTENSIONS = {'image/jpeg': '.jpg', 'image/png': '.png', 'image/gif': '.gif',
+              'image/webp': '.webp', 'image/svg+xml': '.svg'}
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS artist_thumbs (
+    image_url TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    digest TEXT NOT NULL,
+    content_type TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (image_url, size)
+)
+'''
+
+
+class ImageTooLarge(Exception):
+    """Raised when an original image is over MAX_SOURCE_BYTES or too many pixels to decode"""
+    pass
+
+
+def _load_pillow():
+    """PIL.Image, or None if Pillow isn't installed"""
+    try:
+        from PIL import Image
+    except ImportError:
+        return None
+    return Image
+
+
+def resize_image(data: bytes, size: int) -> tuple[bytes, str] | None:
+    """
+    Scale an image so its shorter side is at most size px, as JPEG (PNG if
+    it has transparency). None if Pillow is missing or can't decode it;
+    raises ImageTooLarge if Pillow refuses it as a decompression bomb.
+    """
+    Image = _load_pillow()
+    if Image is None:
+        return None
+    from PIL import ImageOps, UnidentifiedImageError
+
+    try:
+        with Image.open(io.BytesIO(data)) as image:
+            scale = size / min(image.size)
+            if scale < 1:
+                # JPEGs can be decoded straight at a reduced scale
+                image.draft('RGB', (round(image.width * scale), round(image.height * scale)))
+            image = ImageOps.exif_transpose(image)
+            scale = size / min(image.size)
+            if scale < 1:
+                target = (max(1, round(image.width * scale)), max(1, round(image.height * scale)))
+                image = image.resize(target, Image.Resampling.LANCZOS, reducing_gap=2.0)
+
+            out = io.BytesIO()
+            if image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info):
+                image.save(out, 'PNG', optimize=True)
+                return out.getvalue(), 'image/png'
+            image.convert('RGB').save(out, 'JPEG', quality=THUMB_QUALITY, optimize=True, progressive=True)
+            return out.getvalue(), 'image/jpeg'
+    except Image.DecompressionBombError as e:
+        raise ImageTooLarge(f"Artist image has too many pixels: {e}") from e
+    except (UnidentifiedImageError, OSError, ValueError) as e:
+        logger.warning(f"Could not resize artist image: {e}")
+        return None
+
+
+class Thumbnail:
+    """A cached thumbnail blob"""
+
+    __slots__ = ('path', 'digest', 'content_type')
+
+    def __init__(self, path: str, digest: str, content_type: str) -> None:
+        self.path = path
+        self.digest = digest
+        self.content_type = content_type
+
+
+class ArtistThumbnails:
+    """(image URL, size) -> thumbnail in a content-addressed disk cache"""
+
+    def __init__(self, path: str = MUSIC_DB_PATH, directory: str | None = None) -> None:
+        self.path = path
+        self._directory = directory
+        self._local = threading.local()
+        self._ready = False
+        self._index: dict[tuple[str, int], tuple[str, str]] = {}
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'resized': 0, 'unresized': 0, 'bytes_in': 0, 'bytes_out': 0}
+        self._pillow: bool | None = None
+
+    # -------------------------------------------------------------------------
+    # Settings
+    # -------------------------------------------------------------------------
+
+    @property
+    def directory(self) -> str:
+        """Blob directory: music_next.thumb_dir, else artist-thumbs/ under the cache dir"""
+        if self._directory is None:
+            settings = get_config_value('music_next', {}) or {}
+            cache_dir = (get_config_value('cache', {}) or {}).get('dir') or DEFAULT_CACHE_DIR
+            self._directory = settings.get('thumb_dir') or os.path.join(cache_dir, THUMB_DIR_NAME)
+        return self._directory
+
+    @staticmethod
+    def default_size() -> int:
+        """Thumbnail size from the music_next.thumb_size config key"""
+        settings = get_config_value('music_next', {}) or {}
+        try:
+            return int(settings.get('thumb_size', THUMB_SIZE))
+        except (TypeError, ValueError):
+            return THUMB_SIZE
+
+    @staticmethod
+    def clamp_size(size: int) -> int:
+        return max(THUMB_MIN_SIZE, min(THUMB_MAX_SIZE, size))
+
+    @property
+    def pillow_available(self) -> bool:
+        if self._pillow is None:
+            self._pillow = _load_pillow() is not None
+            if not self._pillow:
+                logger.warning("Pillow not installed, serving artist images at full size (pip install -r requirements.txt)")
+        return self._pillow
+
+    # -------------------------------------------------------------------------
+    # Storage
+    # -------------------------------------------------------------------------
+
+    def _conn(self) -> sqlite3.Connection:
+        """Get this thread's connection, creating the table on first use"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        if not self._ready:
+            conn.execute(SCHEMA)
+            self._ready = True
+        return conn
+
+    def _blob_path(self, digest: str, content_type: str) -> str:
+        return os.path.join(self.directory, digest[:2], digest + EXTENSIONS.get(content_type, ''))
+
+    def _cached(self, image_url: str, size: int) -> Thumbnail | None:
+        with self._lock:
+            entry = self._index.get((image_url, size))
+        if entry is None:
+            row = self._conn().execute(
+                'SELECT digest, content_type FROM artist_thumbs WHERE image_url = ? AND size = ?',
+                (image_url, size)
+            ).fetchone()
+            if row is None:
+                return None
+            entry = (row[0], row[1])
+            with self._lock:
+                self._index[(image_url, size)] = entry
+
+        digest, content_type = entry
+        path = self._blob_path(digest, content_type)
+        # The blob may have been cleared from the cache directory
+        return Thumbnail(path, digest, content_type) if os.path.exists(path) else None
+
+    def _store(self, image_url: str, size: int, data: bytes, content_type: str) -> Thumbnail:
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._blob_path(digest, content_type)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f'{path}.{threading.get_ident()}.tmp'
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+
+        with self._lock:
+            self._index[(image_url, size)] = (digest, content_type)
+        self._conn().execute(
+            'INSERT OR REPLACE INTO artist_thumbs (image_url, size, digest, content_type, created_at) '
+            'VALUES (?, ?, ?, ?, ?)',
+            (image_url, size, digest, content_type, time.time())
+        )
+        return Thumbnail(path, digest, content_type)
+
+    def _count(self, stat: str, amount: int = 1) -> None:
+        with self._lock:
+            self._stats[stat] += amount
+
+    # -------------------------------------------------------------------------
+    # Thumbnails
+    # -------------------------------------------------------------------------
+
+    @staticmethod
+    def _download(response) -> bytes:
+        """
+        Read a streamed response body, raising ImageTooLarge as soon as it
+        is known to be over MAX_SOURCE_BYTES (from Content-Length, else
+        while reading)
+        """
+        length = response.headers.get('Content-Length', '')
+        if length.isdigit() and int(length) > MAX_SOURCE_BYTES:
+            raise ImageTooLarge(f"Artist image too large ({length} bytes)")
+
+        chunks = []
+        total = 0
+        for chunk in response.iter_content(DOWNLOAD_CHUNK_SIZE):
+            total += len(chunk)
+            if total > MAX_SOURCE_BYTES:
+                raise ImageTooLarge(f"Artist image too large (over {MAX_SOURCE_BYTES} bytes)")
+            chunks.append(chunk)
+        return b''.join(chunks)
+
+    def _create(self, image_url: str, size: int) -> Thumbnail:
+        """Download an original image and cache its thumbnail"""
+        response = api_client.get(image_url, headers=WIKIPEDIA_HEADERS, timeout=TIMEOUT_DEFAULT, stream=True)
+        with response:
+            response.raise_for_status()
+            data = self._download(response)
+        self._count('bytes_in', len(data))
+
+        resized = resize_image(data, size) if self.pillow_available else None
+        if resized is not None:
+            self._count('resized')
+            data, content_type = resized
+        else:
+            self._count('unresized')
+            content_type = response.headers.get('Content-Type', 'image/jpeg').split(';')[0].strip()
+        self._count('bytes_out', len(data))
+        return self._store(image_url, size, data, content_type)
+
+    def get(self, image_url: str, size: int) -> Thumbnail:
+        """Thumbnail of an image URL, downloading and resizing it the first time"""
+        if not self.pillow_available:
+            # Originals are served whatever the size, so cache them once
+            size = 0
+        thumbnail = self._cached(image_url, size)
+        if thumbnail is not None:
+            self._count('hits')
+            CACHE_REQUESTS.inc('artist_thumb', 'hit')
+            return thumbnail
+
+        self._count('misses')
+        CACHE_REQUESTS.inc('artist_thumb', 'miss')
+        return api_client.inflight.do(f'artist-thumb:{size}:{image_url}', lambda: self._create(image_url, size))
+
+    def get_status(self) -> dict[str, Any]:
+        """Get cache counters"""
+        with self._lock:
+            return {
+                'pillow': self._pillow,
+                'cached': len(self._index),
+                **self._stats
+            }
+
+
+# Global instance
+artist_thumbs = ArtistThumbnails()
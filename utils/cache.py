@@ -2,11 +2,43 @@
 Cache configuration for Skye application
 Uses Flask-Caching for response caching with TTL support
 """
+from __future__ import annotations
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import wraps
+from typing import Any, Callable
+
+from flask import current_app, request
 from flask_caching import Cache
 
+from utils.circuit_breaker import circuit_registry, CircuitState
+from utils.config import get_config_value
+from utils.metrics import CACHE_REQUESTS
+
 # Cache instance - initialized with app in init_cache()
 cache = Cache()
 
+# Backend selected by the "cache.backend" config key (CACHE_BACKEND env var):
+# 'simple' (per-process), 'filesystem', 'sqlite' or 'redis'
+CACHE_BACKENDS = ('simple', 'filesystem', 'sqlite', 'redis')
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), '.cache')
+
+# Namespace and version prefixed to persisted keys; bump the version when the
+# shape of cached values changes so old entries are ignored
+CACHE_NAMESPACE = 'skye'
+CACHE_VERSION = 1
+
+# Max entries kept by the filesystem and SQLite backends
+CACHE_THRESHOLD = 5000
+
+# Key written once at startup to check a shared backend is reachable
+BACKEND_PROBE_KEY = 'skye:backend-probe'
+
+# Backend actually in use, set by init_cache()
+cache_backend = 'simple'
+
 # Cache timeout constants (in seconds)
 CACHE_TIMEOUT_PRICE = 60        # Current prices - near real-time
 CACHE_TIMEOUT_CHART = 300       # Chart data - 5 minutes
@@ -15,11 +47,221 @@ CACHE_TIMEOUT_RECOMMENDATION = 600  # Recommendations - 10 minutes
 CACHE_TIMEOUT_WEATHER = 900     # Weather data - 15 minutes
 CACHE_TIMEOUT_SUN = 3600        # Sun times - 1 hour
 
+# Hard limits on how stale a stale-while-revalidate entry may be served (seconds)
+CACHE_MAX_AGE_PRICE = 900       # 15 minutes
+CACHE_MAX_AGE_CHART = 3600      # 1 hour
+CACHE_MAX_AGE_PORTFOLIO = 1800  # 30 minutes
+CACHE_MAX_AGE_RECOMMENDATION = 3600  # 1 hour
+CACHE_MAX_AGE_WEATHER = 10800   # 3 hours
+CACHE_MAX_AGE_SUN = 21600       # 6 hours
+
+# Response header reporting whether a stale-while-revalidate response was fresh
+FRESHNESS_HEADER = 'X-Data-Freshness'
+
+# Background workers refreshing stale entries
+SWR_REFRESH_WORKERS = 2
+
+_refresh_executor = ThreadPoolExecutor(
+    max_workers=SWR_REFRESH_WORKERS, thread_name_prefix='swr-refresh'
+)
+_refreshing: set[str] = set()
+_refreshing_lock = threading.Lock()
+
+
+def _backend_config(backend: str, settings: dict[str, Any]) -> dict[str, Any]:
+    """Build the Flask-Caching config for a backend name"""
+    config: dict[str, Any] = {'CACHE_DEFAULT_TIMEOUT': 300}
+    cache_dir = settings.get('dir') or DEFAULT_CACHE_DIR
+    namespace = f'{CACHE_NAMESPACE}-v{CACHE_VERSION}'
+
+    if backend == 'filesystem':
+        config.update({
+            'CACHE_TYPE': 'FileSystemCache',
+            'CACHE_DIR': os.path.join(cache_dir, namespace),
+            'CACHE_THRESHOLD': CACHE_THRESHOLD
+        })
+    elif backend == 'sqlite':
+        config.update({
+            'CACHE_TYPE': 'utils.sqlite_cache.SQLiteCache',
+            'CACHE_SQLITE_PATH': os.path.join(cache_dir, 'cache.sqlite3'),
+            'CACHE_KEY_PREFIX': f'{namespace}:',
+            'CACHE_THRESHOLD': CACHE_THRESHOLD
+        })
+    elif backend == 'redis':
+        config.update({
+            'CACHE_TYPE': 'RedisCache',
+            'CACHE_REDIS_URL': settings.get('redis_url') or 'redis://localhost:6379/0',
+            'CACHE_KEY_PREFIX': f'{namespace}:'
+        })
+    else:
+        config['CACHE_TYPE'] = 'SimpleCache'
+    return config
+
 
 def init_cache(app):
-    """Initialize cache with Flask app"""
-    cache.init_app(app, config={
-        'CACHE_TYPE': 'SimpleCache',
-        'CACHE_DEFAULT_TIMEOUT': 300
-    })
+    """Initialize cache with Flask app using the configured backend"""
+    global cache_backend
+
+    settings = get_config_value('cache', {}) or {}
+    backend = str(settings.get('backend', 'simple')).lower()
+    if backend not in CACHE_BACKENDS:
+        app.logger.warning(f"Unknown cache backend '{backend}', using simple")
+        backend = 'simple'
+
+    try:
+        cache.init_app(app, config=_backend_config(backend, settings))
+        if backend != 'simple':
+            # Redis connects lazily, so an unreachable server would only
+            # fail on the first request; write a key now instead
+            with app.app_context():
+                if not cache.set(BACKEND_PROBE_KEY, 1, timeout=1):
+                    raise RuntimeError('probe write failed')
+                cache.delete(BACKEND_PROBE_KEY)
+    except Exception as e:
+        # e.g. redis package missing or server down - fall back to the per-process cache
+        app.logger.warning(f"Cache backend '{backend}' unavailable ({e}), using simple")
+        backend = 'simple'
+        cache.init_app(app, config=_backend_config(backend, settings))
+
+    cache_backend = backend
+    app.logger.info(f"Cache initialized with '{backend}' backend")
     return cache
+
+
+def is_persistent_cache() -> bool:
+    """Whether the cache outlives this process (and should not be cleared on exit)"""
+    return cache_backend != 'simple'
+
+
+def _swr_key(query_string: bool) -> str:
+    """Build the cache key for the current request"""
+    if not query_string:
+        return f'swr/{request.path}'
+    args = '&'.join(f'{k}={v}' for k, v in sorted(request.args.items(multi=True)))
+    return f'swr/{request.path}?{args}'
+
+
+def _is_circuit_open(circuit_name: str | None) -> bool:
+    """Check whether the named circuit breaker is currently open"""
+    if circuit_name is None:
+        return False
+    return circuit_registry.get(circuit_name).get_status()['state'] == CircuitState.OPEN.value
+
+
+def _store_response(key: str, response, max_age: int) -> None:
+    """Cache a successful response body so it can be replayed later"""
+    if response.status_code != 200 or response.direct_passthrough:
+        return
+    cache.set(key, {
+        'data': response.get_data(),
+        'mimetype': response.mimetype,
+        'stored_at': time.time()
+    }, timeout=max_age)
+
+
+def _replay_response(entry: dict[str, Any], freshness: str):
+    """Rebuild a response from a cached entry"""
+    response = current_app.response_class(entry['data'], mimetype=entry['mimetype'])
+    response.headers[FRESHNESS_HEADER] = freshness
+    response.headers['Age'] = str(int(time.time() - entry['stored_at']))
+    return response
+
+
+def _schedule_refresh(
+    key: str,
+    view: Callable,
+    args: tuple,
+    kwargs: dict[str, Any],
+    max_age: int
+) -> None:
+    """Re-run a view on a background worker and store its response"""
+    with _refreshing_lock:
+        if key in _refreshing:
+            return
+        _refreshing.add(key)
+
+    app = current_app._get_current_object()
+    path = request.full_path
+
+    def refresh() -> None:
+        try:
+            with app.test_request_context(path):
+                response = app.make_response(view(*args, **kwargs))
+                _store_response(key, response, max_age)
+        except Exception as e:
+            app.logger.warning(f"Background refresh failed for {path}: {e}")
+        finally:
+            with _refreshing_lock:
+                _refreshing.discard(key)
+
+    _refresh_executor.submit(refresh)
+
+
+def cached_swr(
+    timeout: int,
+    max_age: int,
+    query_string: bool = False,
+    circuit_name: str | None = None
+):
+    """
+    Stale-while-revalidate response cache, used like cache.cached.
+
+    Responses younger than timeout are served as-is. Older ones, up to
+    max_age, are served immediately while a background worker refreshes
+    them. If circuit_name's breaker is open, the refresh is skipped and
+    the stale copy is served instead of a 503. The X-Data-Freshness
+    header reports 'fresh' or 'stale'.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            key = _swr_key(query_string)
+            entry = cache.get(key)
+
+            if entry is not None:
+                age = time.time() - entry['stored_at']
+                if age < timeout:
+                    CACHE_REQUESTS.inc('swr', 'hit')
+                    return _replay_response(entry, 'fresh')
+                if age < max_age:
+                    if not _is_circuit_open(circuit_name):
+                        _schedule_refresh(key, f, args, kwargs, max_age)
+                    CACHE_REQUESTS.inc('swr', 'stale')
+                    return _replay_response(entry, 'stale')
+
+            CACHE_REQUESTS.inc('swr', 'miss')
+            response = current_app.make_response(f(*args, **kwargs))
+            if response.status_code == 200:
+                _store_response(key, response, max_age)
+                response.headers[FRESHNESS_HEADER] = 'fresh'
+            return response
+
+        decorated_function.swr_options = {
+            'timeout': timeout,
+            'max_age': max_age,
+            'query_string': query_string,
+            'circuit_name': circuit_name
+        }
+        return decorated_function
+    return decorator
+
+
+def prefetch(app, path: str, lead: int = 0) -> str:
+    """
+    Refresh the cached_swr entry for path if it expires within lead seconds.
+    Returns 'fresh' if no refresh was needed, otherwise 'refreshed' or 'failed'.
+    """
+    with app.test_request_context(path):
+        view = app.view_functions[request.endpoint]
+        options = getattr(view, 'swr_options', None)
+        if options is None:
+            raise ValueError(f"{request.path} is not cached with cached_swr")
+
+        key = _swr_key(options['query_string'])
+        entry = cache.get(key)
+        if entry is not None and time.time() - entry['stored_at'] < options['timeout'] - lead:
+            return 'fresh'
+
+        response = app.make_response(view.__wrapped__(**request.view_args))
+        _store_response(key, response, options['max_age'])
+        return 'refreshed' if response.status_code == 200 else 'failed'
@@ -23,7 +23,18 @@ def load_config():
         'USER_NAME': 'user_name',
         'AMZN_SHARES': ('portfolio', 'amzn_shares'),
         'CASH_ASSETS_EUR': ('portfolio', 'cash_assets_eur'),
-        'XRP_QUANTITY': ('portfolio', 'xrp_quantity')
+        'XRP_QUANTITY': ('portfolio', 'xrp_quantity'),
+        'CACHE_BACKEND': ('cache', 'backend'),
+        'CACHE_DIR': ('cache', 'dir'),
+        'CACHE_REDIS_URL': ('cache', 'redis_url'),
+        'LOG_ARCHIVE': ('logs', 'archive'),
+        'LOG_DIR': ('logs', 'dir'),
+        'LOG_COMPRESSION': ('logs', 'compression'),
+        'LOG_SEGMENT_MB': ('logs', 'segment_mb'),
+        'LOG_SEGMENT_HOURS': ('logs', 'segment_hours'),
+        'LOG_RETENTION_MB': ('logs', 'retention_mb'),
+        'MUSIC_THUMB_SIZE': ('music_next', 'thumb_size'),
+        'MUSIC_THUMB_DIR': ('music_next', 'thumb_dir')
     }
     
     placeholders = ['your_api_key_here', 'your_key_here', 'your_gemini_api_key_here', 'your_youtube_api_key_here', 'your_client_id_here', 'your_client_secret_here']
@@ -0,0 +1,119 @@
+"""
+Pooled HTTP sessions for outbound API calls
+
+Keeps one keep-alive requests.Session per upstream host so repeat calls
+to the same API (Yahoo Finance, Met Éireann, ...) reuse an open TCP/TLS
+connection instead of paying a fresh handshake on every request. The
+sessions are shared by every caller, so they never store cookies: a
+Set-Cookie from one upstream is not sent back on unrelated later calls.
+"""
+from __future__ import annotations
+import threading
+from http.cookiejar import DefaultCookiePolicy
+from typing import Any
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# =============================================================================
+# CONSTANTS
+# =============================================================================
+
+# Number of host pools each session's adapter keeps (covers redirects)
+POOL_CONNECTIONS: int = 4
+
+# Default max connections kept open per host
+POOL_MAXSIZE: int = 10
+
+# Block when a host's pool is exhausted instead of opening extra connections
+POOL_BLOCK: bool = False
+
+# Keep connections open between requests
+KEEP_ALIVE: bool = True
+
+# Per-host overrides of POOL_MAXSIZE for the busiest upstreams
+HOST_POOL_LIMITS: dict[str, int] = {
+    'query1.finance.yahoo.com': 20,
+}
+
+
+class SessionPool:
+    """Registry of per-host, connection-pooled requests sessions"""
+
+    def __init__(
+        self,
+        pool_maxsize: int = POOL_MAXSIZE,
+        pool_connections: int = POOL_CONNECTIONS,
+        pool_block: bool = POOL_BLOCK,
+        keep_alive: bool = KEEP_ALIVE,
+        host_limits: dict[str, int] | None = None
+    ) -> None:
+        self.pool_maxsize = pool_maxsize
+        self.pool_connections = pool_connections
+        self.pool_block = pool_block
+        self.keep_alive = keep_alive
+        self.host_limits: dict[str, int] = dict(
+            HOST_POOL_LIMITS if host_limits is None else host_limits
+        )
+        self._sessions: dict[str, requests.Session] = {}
+        self._lock = threading.Lock()
+
+    def _create_session(self, host: str) -> requests.Session:
+        """Build a session whose adapters are sized for the given host"""
+        maxsize = self.host_limits.get(host, self.pool_maxsize)
+        adapter = HTTPAdapter(
+            pool_connections=self.pool_connections,
+            pool_maxsize=maxsize,
+            pool_block=self.pool_block
+        )
+
+        session = requests.Session()
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        session.headers['Connection'] = 'keep-alive' if self.keep_alive else 'close'
+        # Shared across requests and users: reject every cookie
+        session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+        return session
+
+    def session_for(self, url: str) -> requests.Session:
+        """Get or create the pooled session for a URL's host"""
+        host = urlsplit(url).netloc.lower()
+        with self._lock:
+            if host not in self._sessions:
+                self._sessions[host] = self._create_session(host)
+            return self._sessions[host]
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """Send a request through the host's pooled session"""
+        return self.session_for(url).request(method, url, **kwargs)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        """Send a GET request through the host's pooled session"""
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        """Send a POST request through the host's pooled session"""
+        return self.request('POST', url, **kwargs)
+
+    def get_status(self) -> dict[str, Any]:
+        """Get pool configuration and the hosts with open sessions"""
+        with self._lock:
+            hosts = {
+                host: self.host_limits.get(host, self.pool_maxsize)
+                for host in self._sessions
+            }
+        return {
+            'keep_alive': self.keep_alive,
+            'pool_block': self.pool_block,
+            'pool_maxsize': self.pool_maxsize,
+            'hosts': hosts
+        }
+
+    def close(self) -> None:
+        """Close every session and drop their pooled connections"""
+        with self._lock:
+            sessions = list(self._sessions.values())
+            self._sessions.clear()
+        for session in sessions:
+            session.close()
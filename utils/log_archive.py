@@ -0,0 +1,422 @@
+"""
+Persistent log archive for Skye application
+
+Log entries are appended to newline-delimited JSON segments on disk. A
+segment is closed once it reaches SEGMENT_MAX_BYTES or SEGMENT_MAX_AGE and
+is then compressed block by block: every INDEX_BLOCK_BYTES of entries become
+one gzip member (or zstd frame), and a sidecar .idx file records the first
+timestamp and file offset of each block. Queries use that sparse index to
+decompress only the blocks overlapping the requested time range, one block
+at a time, so history can be searched without loading whole files.
+"""
+from __future__ import annotations
+import glob
+import gzip
+import json
+import logging
+import os
+import threading
+from datetime import datetime
+from typing import Any, Callable
+
+logger = logging.getLogger(__name__)
+
+# =============================================================================
+# CONSTANTS
+# =============================================================================
+
+DEFAULT_LOG_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), '.logs')
+
+# Compression of closed segments: 'gzip', 'zstd' (needs the zstandard
+# package, falls back to gzip) or 'none'
+LOG_COMPRESSIONS = ('gzip', 'zstd', 'none')
+
+SEGMENT_MAX_BYTES = 8 * 1024 * 1024    # Rotate the active segment at this size...
+SEGMENT_MAX_AGE = 24 * 3600            # ...or once it is this old (seconds)
+RETENTION_BYTES = 100 * 1024 * 1024    # Oldest closed segments are deleted above this total
+INDEX_BLOCK_BYTES = 64 * 1024          # Uncompressed bytes per indexed (and compressed) block
+
+# Entries returned by an archive query when no limit is given
+ARCHIVE_PAGE_SIZE = 500
+
+SEGMENT_PREFIX = 'skye-'
+RAW_SUFFIX = '.ndjson'
+INDEX_SUFFIX = '.idx'
+COMPRESSED_SUFFIX = {'gzip': '.gz', 'zstd': '.zst', 'none': ''}
+
+
+def _entry_time(entry: dict[str, Any]) -> float:
+    """Unix time of a stored entry's ISO timestamp"""
+    return datetime.fromisoformat(entry['timestamp']).timestamp()
+
+
+def _codec(compression: str) -> tuple[Callable[[bytes], bytes], Callable[[bytes], bytes]]:
+    """(compress, decompress) functions for one block"""
+    if compression == 'gzip':
+        return (lambda data: gzip.compress(data, compresslevel=6)), gzip.decompress
+    if compression == 'zstd':
+        import zstandard
+        return zstandard.ZstdCompressor(level=3).compress, zstandard.ZstdDecompressor().decompress
+    return (lambda data: data), (lambda data: data)
+
+
+# =============================================================================
+# SEGMENTS
+# =============================================================================
+
+class Segment:
+    """
+    One archive file and its sparse index: (first entry time, byte offset)
+    for every block, plus the time range and size of the whole segment.
+    """
+
+    __slots__ = ('path', 'compression', 'blocks', 'start', 'end', 'entries', 'size')
+
+    def __init__(
+        self,
+        path: str,
+        compression: str = 'none',
+        blocks: list[tuple[float, int]] | None = None,
+        start: float = 0.0,
+        end: float = 0.0,
+        entries: int = 0,
+        size: int = 0
+    ) -> None:
+        self.path = path
+        self.compression = compression
+        self.blocks = blocks if blocks is not None else []
+        self.start = start
+        self.end = end
+        self.entries = entries
+        self.size = size
+
+    @property
+    def index_path(self) -> str:
+        return self.path.split(RAW_SUFFIX)[0] + INDEX_SUFFIX
+
+    @classmethod
+    def load(cls, index_path: str) -> Segment:
+        with open(index_path, 'r') as f:
+            index = json.load(f)
+        return cls(
+            os.path.join(os.path.dirname(index_path), index['file']),
+            index['compression'],
+            [(ts, offset) for ts, offset in index['blocks']],
+            index['start'],
+            index['end'],
+            index['entries'],
+            index['size']
+        )
+
+    def save_index(self) -> None:
+        """Write the .idx sidecar atomically"""
+        index = {
+            'file': os.path.basename(self.path),
+            'compression': self.compression,
+            'start': self.start,
+            'end': self.end,
+            'entries': self.entries,
+            'size': self.size,
+            'blocks': self.blocks
+        }
+        tmp_path = self.index_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(index, f)
+        os.replace(tmp_path, self.index_path)
+
+    def overlaps(self, start_time: float | None, end_time: float | None) -> bool:
+        if start_time is not None and self.end < start_time:
+            return False
+        return end_time is None or self.start <= end_time
+
+    def block_ranges(self, start_time: float | None, end_time: float | None) -> list[tuple[int, int]]:
+        """(offset, length) of the blocks that can hold entries in the time range"""
+        ranges = []
+        for i, (block_start, offset) in enumerate(self.blocks):
+            last = i + 1 == len(self.blocks)
+            next_offset = self.size if last else self.blocks[i + 1][1]
+            next_start = self.end if last else self.blocks[i + 1][0]
+            if end_time is not None and block_start > end_time:
+                break
+            if start_time is not None and next_start < start_time:
+                continue
+            ranges.append((offset, next_offset - offset))
+        return ranges
+
+
+# =============================================================================
+# LOG ARCHIVE
+# =============================================================================
+
+class LogArchive:
+    """
+    Append-only, size-bounded store of log entries on disk.
+    Unconfigured until open() is called (by setup_logging), so importing
+    it never touches the filesystem.
+    """
+
+    def __init__(self) -> None:
+        self.directory: str | None = None
+        self.compression = 'gzip'
+        self.segment_max_bytes = SEGMENT_MAX_BYTES
+        self.segment_max_age = SEGMENT_MAX_AGE
+        self.retention_bytes = RETENTION_BYTES
+        self._closed: list[Segment] = []
+        self._active: Segment | None = None
+        self._file = None
+        self._block_bytes = 0
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.directory is not None
+
+    def open(
+        self,
+        directory: str = DEFAULT_LOG_DIR,
+        compression: str = 'gzip',
+        segment_max_bytes: int = SEGMENT_MAX_BYTES,
+        segment_max_age: float = SEGMENT_MAX_AGE,
+        retention_bytes: int = RETENTION_BYTES
+    ) -> None:
+        """Start archiving to directory, sealing segments left by a previous run"""
+        if compression == 'zstd':
+            try:
+                import zstandard  # noqa: F401
+            except ImportError:
+                logger.warning("zstandard package not installed, compressing logs with gzip")
+                compression = 'gzip'
+        if compression not in LOG_COMPRESSIONS:
+            logger.warning(f"Unknown log compression '{compression}', using gzip")
+            compression = 'gzip'
+
+        os.makedirs(directory, exist_ok=True)
+        with self._lock:
+            self.directory = directory
+            self.compression = compression
+            self.segment_max_bytes = segment_max_bytes
+            self.segment_max_age = segment_max_age
+            self.retention_bytes = retention_bytes
+
+            # Segments still raw were active when the last process stopped
+            for raw_path in sorted(glob.glob(os.path.join(directory, f'{SEGMENT_PREFIX}*{RAW_SUFFIX}'))):
+                if not os.path.exists(Segment(raw_path).index_path):
+                    try:
+                        self._seal(self._scan(raw_path))
+                    except (OSError, ValueError) as e:
+                        logger.warning(f"Could not recover log segment {raw_path}: {e}")
+
+            self._closed = []
+            for index_path in glob.glob(os.path.join(directory, f'{SEGMENT_PREFIX}*{INDEX_SUFFIX}')):
+                try:
+                    self._closed.append(Segment.load(index_path))
+                except (OSError, ValueError, KeyError) as e:
+                    logger.warning(f"Skipping unreadable log index {index_path}: {e}")
+            self._closed.sort(key=lambda segment: segment.start)
+            self._enforce_retention()
+
+    def close(self) -> None:
+        """Seal the active segment"""
+        with self._lock:
+            self._rotate()
+
+    # -------------------------------------------------------------------------
+    # Writing
+    # -------------------------------------------------------------------------
+
+    def append(self, entry: dict[str, Any], created: float) -> None:
+        """Append one entry, rotating the active segment when it is full or old"""
+        if self.directory is None:
+            return
+        line = (json.dumps(entry, separators=(',', ':')) + '\n').encode('utf-8')
+
+        with self._lock:
+            active = self._active
+            if active is not None and (
+                active.size >= self.segment_max_bytes
+                or created - active.start >= self.segment_max_age
+            ):
+                self._rotate()
+                active = None
+
+            if active is None:
+                stamp = datetime.fromtimestamp(created).strftime('%Y%m%d-%H%M%S-%f')
+                path = os.path.join(self.directory, f'{SEGMENT_PREFIX}{stamp}{RAW_SUFFIX}')
+                active = self._active = Segment(path, start=created, end=created)
+                self._file = open(path, 'ab')
+                self._block_bytes = 0
+
+            if not active.blocks or self._block_bytes >= INDEX_BLOCK_BYTES:
+                active.blocks.append((created, active.size))
+                self._block_bytes = 0
+
+            self._file.write(line)
+            self._file.flush()
+            active.size += len(line)
+            active.end = max(active.end, created)
+            active.entries += 1
+            self._block_bytes += len(line)
+
+    def _rotate(self) -> None:
+        """Close and seal the active segment (lock held)"""
+        if self._active is None:
+            return
+        self._file.close()
+        segment, self._active, self._file = self._active, None, None
+        try:
+            self._closed.append(self._seal(segment))
+        except OSError as e:
+            logger.warning(f"Could not seal log segment {segment.path}: {e}")
+        self._enforce_retention()
+
+    def _scan(self, raw_path: str) -> Segment:
+        """Rebuild the index of a raw segment by reading it once"""
+        segment = Segment(raw_path)
+        block_bytes = 0
+        with open(raw_path, 'rb') as f:
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break  # Torn final write
+                created = _entry_time(json.loads(line))
+                if not segment.blocks or block_bytes >= INDEX_BLOCK_BYTES:
+                    segment.blocks.append((created, segment.size))
+                    segment.start = segment.start or created
+                    block_bytes = 0
+                segment.end = max(segment.end, created)
+                segment.entries += 1
+                segment.size += len(line)
+                block_bytes += len(line)
+        return segment
+
+    def _seal(self, segment: Segment) -> Segment:
+        """Compress a finished raw segment block by block and write its index"""
+        if self.compression == 'none' or not segment.blocks:
+            segment.compression = 'none'
+            segment.save_index()
+            return segment
+
+        compress, _ = _codec(self.compression)
+        sealed_path = segment.path[:-len(RAW_SUFFIX)] + RAW_SUFFIX + COMPRESSED_SUFFIX[self.compression]
+        sealed = Segment(
+            sealed_path, self.compression, [],
+            segment.start, segment.end, segment.entries, 0
+        )
+
+        with open(segment.path, 'rb') as src, open(sealed_path + '.tmp', 'wb') as dst:
+            for (block_start, _), (offset, length) in zip(segment.blocks, segment.block_ranges(None, None)):
+                src.seek(offset)
+                data = compress(src.read(length))
+                sealed.blocks.append((block_start, sealed.size))
+                dst.write(data)
+                sealed.size += len(data)
+
+        os.replace(sealed_path + '.tmp', sealed_path)
+        sealed.save_index()
+        os.remove(segment.path)
+        return sealed
+
+    def _enforce_retention(self) -> None:
+        """Delete the oldest closed segments until the archive fits (lock held)"""
+        total = sum(segment.size for segment in self._closed)
+        while self._closed and total > self.retention_bytes:
+            oldest = self._closed.pop(0)
+            total -= oldest.size
+            for path in (oldest.path, oldest.index_path):
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+
+    # -------------------------------------------------------------------------
+    # Reading
+    # -------------------------------------------------------------------------
+
+    def _read_blocks(self, segment: Segment, start_time: float | None, end_time: float | None):
+        """Yield each overlapping block's entries, newest block first"""
+        _, decompress = _codec(segment.compression)
+        try:
+            with open(segment.path, 'rb') as f:
+                for offset, length in reversed(segment.block_ranges(start_time, end_time)):
+                    f.seek(offset)
+                    yield decompress(f.read(length)).splitlines()
+        except FileNotFoundError:
+            # Rotated or deleted by retention while we were reading
+            return
+
+    def query(
+        self,
+        start_time: float | None = None,
+        end_time: float | None = None,
+        level: str | None = None,
+        search: str | None = None,
+        limit: int = ARCHIVE_PAGE_SIZE,
+        offset: int = 0
+    ) -> tuple[list[dict[str, Any]], dict[str, int]]:
+        """
+        Get archived entries in [start_time, end_time] matching level/search,
+        newest first, with stats over every match in the range. Only the
+        indexed blocks overlapping the range are read, one at a time.
+        """
+        search = search.lower() if search else None
+        # Cheap substring test on the raw line first, when the search text
+        # appears unescaped in JSON
+        raw_search = search.encode('utf-8') if search and json.dumps(search)[1:-1] == search else None
+        start_iso = datetime.fromtimestamp(start_time).isoformat() if start_time is not None else None
+        end_iso = datetime.fromtimestamp(end_time).isoformat() if end_time is not None else None
+
+        with self._lock:
+            segments = list(self._closed)
+            if self._active is not None:
+                active = self._active
+                segments.append(Segment(
+                    active.path, 'none', list(active.blocks),
+                    active.start, active.end, active.entries, active.size
+                ))
+
+        entries: list[dict[str, Any]] = []
+        stats = {'total': 0, 'errors': 0, 'warnings': 0}
+        for segment in reversed(segments):
+            if not segment.overlaps(start_time, end_time):
+                continue
+            for lines in self._read_blocks(segment, start_time, end_time):
+                for line in reversed(lines):
+                    if raw_search is not None and raw_search not in line.lower():
+                        continue
+                    entry = json.loads(line)
+                    timestamp = entry['timestamp']
+                    if start_iso is not None and timestamp < start_iso:
+                        continue
+                    if end_iso is not None and timestamp > end_iso:
+                        continue
+                    if level is not None and entry['level'] != level:
+                        continue
+                    if search and search not in entry['message'].lower():
+                        continue
+
+                    stats['total'] += 1
+                    if entry['level'] == 'ERROR':
+                        stats['errors'] += 1
+                    elif entry['level'] == 'WARNING':
+                        stats['warnings'] += 1
+                    if offset < stats['total'] <= offset + limit:
+                        entries.append(entry)
+
+        return entries, stats
+
+    def get_status(self) -> dict[str, Any]:
+        """Get archive location, segment count, size on disk and time span"""
+        with self._lock:
+            segments = list(self._closed) + ([self._active] if self._active is not None else [])
+        return {
+            'enabled': self.enabled,
+            'dir': self.directory,
+            'compression': self.compression,
+            'segments': len(segments),
+            'entries': sum(segment.entries for segment in segments),
+            'bytes': sum(segment.size for segment in segments),
+            'oldest': datetime.fromtimestamp(segments[0].start).isoformat() if segments else None
+        }
+
+
+# Global archive - opened by setup_logging() when enabled in config
+log_archive = LogArchive()
@@ -1,20 +1,257 @@
 """
 Logging system for Skye application
-In-memory log storage with custom handler for Flask app
+In-memory log storage with custom handler for Flask app, optionally
+mirrored to the on-disk log archive. Request threads only enqueue log
+records; a background listener cleans, stores and fans them out.
 """
+from __future__ import annotations
+import copy
 import logging
+import queue
 import threading
+from logging.handlers import QueueHandler, QueueListener
+from bisect import bisect_left
 from datetime import datetime
 from collections import deque
+from itertools import takewhile
+from typing import Any, Sequence
 
-# In-memory log storage (with max size to prevent memory issues)
-# Storing last 500 logs - approximately 50-100KB memory usage
-log_storage = deque(maxlen=500)
-log_storage_lock = threading.Lock()
+from flask.logging import default_handler
+
+from utils.config import get_config_value
+from utils.log_archive import DEFAULT_LOG_DIR, RETENTION_BYTES, SEGMENT_MAX_AGE, SEGMENT_MAX_BYTES, log_archive
+
+# Max entries kept in memory - approximately 50-100KB memory usage
+MAX_LOG_ENTRIES = 500
+
+# Entries buffered per live stream client before new ones are dropped
+STREAM_QUEUE_SIZE = 200
+
+# Records waiting for the background log listener before new ones are dropped
+LOG_QUEUE_SIZE = 10000
+
+# Package loggers handled like the app logger: shared modules log with
+# logging.getLogger(__name__) since they also run outside a request or
+# app context (background threads, startup)
+PACKAGE_LOGGERS: tuple[str, ...] = ('utils',)
+
+
+class LogSubscription:
+    """
+    Bounded queue of new log entries for one live stream client.
+    A slow client never blocks logging: when its queue is full further
+    entries are dropped and counted so the client can resync.
+    """
+
+    def __init__(
+        self,
+        level: str | None = None,
+        search: str | None = None,
+        maxsize: int = STREAM_QUEUE_SIZE
+    ) -> None:
+        self.level = level
+        self.search = search.lower() if search else None
+        self.queue: queue.Queue[dict[str, Any]] = queue.Queue(maxsize)
+        self._dropped = 0
+        self._dropped_lock = threading.Lock()
+
+    def offer(self, entry: dict[str, Any], search_text: str) -> None:
+        """Queue an entry if it passes the filters, dropping it if the queue is full"""
+        if self.level is not None and entry['level'] != self.level:
+            return
+        if self.search and self.search not in search_text:
+            return
+        try:
+            self.queue.put_nowait(entry)
+        except queue.Full:
+            with self._dropped_lock:
+                self._dropped += 1
+
+    def take_dropped(self) -> int:
+        """Number of entries dropped since the last call"""
+        with self._dropped_lock:
+            dropped, self._dropped = self._dropped, 0
+        return dropped
+
+
+class LogStore:
+    """
+    Ring buffer of log entries with a monotonically increasing sequence
+    number, numeric timestamps and a per-level index, so polling clients
+    can ask for just the entries after a cursor and time/level filters
+    don't re-parse or rescan every entry.
+
+    Records from different threads can reach the store slightly out of
+    timestamp order, so time filters bisect on the running maximum of the
+    timestamps: no entry logged at or after the start time is left out,
+    but a few logged just before it may be included.
+    """
+
+    def __init__(self, capacity: int = MAX_LOG_ENTRIES) -> None:
+        self.capacity = capacity
+        self.lock = threading.Lock()
+        self._entries: deque[dict[str, Any]] = deque(maxlen=capacity)
+        # Running maximum of the entries' timestamps (non-decreasing, unlike record.created)
+        self._times: deque[float] = deque(maxlen=capacity)
+        self._search_text: deque[str] = deque(maxlen=capacity)
+        self._by_level: dict[str, deque[int]] = {}
+        self._subscribers: list[LogSubscription] = []
+        self._next_seq = 1
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def last_seq(self) -> int:
+        """Sequence number of the newest entry (0 if none yet)"""
+        return self._next_seq - 1
+
+    def _first_seq(self) -> int:
+        return self._next_seq - len(self._entries)
+
+    def append(self, entry: dict[str, Any], created: float) -> dict[str, Any]:
+        """Store an entry, stamping it with the next sequence number"""
+        with self.lock:
+            entry['seq'] = self._next_seq
+            self._next_seq += 1
+            self._entries.append(entry)
+            self._times.append(max(created, self._times[-1]) if self._times else created)
+            self._search_text.append(entry['message'].lower())
+
+            level_seqs = self._by_level.setdefault(entry['level'], deque())
+            level_seqs.append(entry['seq'])
+
+            # Drop index entries for anything the ring buffer has evicted
+            first_seq = self._first_seq()
+            for seqs in self._by_level.values():
+                while seqs and seqs[0] < first_seq:
+                    seqs.popleft()
+
+            # Fan out to live stream clients
+            for subscription in self._subscribers:
+                subscription.offer(dict(entry), self._search_text[-1])
+        return entry
+
+    def subscribe(
+        self,
+        level: str | None = None,
+        search: str | None = None,
+        max_subscribers: int | None = None
+    ) -> LogSubscription | None:
+        """
+        Start receiving new entries matching the filters. Returns None if
+        max_subscribers clients are already subscribed.
+        """
+        subscription = LogSubscription(level, search)
+        with self.lock:
+            if max_subscribers is not None and len(self._subscribers) >= max_subscribers:
+                return None
+            self._subscribers.append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: LogSubscription) -> None:
+        with self.lock:
+            if subscription in self._subscribers:
+                self._subscribers.remove(subscription)
+
+    def _level_count(self, level: str, from_seq: int) -> int:
+        """Number of stored entries of a level with seq >= from_seq (lock held)"""
+        seqs = self._by_level.get(level)
+        if not seqs:
+            return 0
+        return len(seqs) - bisect_left(seqs, from_seq)
+
+    def _newest_positions(self, level: str | None, start: int) -> Sequence[int]:
+        """Buffer positions from start on, optionally of one level, newest first (lock held)"""
+        if level is None:
+            return range(len(self._entries) - 1, start - 1, -1)
+        first_seq = self._first_seq()
+        positions = []
+        for seq in reversed(self._by_level.get(level, ())):
+            if seq - first_seq < start:
+                break
+            positions.append(seq - first_seq)
+        return positions
+
+    @property
+    def subscriber_count(self) -> int:
+        with self.lock:
+            return len(self._subscribers)
+
+    def query(
+        self,
+        since_seq: int | None = None,
+        start_time: float | None = None,
+        level: str | None = None,
+        search: str | None = None,
+        limit: int | None = None,
+        offset: int = 0
+    ) -> tuple[list[dict[str, Any]], dict[str, int], int]:
+        """
+        Get matching entries (newest first), stats for the filters and the
+        newest sequence number to use as the next since_seq cursor.
+        Stats cover the time/level/search filters only, so a client
+        following since_seq still sees totals for its whole view. Without
+        a search they come from the per-level index, and only entries
+        after the cursor are visited; a search has to scan the time window.
+        """
+        search = search.lower() if search else None
+        with self.lock:
+            first_seq = self._first_seq()
+            start = bisect_left(self._times, start_time) if start_time is not None else 0
+            # First position to return: the time window start, or just after the cursor
+            begin = start if since_seq is None else max(start, since_seq - first_seq + 1)
+
+            if search:
+                matches = [i for i in self._newest_positions(level, start) if search in self._search_text[i]]
+                levels = [self._entries[i]['level'] for i in matches]
+                stats = {
+                    'total': len(matches),
+                    'errors': levels.count('ERROR'),
+                    'warnings': levels.count('WARNING')
+                }
+                matches = list(takewhile(lambda i: i >= begin, matches))
+            else:
+                from_seq = first_seq + start
+                if level is not None:
+                    total = self._level_count(level, from_seq)
+                    stats = {
+                        'total': total,
+                        'errors': total if level == 'ERROR' else 0,
+                        'warnings': total if level == 'WARNING' else 0
+                    }
+                else:
+                    stats = {
+                        'total': max(len(self._entries) - start, 0),
+                        'errors': self._level_count('ERROR', from_seq),
+                        'warnings': self._level_count('WARNING', from_seq)
+                    }
+                matches = self._newest_positions(level, begin)
+
+            page = matches[offset:offset + limit] if limit is not None else matches[offset:]
+            entries = [dict(self._entries[i]) for i in page]
+            last_seq = self.last_seq
+
+        return entries, stats, last_seq
+
+    def clear(self) -> None:
+        """Drop every entry (sequence numbers keep increasing)"""
+        with self.lock:
+            self._entries.clear()
+            self._times.clear()
+            self._search_text.clear()
+            self._by_level.clear()
+
+
+# Global log store
+log_store = LogStore()
 
 
 class MemoryLogHandler(logging.Handler):
-    """Custom log handler that stores logs in memory"""
+    """
+    Custom log handler that stores logs in memory and the archive.
+    Runs on the log listener thread, not the thread that logged.
+    """
 
     def emit(self, record):
         try:
@@ -44,12 +281,110 @@ class MemoryLogHandler(logging.Handler):
                 'module': record.module
             }
 
-            with log_storage_lock:
-                log_storage.append(log_entry)
+            log_store.append(log_entry, record.created)
+            log_archive.append(log_entry, record.created)
         except Exception:
             self.handleError(record)
 
 
+# Renders tracebacks on the logging thread (see LogQueueHandler.prepare)
+_exc_formatter = logging.Formatter()
+
+
+class _SentinelBlockingListener(QueueListener):
+    """QueueListener whose stop() waits for room instead of failing on a full queue"""
+
+    def enqueue_sentinel(self):
+        self.queue.put(self._sentinel)
+
+
+class LogQueueHandler(QueueHandler):
+    """
+    Handler for the logging call site: it renders the message (msg % args)
+    and puts the LogRecord on a bounded queue. If the listener falls
+    behind and the queue is full, the new record is dropped and counted by
+    level, so logging never blocks a request. Message cleaning and storage
+    happen in the listener thread.
+    """
+
+    def __init__(self, maxsize: int = LOG_QUEUE_SIZE) -> None:
+        super().__init__(queue.Queue(maxsize))
+        self.maxsize = maxsize
+        self.listener: QueueListener | None = None
+        self._dropped: dict[str, int] = {}
+        self._dropped_lock = threading.Lock()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """
+        Copy the record with its message rendered now, like the stdlib
+        QueueHandler: args may be mutated by the caller after logging (or
+        be unpicklable / hold locks), so they must not wait in the queue.
+        The traceback is rendered to exc_text for the same reason.
+        """
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            if not record.exc_text:
+                record.exc_text = _exc_formatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            with self._dropped_lock:
+                self._dropped[record.levelname] = self._dropped.get(record.levelname, 0) + 1
+
+    def start(self, *handlers: logging.Handler) -> None:
+        """Start the background listener feeding handlers"""
+        if self.listener is None:
+            self.listener = _SentinelBlockingListener(self.queue, *handlers, respect_handler_level=True)
+            self.listener.start()
+
+    def stop(self) -> None:
+        """Process everything still queued, then stop the listener"""
+        if self.listener is not None:
+            self.listener.stop()
+            self.listener = None
+
+    def get_status(self) -> dict[str, Any]:
+        """Get queue depth and dropped record counts"""
+        with self._dropped_lock:
+            dropped = dict(self._dropped)
+        return {
+            'running': self.listener is not None,
+            'queued': self.queue.qsize(),
+            'capacity': self.maxsize,
+            'dropped': sum(dropped.values()),
+            'dropped_by_level': dropped
+        }
+
+
+# Global queue handler - attached to the app logger by setup_logging()
+log_queue_handler = LogQueueHandler()
+
+
+def _open_archive(app):
+    """Open the on-disk log archive unless disabled in the "logs" config"""
+    settings = get_config_value('logs', {}) or {}
+    if str(settings.get('archive', 'true')).lower() in ('0', 'false', 'no', 'off'):
+        return
+
+    try:
+        mb = 1024 * 1024
+        log_archive.open(
+            directory=settings.get('dir') or DEFAULT_LOG_DIR,
+            compression=str(settings.get('compression', 'gzip')).lower(),
+            segment_max_bytes=int(float(settings.get('segment_mb', SEGMENT_MAX_BYTES / mb)) * mb),
+            segment_max_age=float(settings.get('segment_hours', SEGMENT_MAX_AGE / 3600)) * 3600,
+            retention_bytes=int(float(settings.get('retention_mb', RETENTION_BYTES / mb)) * mb)
+        )
+    except (OSError, ValueError) as e:
+        app.logger.warning(f"Log archive unavailable ({e}), keeping logs in memory only")
+
+
 def setup_logging(app):
     """
     Set up logging for Flask app with custom memory handler
@@ -64,11 +399,31 @@ def setup_logging(app):
     formatter = logging.Formatter('%(message)s')
     memory_handler.setFormatter(formatter)
 
+    # The app logger only enqueues; the listener thread runs the memory handler
+    log_queue_handler.start(memory_handler)
+
     # Add handler to Flask app logger only (not root logger to avoid duplicates)
-    app.logger.addHandler(memory_handler)
+    app.logger.addHandler(log_queue_handler)
     app.logger.setLevel(logging.INFO)  # Ensure app logger captures INFO and above
 
+    # Module loggers under utils/ reach the same handlers (logs page, live
+    # stream, archive) and the console, like the app logger
+    for name in PACKAGE_LOGGERS:
+        package_logger = logging.getLogger(name)
+        for handler in (log_queue_handler, default_handler):
+            if handler not in package_logger.handlers:
+                package_logger.addHandler(handler)
+        package_logger.setLevel(logging.INFO)
+
     # Disable werkzeug HTTP request logs (too noisy)
     logging.getLogger('werkzeug').setLevel(logging.WARNING)
 
+    _open_archive(app)
+
     app.logger.info("Logging system initialized")
+
+
+def shutdown_logging():
+    """Flush queued records to storage, then seal the archive's active segment"""
+    log_queue_handler.stop()
+    log_archive.close()
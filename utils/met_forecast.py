@@ -0,0 +1,308 @@
+"""
+Met Éireann forecast parsing and storage
+
+The locationforecast XML interleaves point forecasts (from == to: temperature,
+wind, humidity...) with interval forecasts (from < to: symbol, precipitation).
+parse_forecast streams the document with iterparse, keeping only compact
+records, and then joins each point to the intervals covering it with a
+single sorted sweep instead of rescanning every interval per point.
+
+ForecastStore keeps one parsed Forecast per snapped grid cell and refreshes
+it when the next model run is due, so nearby coordinates share one download.
+"""
+from __future__ import annotations
+import logging
+import threading
+import time
+import xml.etree.ElementTree as ET
+from array import array
+from datetime import datetime
+from typing import IO, Any, Iterable
+
+import requests
+
+from utils.api_client import api_client
+
+logger = logging.getLogger(__name__)
+
+# =============================================================================
+# CONSTANTS
+# =============================================================================
+
+MET_FORECAST_URL = 'http://openaccess.pf.api.met.ie/metno-wdb2ts/locationforecast'
+
+# Hourly points returned by /api/weather (7 days)
+FORECAST_HOURS = 168
+
+# Point forecast elements: tag -> (response key, attribute, scale)
+POINT_FIELDS: dict[str, tuple[str, str, float]] = {
+    'temperature': ('temperature', 'value', 1),
+    'windSpeed': ('windSpeed', 'mps', 3.6),  # m/s to km/h
+    'windDirection': ('windDirection', 'deg', 1),
+    'humidity': ('humidity', 'value', 1),
+    'pressure': ('pressure', 'value', 1),
+    'cloudiness': ('cloudCover', 'percent', 1)
+}
+
+# Numeric columns held per forecast, in response order
+NUMERIC_FIELDS: tuple[str, ...] = tuple(key for key, _, _ in POINT_FIELDS.values()) + ('precipitation',)
+
+# Every field an hourly entry can carry besides 'time'
+RESPONSE_FIELDS: tuple[str, ...] = NUMERIC_FIELDS + ('symbol', 'visibility')
+
+DEFAULT_SYMBOL = 'Cloud'
+DEFAULT_VISIBILITY = 10000
+
+# Location grid: coordinates are snapped to this step (degrees, ~2 km,
+# about the Met Éireann model grid spacing) before lookup and fetch
+GRID_STEP = 0.02
+
+# Refresh cadence
+MODEL_RUN_HOURS = 3          # Model run interval when the feed has no nextrun
+MODEL_RUN_DELAY = 600        # Wait after a run is due before refetching (seconds)
+MIN_REFRESH = 600            # Never refetch a cell sooner than this (seconds)
+MAX_REFRESH = 6 * 3600       # ...or later than this
+MAX_STALE = 12 * 3600        # Serve the last forecast this long if refreshing fails
+MAX_LOCATIONS = 64           # Grid cells kept in memory
+
+
+def _parse_time(value: str) -> float:
+    """Unix time of an ISO timestamp from the feed"""
+    return datetime.fromisoformat(value.replace('Z', '+00:00')).timestamp()
+
+
+def snap_location(lat: float, lon: float, step: float = GRID_STEP) -> tuple[str, str]:
+    """Snap coordinates to the centre of their grid cell"""
+    return f'{round(lat / step) * step:.2f}', f'{round(lon / step) * step:.2f}'
+
+
+def _read_point(location: ET.Element) -> dict[str, float]:
+    """Read the point forecast fields, first occurrence of each tag wins"""
+    fields: dict[str, float] = {}
+    for elem in location.iter():
+        spec = POINT_FIELDS.get(elem.tag)
+        if spec is not None and spec[0] not in fields:
+            key, attribute, scale = spec
+            fields[key] = float(elem.get(attribute, 0)) * scale
+    return fields
+
+
+def _read_interval(location: ET.Element) -> tuple[str | None, float | None]:
+    """Read (symbol id, precipitation) from an interval forecast"""
+    symbol = location.find('.//symbol')
+    precipitation = location.find('.//precipitation')
+    return (
+        symbol.get('id', DEFAULT_SYMBOL) if symbol is not None else None,
+        float(precipitation.get('value', 0)) if precipitation is not None else None
+    )
+
+
+def _join_intervals(
+    points: list[dict[str, Any]],
+    intervals: list[tuple[str, str, str | None, float | None]]
+) -> None:
+    """
+    Fill symbol and precipitation on each point from the intervals with
+    from <= time < to. As in the feed's reading order, the symbol comes from
+    the first such interval in the document and the precipitation from the
+    last. Points and intervals are swept in time order, so each interval
+    enters and leaves the active set once.
+    """
+    by_start = sorted(range(len(intervals)), key=lambda i: intervals[i][0])
+    active: list[int] = []
+    next_interval = 0
+
+    for point in sorted(points, key=lambda p: p['time']):
+        point_time = point['time']
+        while next_interval < len(by_start) and intervals[by_start[next_interval]][0] <= point_time:
+            active.append(by_start[next_interval])
+            next_interval += 1
+        active = [i for i in active if intervals[i][1] > point_time]
+
+        with_symbol = [i for i in active if intervals[i][2] is not None]
+        with_precip = [i for i in active if intervals[i][3] is not None]
+        point['symbol'] = intervals[min(with_symbol)][2] if with_symbol else None
+        point['precipitation'] = intervals[max(with_precip)][3] if with_precip else 0
+
+
+# =============================================================================
+# FORECAST
+# =============================================================================
+
+class Forecast:
+    """
+    Parsed forecast for one location, stored as columns: a list of ISO
+    times, one float array per numeric field and a list of symbols.
+    """
+
+    __slots__ = ('times', 'columns', 'symbols', 'next_run', 'fetched_at')
+
+    def __init__(self, points: list[dict[str, Any]], next_run: float | None = None) -> None:
+        self.times: list[str] = [point['time'] for point in points]
+        self.columns: dict[str, array] = {
+            field: array('d', (point.get(field, 0) for point in points))
+            for field in NUMERIC_FIELDS
+        }
+        self.symbols: list[str | None] = [point['symbol'] for point in points]
+        self.next_run = next_run
+        self.fetched_at = time.time()
+
+    def __len__(self) -> int:
+        return len(self.times)
+
+    def _entry(self, i: int, fields: Iterable[str]) -> dict[str, Any]:
+        entry: dict[str, Any] = {'time': self.times[i]}
+        for field in fields:
+            if field == 'symbol':
+                entry['symbol'] = self.symbols[i] or DEFAULT_SYMBOL
+            elif field == 'visibility':
+                entry['visibility'] = DEFAULT_VISIBILITY
+            else:
+                entry[field] = self.columns[field][i]
+        return entry
+
+    def current(self) -> dict[str, Any]:
+        """First point with every field and a description"""
+        if not self.times:
+            return {}
+        current = self._entry(0, RESPONSE_FIELDS)
+        symbol = self.symbols[0]
+        current['description'] = symbol.replace('_', ' ') if symbol is not None else 'Cloudy'
+        return current
+
+    def hourly(
+        self,
+        start: int = 0,
+        hours: int = FORECAST_HOURS,
+        fields: Iterable[str] | None = None
+    ) -> list[dict[str, Any]]:
+        """Points [start, start + hours) with the requested fields (default all)"""
+        wanted = RESPONSE_FIELDS if fields is None else [f for f in RESPONSE_FIELDS if f in fields]
+        return [self._entry(i, wanted) for i in range(start, min(start + hours, len(self)))]
+
+
+def parse_forecast(source: IO[bytes]) -> Forecast:
+    """
+    Parse a locationforecast document into a Forecast.
+    Elements are cleared as soon as they are read, so memory stays flat
+    however long the forecast is.
+    """
+    points: list[dict[str, Any]] = []
+    intervals: list[tuple[str, str, str | None, float | None]] = []
+    next_runs: list[float] = []
+    open_elements: list[ET.Element] = []
+
+    for event, elem in ET.iterparse(source, events=('start', 'end')):
+        if event == 'start':
+            open_elements.append(elem)
+            continue
+
+        open_elements.pop()
+        if elem.tag == 'model' and elem.get('nextrun'):
+            try:
+                next_runs.append(_parse_time(elem.get('nextrun')))
+            except ValueError:
+                pass
+            continue
+        if elem.tag != 'time':
+            continue
+
+        from_time = elem.get('from')
+        to_time = elem.get('to')
+        location = elem.find('.//location')
+        if from_time and location is not None:
+            if from_time == to_time:
+                points.append({'time': from_time, **_read_point(location)})
+            elif to_time:
+                intervals.append((from_time, to_time, *_read_interval(location)))
+
+        # Drop the parsed element so the tree never holds more than one <time>
+        elem.clear()
+        if open_elements:
+            open_elements[-1].remove(elem)
+
+    _join_intervals(points, intervals)
+    return Forecast(points, min(next_runs) if next_runs else None)
+
+
+# =============================================================================
+# FORECAST STORE
+# =============================================================================
+
+class ForecastStore:
+    """
+    Parsed forecasts keyed by snapped grid cell. A cell is refetched once
+    its model's next run should be available; if that fetch fails the last
+    forecast keeps being served for up to MAX_STALE.
+    """
+
+    def __init__(self, max_locations: int = MAX_LOCATIONS) -> None:
+        self.max_locations = max_locations
+        self._entries: dict[tuple[str, str], Forecast] = {}
+        self._lock = threading.Lock()
+
+    def refresh_at(self, forecast: Forecast) -> float:
+        """When a forecast should be refetched"""
+        fetched_at = forecast.fetched_at
+        if forecast.next_run is not None:
+            due = forecast.next_run + MODEL_RUN_DELAY
+        else:
+            run_seconds = MODEL_RUN_HOURS * 3600
+            due = (fetched_at // run_seconds + 1) * run_seconds + MODEL_RUN_DELAY
+        return min(max(due, fetched_at + MIN_REFRESH), fetched_at + MAX_REFRESH)
+
+    def _fetch(self, lat: str, lon: str) -> Forecast | None:
+        url = f'{MET_FORECAST_URL}?lat={lat};long={lon}'
+        response = api_client.get(url, headers={'User-Agent': 'Mozilla/5.0'}, timeout=15, stream=True)
+        try:
+            if response.status_code != 200:
+                logger.error(f"Met Éireann API returned status {response.status_code}")
+                return None
+            response.raw.decode_content = True
+            return parse_forecast(response.raw)
+        finally:
+            response.close()
+
+    def get(self, lat: float, lon: float) -> Forecast | None:
+        """Get the forecast for the grid cell containing (lat, lon)"""
+        key = snap_location(lat, lon)
+        with self._lock:
+            cached = self._entries.get(key)
+        if cached is not None and time.time() < self.refresh_at(cached):
+            return cached
+
+        try:
+            forecast = api_client.inflight.do(f'met-forecast:{key}', lambda: self._fetch(*key))
+        except (requests.RequestException, ET.ParseError) as e:
+            logger.warning(f"Forecast refresh failed for {key}: {e}")
+            forecast = None
+
+        if forecast is None:
+            if cached is not None and time.time() - cached.fetched_at < MAX_STALE:
+                return cached
+            return None
+
+        with self._lock:
+            self._entries[key] = forecast
+            if len(self._entries) > self.max_locations:
+                oldest = min(self._entries, key=lambda k: self._entries[k].fetched_at)
+                del self._entries[oldest]
+        return forecast
+
+    def get_status(self) -> dict[str, Any]:
+        """Get cached cells with their age and next refresh"""
+        now = time.time()
+        with self._lock:
+            entries = dict(self._entries)
+        return {
+            f'{lat},{lon}': {
+                'points': len(forecast),
+                'age_seconds': round(now - forecast.fetched_at),
+                'refresh_in_seconds': max(0, round(self.refresh_at(forecast) - now))
+            }
+            for (lat, lon), forecast in entries.items()
+        }
+
+
+# Global instance
+forecast_store = ForecastStore()
@@ -0,0 +1,298 @@
+"""
+Request, upstream and cache metrics for Skye application
+
+Counters and fixed-bucket histograms kept in process and rendered in the
+Prometheus text exposition format at /metrics. Route timings come from
+before/after request hooks, upstream timings from APIClient.request, so a
+slow endpoint can be split into time spent waiting on Yahoo (or any other
+host) and our own decode/parse cost.
+"""
+from __future__ import annotations
+import threading
+import time
+from bisect import bisect_left
+from typing import Any
+
+from flask import g, request
+
+# =============================================================================
+# CONSTANTS
+# =============================================================================
+
+# Histogram bucket upper bounds (seconds)
+DEFAULT_BUCKETS: tuple[float, ...] = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Rows per table in the JSON summary
+SUMMARY_ROWS = 15
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(names: tuple[str, ...], values: tuple[str, ...], extra: str = '') -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(value)
+
+
+# =============================================================================
+# METRIC TYPES
+# =============================================================================
+
+class Counter:
+    """Monotonic counter per label set"""
+
+    kind = 'counter'
+
+    def __init__(self, name: str, help_text: str, labelnames: tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = labelnames
+        self._values: dict[tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def snapshot(self) -> dict[tuple[str, ...], float]:
+        with self._lock:
+            return dict(self._values)
+
+    def render(self) -> list[str]:
+        return [
+            f'{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}'
+            for labels, value in sorted(self.snapshot().items())
+        ]
+
+
+class Histogram:
+    """Fixed-bucket histogram per label set (cumulative on render)"""
+
+    kind = 'histogram'
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS
+    ) -> None:
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = labelnames
+        self.buckets = buckets
+        # labels -> [per-bucket counts (last is +Inf), sum, count]
+        self._values: dict[tuple[str, ...], list[Any]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(labels)
+            if entry is None:
+                entry = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            entry[0][index] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    def snapshot(self) -> dict[tuple[str, ...], tuple[list[int], float, int]]:
+        with self._lock:
+            return {labels: (list(counts), total, count) for labels, (counts, total, count) in self._values.items()}
+
+    def quantile(self, counts: list[int], q: float) -> float:
+        """Estimate a quantile by interpolating within its bucket"""
+        total = sum(counts)
+        if not total:
+            return 0.0
+        rank = q * total
+        seen = 0
+        for i, bucket_count in enumerate(counts):
+            if seen + bucket_count >= rank and bucket_count:
+                if i == len(self.buckets):
+                    return self.buckets[-1]
+                lower = self.buckets[i - 1] if i else 0.0
+                return lower + (self.buckets[i] - lower) * (rank - seen) / bucket_count
+            seen += bucket_count
+        return self.buckets[-1]
+
+    def render(self) -> list[str]:
+        lines = []
+        for labels, (counts, total, count) in sorted(self.snapshot().items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += bucket_count
+                le = '+Inf' if bound == float('inf') else _format_value(bound)
+                bucket_labels = _format_labels(self.labelnames, labels, f'le="{le}"')
+                lines.append(f'{self.name}_bucket{bucket_labels} {cumulative}')
+            lines.append(f'{self.name}_sum{_format_labels(self.labelnames, labels)} {total!r}')
+            lines.append(f'{self.name}_count{_format_labels(self.labelnames, labels)} {count}')
+        return lines
+
+
+class MetricsRegistry:
+    """Named metrics rendered together in the Prometheus text format"""
+
+    def __init__(self) -> None:
+        self._metrics: dict[str, Counter | Histogram] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: Counter | Histogram) -> Counter | Histogram:
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name: str, help_text: str, labelnames: tuple[str, ...] = ()) -> Counter:
+        return self._register(Counter(name, help_text, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self._register(Histogram(name, help_text, labelnames, buckets))
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.append(f'# HELP {metric.name} {metric.help_text}')
+            lines.append(f'# TYPE {metric.name} {metric.kind}')
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+# Global registry
+metrics = MetricsRegistry()
+
+REQUEST_DURATION = metrics.histogram(
+    'skye_http_request_duration_seconds',
+    'Time spent handling Flask requests',
+    ('method', 'route', 'status')
+)
+UPSTREAM_DURATION = metrics.histogram(
+    'skye_upstream_request_duration_seconds',
+    'Time spent on outbound HTTP requests (status "error" if no response)',
+    ('host', 'method', 'status')
+)
+UPSTREAM_BYTES = metrics.counter(
+    'skye_upstream_response_bytes_total',
+    'Response body bytes received from upstream hosts',
+    ('host',)
+)
+UPSTREAM_RETRIES = metrics.counter(
+    'skye_upstream_retries_total',
+    'Outbound requests retried by APIClient.fetch_with_retry',
+    ('host',)
+)
+UPSTREAM_DECODE = metrics.histogram(
+    'skye_upstream_decode_seconds',
+    'Time spent decoding upstream JSON responses',
+    ('host',)
+)
+CACHE_REQUESTS = metrics.counter(
+    'skye_cache_requests_total',
+    'Cache lookups by cache and result (hit, stale or miss)',
+    ('cache', 'result')
+)
+
+
+# =============================================================================
+# FLASK INTEGRATION
+# =============================================================================
+
+def init_metrics(app):
+    """Time every request with before/after request hooks"""
+
+    @app.before_request
+    def start_timer():
+        g.metrics_start = time.perf_counter()
+
+    @app.after_request
+    def record_request(response):
+        start = g.pop('metrics_start', None)
+        if start is not None:
+            route = request.url_rule.rule if request.url_rule is not None else '<unmatched>'
+            REQUEST_DURATION.observe(
+                time.perf_counter() - start, request.method, route, str(response.status_code)
+            )
+        return response
+
+
+def get_summary() -> dict[str, Any]:
+    """Per-route, per-host and per-cache rollups for the logs page"""
+    routes: dict[tuple[str, str], list[Any]] = {}
+    for (method, route, status), (counts, total, count) in REQUEST_DURATION.snapshot().items():
+        row = routes.setdefault((method, route), [[0] * len(counts), 0.0, 0, 0])
+        row[0] = [a + b for a, b in zip(row[0], counts)]
+        row[1] += total
+        row[2] += count
+        if status.startswith('5'):
+            row[3] += count
+
+    hosts: dict[str, list[Any]] = {}
+    for (host, _, status), (counts, total, count) in UPSTREAM_DURATION.snapshot().items():
+        row = hosts.setdefault(host, [[0] * len(counts), 0.0, 0, 0])
+        row[0] = [a + b for a, b in zip(row[0], counts)]
+        row[1] += total
+        row[2] += count
+        if status == 'error' or status.startswith('5'):
+            row[3] += count
+    upstream_bytes = {host: value for (host,), value in UPSTREAM_BYTES.snapshot().items()}
+    retries = {host: value for (host,), value in UPSTREAM_RETRIES.snapshot().items()}
+    decode = {host: (total, count) for (host,), (_, total, count) in UPSTREAM_DECODE.snapshot().items()}
+
+    caches: dict[str, dict[str, float]] = {}
+    for (name, result), value in CACHE_REQUESTS.snapshot().items():
+        caches.setdefault(name, {'hit': 0, 'stale': 0, 'miss': 0})[result] = value
+
+    def ms(seconds: float) -> float:
+        return round(seconds * 1000, 1)
+
+    return {
+        'routes': [
+            {
+                'method': method,
+                'route': route,
+                'count': count,
+                'errors': errors,
+                'avg_ms': ms(total / count),
+                'p95_ms': ms(REQUEST_DURATION.quantile(counts, 0.95)),
+                'total_ms': ms(total)
+            }
+            for (method, route), (counts, total, count, errors)
+            in sorted(routes.items(), key=lambda item: -item[1][1])[:SUMMARY_ROWS]
+        ],
+        'upstream': [
+            {
+                'host': host,
+                'count': count,
+                'errors': errors,
+                'avg_ms': ms(total / count),
+                'p95_ms': ms(UPSTREAM_DURATION.quantile(counts, 0.95)),
+                'bytes': int(upstream_bytes.get(host, 0)),
+                'retries': int(retries.get(host, 0)),
+                'decode_avg_ms': ms(decode[host][0] / decode[host][1]) if host in decode else None
+            }
+            for host, (counts, total, count, errors)
+            in sorted(hosts.items(), key=lambda item: -item[1][1])[:SUMMARY_ROWS]
+        ],
+        'cache': [
+            {
+                'cache': name,
+                **{result: int(value) for result, value in results.items()},
+                'hit_rate': round((results['hit'] + results['stale']) / max(sum(results.values()), 1), 3)
+            }
+            for name, results in sorted(caches.items())
+        ]
+    }
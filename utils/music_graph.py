@@ -0,0 +1,286 @@
+"""
+music-map.com similarity graph cache for Music Next
+
+Each artist's similar-artist list is parsed from music-map.com once and
+kept in memory and in SQLite, together with the page's ETag/Last-Modified.
+Searches within GRAPH_TTL are answered from the cache; older entries are
+revalidated with a conditional GET, so an unchanged page costs a 304 and
+no parsing. A small pool of background workers can pre-crawl the
+neighbours of upcoming recommendations (optionally several hops out), one
+request at a time per worker with a pause in between.
+"""
+from __future__ import annotations
+import json
+import logging
+import os
+import queue
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, Iterable
+
+import requests
+
+from utils.api_client import api_client
+from utils.metrics import CACHE_REQUESTS
+from utils.music_store import MUSIC_DB_PATH
+
+logger = logging.getLogger(__name__)
+
+# =============================================================================
+# CONSTANTS
+# =============================================================================
+
+MUSIC_MAP_URL = 'https://www.music-map.com/{slug}'
+
+# Links to similar artists on a music-map page
+SIMILAR_ARTIST_PATTERN = re.compile(r'<a href="([^"]+)" class=S id=s\d+>([^<]+)</a>')
+
+GRAPH_TTL = 7 * 24 * 3600      # Serve a cached entry without revalidating for this long
+EMPTY_TTL = 24 * 3600          # ...or this long if the page listed no similar artists
+
+# Background expansion (set SKYE_MUSIC_EXPAND=0 to disable)
+EXPAND_SEEDS = 5               # Upcoming recommendations whose neighbours are crawled
+EXPAND_HOPS = 2                # Graph distance crawled from each seed
+EXPAND_FANOUT = 5              # Neighbours of each crawled artist followed to the next hop
+EXPAND_CONCURRENCY = 2         # Crawler threads (concurrent music-map requests)
+EXPAND_DELAY = 1.0             # Pause after each crawler request (seconds)
+EXPAND_MAX_QUEUE = 100         # Artists waiting to be crawled before new ones are dropped
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS music_map (
+    artist_key TEXT PRIMARY KEY,
+    similar TEXT NOT NULL,
+    etag TEXT,
+    last_modified TEXT,
+    fetched_at REAL NOT NULL,
+    checked_at REAL NOT NULL
+)
+'''
+
+
+def parse_music_map(html: str, artist: str) -> list[str]:
+    """Similar artists linked from a music-map page, without the artist itself"""
+    artist_key = artist.lower()
+    return [name for _, name in SIMILAR_ARTIST_PATTERN.findall(html) if name.lower() != artist_key]
+
+
+class GraphEntry:
+    """Cached similar artists for one artist and the validators to revalidate them"""
+
+    __slots__ = ('similar', 'etag', 'last_modified', 'fetched_at', 'checked_at')
+
+    def __init__(
+        self,
+        similar: list[str],
+        etag: str | None,
+        last_modified: str | None,
+        fetched_at: float,
+        checked_at: float
+    ) -> None:
+        self.similar = similar
+        self.etag = etag
+        self.last_modified = last_modified
+        self.fetched_at = fetched_at
+        self.checked_at = checked_at
+
+    def is_fresh(self, now: float) -> bool:
+        return now - self.checked_at < (GRAPH_TTL if self.similar else EMPTY_TTL)
+
+
+class MusicGraph:
+    """Artist -> similar artists, cached in memory and SQLite"""
+
+    def __init__(
+        self,
+        path: str = MUSIC_DB_PATH,
+        concurrency: int = EXPAND_CONCURRENCY,
+        expand_enabled: bool | None = None
+    ) -> None:
+        self.path = path
+        self.concurrency = concurrency
+        self.expand_enabled = (
+            os.environ.get('SKYE_MUSIC_EXPAND', '1') != '0' if expand_enabled is None else expand_enabled
+        )
+        self._local = threading.local()
+        self._ready = False
+        self._entries: dict[str, GraphEntry] = {}
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'revalidated': 0, 'fetched': 0, 'failed': 0, 'crawled': 0}
+
+        self._crawl_queue: queue.Queue[tuple[str, int]] = queue.Queue(EXPAND_MAX_QUEUE)
+        self._queued: set[str] = set()
+        self._workers: list[threading.Thread] = []
+
+    # -------------------------------------------------------------------------
+    # Storage
+    # -------------------------------------------------------------------------
+
+    def _conn(self) -> sqlite3.Connection:
+        """Get this thread's connection, creating the table on first use"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        if not self._ready:
+            conn.execute(SCHEMA)
+            self._ready = True
+        return conn
+
+    def _load(self, artist_key: str) -> GraphEntry | None:
+        with self._lock:
+            entry = self._entries.get(artist_key)
+        if entry is not None:
+            return entry
+
+        row = self._conn().execute(
+            'SELECT similar, etag, last_modified, fetched_at, checked_at FROM music_map WHERE artist_key = ?',
+            (artist_key,)
+        ).fetchone()
+        if row is None:
+            return None
+        entry = GraphEntry(json.loads(row[0]), *row[1:])
+        with self._lock:
+            self._entries[artist_key] = entry
+        return entry
+
+    def _save(self, artist_key: str, entry: GraphEntry) -> None:
+        with self._lock:
+            self._entries[artist_key] = entry
+        self._conn().execute(
+            'INSERT OR REPLACE INTO music_map '
+            '(artist_key, similar, etag, last_modified, fetched_at, checked_at) VALUES (?, ?, ?, ?, ?, ?)',
+            (artist_key, json.dumps(entry.similar), entry.etag, entry.last_modified,
+             entry.fetched_at, entry.checked_at)
+        )
+
+    def _count(self, stat: str) -> None:
+        with self._lock:
+            self._stats[stat] += 1
+
+    # -------------------------------------------------------------------------
+    # Lookups
+    # -------------------------------------------------------------------------
+
+    def _fetch(self, artist: str, cached: GraphEntry | None) -> GraphEntry | None:
+        """Fetch (or revalidate) an artist's music-map page"""
+        headers = {'User-Agent': 'Mozilla/5.0'}
+        if cached is not None:
+            if cached.etag:
+                headers['If-None-Match'] = cached.etag
+            if cached.last_modified:
+                headers['If-Modified-Since'] = cached.last_modified
+
+        url = MUSIC_MAP_URL.format(slug=artist.lower().replace(' ', '+'))
+        response = api_client.get(url, headers=headers, timeout=10)
+        now = time.time()
+
+        if response.status_code == 304 and cached is not None:
+            self._count('revalidated')
+            CACHE_REQUESTS.inc('music_map', 'stale')
+            entry = GraphEntry(cached.similar, cached.etag, cached.last_modified, cached.fetched_at, now)
+        elif response.status_code == 200:
+            self._count('fetched')
+            CACHE_REQUESTS.inc('music_map', 'miss')
+            entry = GraphEntry(
+                parse_music_map(response.text, artist),
+                response.headers.get('ETag'),
+                response.headers.get('Last-Modified'),
+                now,
+                now
+            )
+        else:
+            logger.error(f"Music-map.com returned status {response.status_code} for artist: {artist}")
+            return None
+
+        self._save(artist.lower(), entry)
+        return entry
+
+    def _lookup(self, artist: str) -> tuple[list[str] | None, bool]:
+        """(similar artists or None if unavailable, whether music-map was contacted)"""
+        artist_key = artist.lower()
+        cached = self._load(artist_key)
+        if cached is not None and cached.is_fresh(time.time()):
+            self._count('hits')
+            CACHE_REQUESTS.inc('music_map', 'hit')
+            return cached.similar, False
+
+        try:
+            entry = api_client.inflight.do(f'music-map:{artist_key}', lambda: self._fetch(artist, cached))
+        except requests.exceptions.RequestException as e:
+            logger.warning(f"Music-map.com request failed for {artist}: {e}")
+            entry = None
+
+        if entry is None:
+            self._count('failed')
+            # Fall back to the last known list, however old
+            return (cached.similar if cached is not None else None), True
+        return entry.similar, True
+
+    def get_similar(self, artist: str) -> list[str] | None:
+        """Similar artists for an artist, or None if music-map is unavailable and nothing is cached"""
+        return self._lookup(artist)[0]
+
+    # -------------------------------------------------------------------------
+    # Background expansion
+    # -------------------------------------------------------------------------
+
+    def expand(self, seeds: Iterable[str], hops: int = EXPAND_HOPS) -> None:
+        """Queue artists (and their neighbours up to hops away) for background crawling"""
+        if not self.expand_enabled or hops <= 0:
+            return
+        for artist in seeds:
+            artist_key = artist.lower()
+            with self._lock:
+                if artist_key in self._queued:
+                    continue
+                self._queued.add(artist_key)
+                if not self._workers:
+                    self._start_workers()
+            try:
+                self._crawl_queue.put_nowait((artist, hops))
+            except queue.Full:
+                with self._lock:
+                    self._queued.discard(artist_key)
+                return
+
+    def _start_workers(self) -> None:
+        """Start the crawler threads (lock held)"""
+        for i in range(self.concurrency):
+            worker = threading.Thread(target=self._crawl_worker, name=f'music-map-crawl-{i}', daemon=True)
+            worker.start()
+            self._workers.append(worker)
+
+    def _crawl_worker(self) -> None:
+        while True:
+            artist, hops = self._crawl_queue.get()
+            try:
+                similar, contacted = self._lookup(artist)
+                if contacted:
+                    self._count('crawled')
+                    time.sleep(EXPAND_DELAY)
+                if similar and hops > 1:
+                    self.expand(similar[:EXPAND_FANOUT], hops - 1)
+            except Exception as e:
+                logger.warning(f"Music-map crawl failed for {artist}: {e}")
+            finally:
+                with self._lock:
+                    self._queued.discard(artist.lower())
+
+    def get_status(self) -> dict[str, Any]:
+        """Get cache counters and crawler state"""
+        with self._lock:
+            return {
+                'cached': len(self._entries),
+                'expand_enabled': self.expand_enabled,
+                'crawl_queue': len(self._queued),
+                **self._stats
+            }
+
+
+# Global instance
+music_graph = MusicGraph()
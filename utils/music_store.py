@@ -0,0 +1,464 @@
+"""
+Music Next state store
+
+Each searched artist's recommendations, pending queue, listened set and
+navigation history are loaded from SQLite (WAL mode) once and then served
+and updated in memory under a lock, so no request touches disk. Changed
+searches are written back by a background thread after a short debounce,
+each flush replacing just those searches' rows in one transaction, so a
+crash mid-write leaves the previous snapshot intact. The JSON file from
+earlier versions is imported once, the first time the store is opened.
+"""
+from __future__ import annotations
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from itertools import islice
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+# =============================================================================
+# CONSTANTS
+# =============================================================================
+
+CONFIG_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'config')
+MUSIC_DB_PATH = os.path.join(CONFIG_DIR, 'music_recommendations.sqlite3')
+LEGACY_JSON_PATH = os.path.join(CONFIG_DIR, 'music_recommendations.json')
+
+# Suffix the legacy JSON file is renamed with once imported
+MIGRATED_SUFFIX = '.migrated'
+
+# Write-behind: flush once state has been quiet this long (seconds)...
+FLUSH_DELAY = 1.0
+# ...but never hold unsaved changes longer than this
+FLUSH_MAX_DELAY = 5.0
+
+# Tables holding per-search rows, replaced wholesale when a search is flushed
+ARTIST_TABLES = ('searches', 'recommendations', 'listened', 'history')
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS searches (
+    id INTEGER PRIMARY KEY,
+    artist_key TEXT NOT NULL UNIQUE,
+    search_artist TEXT NOT NULL,
+    current_index INTEGER NOT NULL DEFAULT 0,
+    searched_at REAL NOT NULL
+);
+-- All recommendations in the order found; queue_pos orders the pending
+-- queue and is NULL once a recommendation has been listened to
+CREATE TABLE IF NOT EXISTS recommendations (
+    artist_key TEXT NOT NULL,
+    artist TEXT NOT NULL,
+    rec_order INTEGER NOT NULL,
+    queue_pos INTEGER,
+    PRIMARY KEY (artist_key, artist)
+);
+CREATE INDEX IF NOT EXISTS recommendations_queue ON recommendations (artist_key, queue_pos);
+CREATE TABLE IF NOT EXISTS listened (
+    artist_key TEXT NOT NULL,
+    artist TEXT NOT NULL,
+    listened_order INTEGER NOT NULL,
+    PRIMARY KEY (artist_key, artist)
+);
+CREATE TABLE IF NOT EXISTS history (
+    artist_key TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    artist TEXT NOT NULL,
+    PRIMARY KEY (artist_key, idx)
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+'''
+
+
+class NoPreviousRecommendation(Exception):
+    """Raised when going back from the first recommendation"""
+    pass
+
+
+# =============================================================================
+# SEARCH STATE
+# =============================================================================
+
+class ArtistState:
+    """
+    One search's state. Recommendations, pending and listened are ordered
+    sets (dicts with None values), so membership tests, removal and
+    moving to the back of the queue don't scan lists.
+    """
+
+    __slots__ = ('search_artist', 'recommendations', 'pending', 'listened', 'history', 'current_index', 'searched_at')
+
+    def __init__(self, search_artist: str, searched_at: float | None = None) -> None:
+        self.search_artist = search_artist
+        self.recommendations: dict[str, None] = {}
+        self.pending: dict[str, None] = {}
+        self.listened: dict[str, None] = {}
+        self.history: list[str] = []
+        self.current_index = 0
+        self.searched_at = searched_at if searched_at is not None else time.time()
+
+    def first_pending(self) -> str | None:
+        return next(iter(self.pending), None)
+
+    def advance(self) -> str | None:
+        """Step forward in history, or append the next pending artist to it"""
+        if self.current_index < len(self.history) - 1:
+            self.current_index += 1
+            return self.history[self.current_index]
+        next_rec = self.first_pending()
+        if next_rec:
+            self.history.append(next_rec)
+            self.current_index += 1
+        return next_rec
+
+    def response(self, current: str | None, search_artist: str | None = None) -> dict[str, Any]:
+        """Response body shared by every Music Next endpoint"""
+        return {
+            'search_artist': search_artist or self.search_artist,
+            'current_recommendation': current,
+            'total_count': len(self.recommendations),
+            'listened_count': len(self.listened),
+            'current_index': self.current_index
+        }
+
+    def to_dict(self) -> dict[str, Any]:
+        """Snapshot in the music_recommendations.json shape"""
+        return {
+            'search_artist': self.search_artist,
+            'all_recommendations': list(self.recommendations),
+            'pending': list(self.pending),
+            'listened': list(self.listened),
+            'history': list(self.history),
+            'current_index': self.current_index,
+            'searched_at': self.searched_at
+        }
+
+
+# =============================================================================
+# MUSIC STORE
+# =============================================================================
+
+class MusicStore:
+    """
+    Music Next state kept in memory and written behind to SQLite.
+    Every operation runs under one lock, so concurrent clicks are applied
+    in turn instead of one request's write overwriting another's.
+    """
+
+    def __init__(self, path: str = MUSIC_DB_PATH, legacy_json: str | None = LEGACY_JSON_PATH) -> None:
+        self.path = path
+        self.legacy_json = legacy_json
+        self._local = threading.local()
+        self._lock = threading.RLock()
+        self._flush_lock = threading.Lock()
+        self._artists: dict[str, ArtistState] | None = None
+        self._current_search: str | None = None
+        self._dirty: set[str] = set()
+        self._first_change = 0.0
+        self._last_change = 0.0
+        self._flushes = 0
+        self._wake = threading.Event()
+        self._flusher: threading.Thread | None = None
+
+    # -------------------------------------------------------------------------
+    # Storage
+    # -------------------------------------------------------------------------
+
+    def _conn(self) -> sqlite3.Connection:
+        """Get this thread's connection"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def _state(self) -> dict[str, ArtistState]:
+        """Searches by key, loading them from SQLite on first use (lock held)"""
+        if self._artists is None:
+            conn = self._conn()
+            conn.executescript(SCHEMA)
+            self._migrate_legacy_json(conn)
+            self._artists = self._load(conn)
+            row = conn.execute("SELECT value FROM meta WHERE key = 'current_search'").fetchone()
+            self._current_search = row[0] if row else None
+        return self._artists
+
+    @staticmethod
+    def _load(conn: sqlite3.Connection) -> dict[str, ArtistState]:
+        artists: dict[str, ArtistState] = {}
+        for key, search_artist, current_index, searched_at in conn.execute(
+            'SELECT artist_key, search_artist, current_index, searched_at FROM searches ORDER BY searched_at, id'
+        ):
+            artists[key] = ArtistState(search_artist, searched_at)
+            artists[key].current_index = current_index
+
+        for key, artist in conn.execute('SELECT artist_key, artist FROM recommendations ORDER BY rec_order'):
+            artists[key].recommendations[artist] = None
+        for key, artist in conn.execute(
+            'SELECT artist_key, artist FROM recommendations WHERE queue_pos IS NOT NULL ORDER BY queue_pos'
+        ):
+            artists[key].pending[artist] = None
+        for key, artist in conn.execute('SELECT artist_key, artist FROM listened ORDER BY listened_order'):
+            artists[key].listened[artist] = None
+        for key, artist in conn.execute('SELECT artist_key, artist FROM history ORDER BY idx'):
+            artists[key].history.append(artist)
+        return artists
+
+    def _migrate_legacy_json(self, conn: sqlite3.Connection) -> None:
+        """Import music_recommendations.json into an empty store, once"""
+        if not self.legacy_json or not os.path.exists(self.legacy_json):
+            return
+        if conn.execute('SELECT 1 FROM searches LIMIT 1').fetchone() is not None:
+            return
+
+        try:
+            with open(self.legacy_json, 'r') as f:
+                legacy = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Could not read {self.legacy_json} for migration: {e}")
+            return
+
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            self.import_state(conn, legacy)
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        conn.execute('COMMIT')
+
+        os.replace(self.legacy_json, self.legacy_json + MIGRATED_SUFFIX)
+        logger.info(
+            f"Migrated {len(legacy.get('artists', {}))} Music Next searches "
+            f"from {os.path.basename(self.legacy_json)} to SQLite"
+        )
+
+    @staticmethod
+    def import_state(conn: sqlite3.Connection, state: dict[str, Any]) -> None:
+        """Insert a music_recommendations.json-shaped dict (inside a transaction)"""
+        now = time.time()
+        for order, (artist_key, data) in enumerate(state.get('artists', {}).items()):
+            conn.execute(
+                'INSERT OR REPLACE INTO searches (artist_key, search_artist, current_index, searched_at) '
+                'VALUES (?, ?, ?, ?)',
+                (
+                    artist_key,
+                    data.get('search_artist', artist_key),
+                    data.get('current_index', 0),
+                    data.get('searched_at', now + order * 1e-6)
+                )
+            )
+            conn.executemany(
+                'INSERT OR IGNORE INTO recommendations (artist_key, artist, rec_order) VALUES (?, ?, ?)',
+                [(artist_key, artist, i) for i, artist in enumerate(data.get('all_recommendations', []))]
+            )
+            conn.executemany(
+                'INSERT INTO recommendations (artist_key, artist, rec_order, queue_pos) '
+                'VALUES (?, ?, (SELECT COUNT(*) FROM recommendations WHERE artist_key = ?), ?) '
+                'ON CONFLICT (artist_key, artist) DO UPDATE SET queue_pos = excluded.queue_pos',
+                [(artist_key, artist, artist_key, i) for i, artist in enumerate(data.get('pending', []))]
+            )
+            conn.executemany(
+                'INSERT OR IGNORE INTO listened (artist_key, artist, listened_order) VALUES (?, ?, ?)',
+                [(artist_key, artist, i) for i, artist in enumerate(data.get('listened', []))]
+            )
+            conn.executemany(
+                'INSERT INTO history (artist_key, idx, artist) VALUES (?, ?, ?)',
+                [(artist_key, i, artist) for i, artist in enumerate(data.get('history', []))]
+            )
+        if state.get('current_search'):
+            conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('current_search', ?)",
+                (state['current_search'],)
+            )
+
+    # -------------------------------------------------------------------------
+    # Write-behind
+    # -------------------------------------------------------------------------
+
+    def _changed(self, artist_key: str) -> None:
+        """Mark a search as needing a flush and wake the flusher (lock held)"""
+        now = time.time()
+        if not self._dirty:
+            self._first_change = now
+        self._dirty.add(artist_key)
+        self._last_change = now
+
+        if self._flusher is None:
+            self._flusher = threading.Thread(target=self._flush_loop, name='music-store-flush', daemon=True)
+            self._flusher.start()
+        self._wake.set()
+
+    def _flush_loop(self) -> None:
+        while True:
+            self._wake.wait()
+            # Debounce: let a burst of clicks settle before writing
+            while True:
+                with self._lock:
+                    now = time.time()
+                    wait = min(
+                        self._last_change + FLUSH_DELAY - now,
+                        self._first_change + FLUSH_MAX_DELAY - now
+                    )
+                if wait <= 0:
+                    break
+                time.sleep(wait)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                logger.warning(f"Music Next state flush failed, will retry: {e}")
+                time.sleep(FLUSH_DELAY)
+                self._wake.set()
+
+    def flush(self) -> int:
+        """Write changed searches to SQLite now; returns how many were written"""
+        # Serialized from snapshot to COMMIT: an older snapshot (e.g. the flush
+        # thread's) must not commit after a newer one (e.g. shutdown's)
+        with self._flush_lock:
+            with self._lock:
+                if not self._dirty:
+                    return 0
+                snapshot = {key: self._artists[key].to_dict() for key in self._dirty if key in self._artists}
+                current_search = self._current_search
+                dirty, self._dirty = self._dirty, set()
+
+            conn = self._conn()
+            try:
+                conn.execute('BEGIN IMMEDIATE')
+                try:
+                    for table in ARTIST_TABLES:
+                        conn.executemany(f'DELETE FROM {table} WHERE artist_key = ?', [(key,) for key in dirty])
+                    self.import_state(conn, {'artists': snapshot, 'current_search': current_search})
+                except BaseException:
+                    conn.execute('ROLLBACK')
+                    raise
+                conn.execute('COMMIT')
+            except Exception:
+                # Keep the searches dirty so the next flush retries them
+                with self._lock:
+                    if not self._dirty:
+                        self._first_change = time.time()
+                    self._dirty |= dirty
+                raise
+
+            with self._lock:
+                self._flushes += 1
+            return len(snapshot)
+
+    def get_status(self) -> dict[str, Any]:
+        """Get loaded searches, unsaved changes and flush count"""
+        with self._lock:
+            return {
+                'loaded': self._artists is not None,
+                'searches': len(self._artists or {}),
+                'unsaved': len(self._dirty),
+                'flushes': self._flushes
+            }
+
+    # -------------------------------------------------------------------------
+    # Operations
+    # -------------------------------------------------------------------------
+
+    def search(self, artist: str, similar_artists: list[str]) -> dict[str, Any]:
+        """Record a search, adding any artists not recommended before to the queue"""
+        artist_key = artist.lower()
+        with self._lock:
+            artists = self._state()
+            data = artists.get(artist_key)
+            if data is None:
+                data = artists[artist_key] = ArtistState(artist)
+                if similar_artists:
+                    data.history.append(similar_artists[0])
+
+            # Re-searches only append artists that are new for this search
+            for artist_name in similar_artists:
+                if artist_name not in data.recommendations:
+                    data.recommendations[artist_name] = None
+                    data.pending[artist_name] = None
+
+            self._current_search = artist_key
+            self._changed(artist_key)
+            return data.response(data.first_pending(), artist)
+
+    def mark_listened(self, artist: str, recommended: str) -> dict[str, Any] | None:
+        """Move a recommendation from pending to listened and advance (None if no such search)"""
+        artist_key = artist.lower()
+        with self._lock:
+            data = self._state().get(artist_key)
+            if data is None:
+                return None
+            if recommended in data.pending:
+                del data.pending[recommended]
+                data.listened[recommended] = None
+            next_rec = data.advance()
+            self._changed(artist_key)
+            return data.response(next_rec, artist)
+
+    def skip(self, artist: str, recommended: str) -> dict[str, Any] | None:
+        """Move a recommendation to the back of the queue and advance (None if no such search)"""
+        artist_key = artist.lower()
+        with self._lock:
+            data = self._state().get(artist_key)
+            if data is None:
+                return None
+            if recommended in data.pending:
+                del data.pending[recommended]
+                data.pending[recommended] = None
+            next_rec = data.advance()
+            self._changed(artist_key)
+            return data.response(next_rec, artist)
+
+    def back(self, artist: str) -> dict[str, Any] | None:
+        """Step back in history (None if no such search)"""
+        artist_key = artist.lower()
+        with self._lock:
+            data = self._state().get(artist_key)
+            if data is None:
+                return None
+            if data.current_index <= 0:
+                raise NoPreviousRecommendation('No previous recommendations to go back to')
+            data.current_index -= 1
+            self._changed(artist_key)
+            return data.response(data.history[data.current_index], artist)
+
+    def current(self) -> dict[str, Any]:
+        """State of the current search ({} if there is none)"""
+        with self._lock:
+            data = self._state().get(self._current_search)
+            if data is None:
+                return {}
+
+            current_rec = data.first_pending()
+            if not data.history and current_rec:
+                # Start history at the head of the queue
+                data.history = [current_rec]
+                data.current_index = 0
+                self._changed(self._current_search)
+            elif data.history and data.current_index < len(data.history):
+                current_rec = data.history[data.current_index]
+            return data.response(current_rec)
+
+    def upcoming(self, artist: str, limit: int) -> list[str]:
+        """Next pending recommendations for a search, queue order"""
+        with self._lock:
+            data = self._state().get(artist.lower())
+            return list(islice(data.pending, limit)) if data is not None else []
+
+    def search_history(self) -> list[str]:
+        """Searched artists, oldest first"""
+        with self._lock:
+            return [data.search_artist for data in self._state().values()]
+
+
+# Global store
+music_store = MusicStore()
@@ -0,0 +1,246 @@
+"""
+Background prefetch scheduler for hot dashboard series
+
+Periodically re-runs the dashboard chart endpoints for the symbols and
+periods the dashboard always asks for, refreshing their cached_swr entries
+shortly before the TTL runs out so users never wait on a cold upstream call
+during market hours. While US markets are closed the stock series barely
+change, so sweeps are spaced out and the next one is timed to finish just
+before the open.
+"""
+from __future__ import annotations
+import random
+import threading
+import time
+from datetime import datetime, time as dt_time, timedelta
+from typing import Any
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+import requests
+
+from utils.api_client import PERIOD_MAP, CIRCUIT_YAHOO, DASHBOARD_SYMBOLS
+from utils.cache import prefetch
+from utils.circuit_breaker import circuit_registry, CircuitState
+from utils.config import get_config_value
+
+# =============================================================================
+# CONSTANTS
+# =============================================================================
+
+PREFETCH_INTERVAL = 30      # Seconds between sweeps
+PREFETCH_JITTER = 5         # Random extra delay per sweep (seconds)
+PREFETCH_LEAD = 45          # Refresh entries this long before their TTL expires
+PREFETCH_MAX_BACKOFF = 600  # Upper bound on the delay after failed sweeps
+PREFETCH_OFF_HOURS_INTERVAL = 600  # Seconds between sweeps while markets are closed
+
+# US regular trading hours (exchange holidays aren't known and count as open)
+MARKET_TIMEZONE = 'America/New_York'
+MARKET_OPEN = dt_time(9, 30)
+MARKET_CLOSE = dt_time(16, 0)
+
+# Chart endpoints that only take a period
+DASHBOARD_PERIOD_ENDPOINTS: tuple[str, ...] = (
+    '/api/currency-data',
+    '/api/gold-data',
+    '/api/xrp-data',
+    '/api/portfolio-value',
+    '/api/cash-assets-value',
+)
+
+# Endpoints that only work once a config value is set: (section, key)
+ENDPOINT_REQUIRED_CONFIG: dict[str, tuple[str, str]] = {
+    '/api/portfolio-value': ('portfolio', 'amzn_shares'),
+    '/api/cash-assets-value': ('portfolio', 'cash_assets_eur'),
+}
+
+
+def _is_configured(endpoint: str) -> bool:
+    """Whether the config value an endpoint depends on is set (and non-zero)"""
+    required = ENDPOINT_REQUIRED_CONFIG.get(endpoint)
+    if required is None:
+        return True
+    section, key = required
+    try:
+        return float((get_config_value(section, {}) or {}).get(key) or 0) != 0
+    except (TypeError, ValueError):
+        return False
+
+
+def _market_now(now: float | None = None) -> datetime | None:
+    """Current time in the market's timezone, or None if tz data is missing"""
+    try:
+        tz = ZoneInfo(MARKET_TIMEZONE)
+    except ZoneInfoNotFoundError:
+        return None
+    return datetime.fromtimestamp(time.time() if now is None else now, tz)
+
+
+def market_is_open(now: float | None = None) -> bool:
+    """Whether it's a weekday between MARKET_OPEN and MARKET_CLOSE (always True without tz data)"""
+    local = _market_now(now)
+    if local is None:
+        return True
+    return local.weekday() < 5 and MARKET_OPEN <= local.time() < MARKET_CLOSE
+
+
+def seconds_until_open(now: float | None = None) -> float:
+    """Seconds until the next market open (0 if open now or tz data is missing)"""
+    local = _market_now(now)
+    if local is None or market_is_open(now):
+        return 0.0
+    for days in range(8):
+        day = local.date() + timedelta(days=days)
+        opens = datetime.combine(day, MARKET_OPEN, local.tzinfo)
+        if day.weekday() < 5 and opens > local:
+            return (opens - local).total_seconds()
+    return 0.0
+
+
+def dashboard_targets() -> list[str]:
+    """
+    Build the (symbol, period) request paths the dashboard charts use,
+    leaving out endpoints whose config isn't set (they can only fail)
+    """
+    endpoints = [endpoint for endpoint in DASHBOARD_PERIOD_ENDPOINTS if _is_configured(endpoint)]
+    targets: list[str] = []
+    for period in PERIOD_MAP:
+        targets.extend(
+            f'/api/stock-data?symbol={symbol}&period={period}'
+            for symbol in DASHBOARD_SYMBOLS
+        )
+        targets.extend(f'{endpoint}?period={period}' for endpoint in endpoints)
+    return targets
+
+
+class PrefetchScheduler:
+    """Daemon thread that keeps cached_swr entries warm"""
+
+    def __init__(
+        self,
+        targets: list[str] | None = None,
+        interval: float = PREFETCH_INTERVAL,
+        jitter: float = PREFETCH_JITTER,
+        lead: int = PREFETCH_LEAD,
+        max_backoff: float = PREFETCH_MAX_BACKOFF,
+        off_hours_interval: float = PREFETCH_OFF_HOURS_INTERVAL,
+        circuit_name: str = CIRCUIT_YAHOO
+    ) -> None:
+        # None: rebuilt from the config at the start of every sweep
+        self.targets = targets
+        self.interval = interval
+        self.off_hours_interval = off_hours_interval
+        self.jitter = jitter
+        self.lead = lead
+        self.max_backoff = max_backoff
+        self.circuit_name = circuit_name
+
+        self._app = None
+        self._thread: threading.Thread | None = None
+        self._stop = threading.Event()
+        self._failed_sweeps = 0
+        self._target_count = 0
+        self._last_sweep: dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def start(self, app) -> None:
+        """Start the scheduler thread for a Flask app"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._app = app
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name='prefetch-scheduler', daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the scheduler thread"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _circuit_status(self) -> dict[str, Any]:
+        return circuit_registry.get(self.circuit_name).get_status()
+
+    def run_once(self) -> dict[str, int]:
+        """
+        Refresh every target that is missing or close to expiry. Failures
+        are also counted as 'upstream' when the upstream circuit recorded
+        an error during the refresh.
+        """
+        counts = {'fresh': 0, 'refreshed': 0, 'failed': 0, 'upstream': 0, 'skipped': 0}
+        targets = list(self.targets) if self.targets is not None else dashboard_targets()
+        with self._lock:
+            self._target_count = len(targets)
+
+        for i, path in enumerate(targets):
+            circuit = self._circuit_status()
+            if self._stop.is_set() or circuit['state'] == CircuitState.OPEN.value:
+                counts['skipped'] += len(targets) - i
+                break
+            try:
+                result = prefetch(self._app, path, self.lead)
+                upstream_error = self._circuit_status()['failure_count'] > circuit['failure_count']
+            except Exception as e:
+                result = 'failed'
+                upstream_error = isinstance(e, requests.exceptions.RequestException)
+                self._app.logger.warning(f"Prefetch failed for {path}: {e}")
+            counts[result] += 1
+            if result == 'failed' and upstream_error:
+                counts['upstream'] += 1
+
+        with self._lock:
+            self._last_sweep = {'finished_at': time.time(), **counts}
+        return counts
+
+    def _next_delay(self, counts: dict[str, int]) -> float:
+        """
+        Work out the wait before the next sweep, backing off only while the
+        upstream is failing (circuit open or upstream errors), so an endpoint
+        that fails on its own doesn't slow down the rest. While markets are
+        closed sweeps are off_hours_interval apart, but the one before the
+        open finishes lead seconds ahead of it.
+        """
+        if counts['upstream'] or counts['skipped']:
+            self._failed_sweeps += 1
+        else:
+            self._failed_sweeps = 0
+
+        delay = min(self.interval * (2 ** self._failed_sweeps), self.max_backoff)
+
+        if not market_is_open():
+            until_open = seconds_until_open() - self.lead
+            delay = max(delay, min(self.off_hours_interval, max(until_open, self.interval)))
+
+        # Don't wake up before an open circuit is due to half-open again
+        recovery_in = self._circuit_status().get('recovery_in_seconds')
+        if recovery_in:
+            delay = max(delay, recovery_in)
+
+        return delay + random.uniform(0, self.jitter)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            counts = self.run_once()
+            if counts['refreshed'] or counts['failed']:
+                self._app.logger.info(
+                    f"Prefetch sweep: {counts['refreshed']} refreshed, "
+                    f"{counts['failed']} failed, {counts['skipped']} skipped"
+                )
+            self._stop.wait(self._next_delay(counts))
+
+    def get_status(self) -> dict[str, Any]:
+        """Get scheduler state and the result of the last sweep"""
+        with self._lock:
+            return {
+                'running': self._thread is not None and self._thread.is_alive(),
+                'targets': self._target_count,
+                'market_open': market_is_open(),
+                'failed_sweeps': self._failed_sweeps,
+                'last_sweep': dict(self._last_sweep)
+            }
+
+
+# Global instance
+prefetch_scheduler = PrefetchScheduler()
@@ -0,0 +1,132 @@
+"""
+Local sunrise/sunset calculator
+
+Implements the NOAA solar position equations (the same ones behind the NOAA
+Solar Calculator spreadsheet), so sun times are computed from lat/lng/date
+without a network round trip. Accurate to about a minute for latitudes
+below the polar circles.
+"""
+from __future__ import annotations
+from datetime import date, datetime, timedelta, timezone
+from functools import lru_cache
+from math import acos, asin, cos, degrees, radians, sin, tan
+from typing import Any
+
+# =============================================================================
+# CONSTANTS
+# =============================================================================
+
+# Solar zenith angles (degrees)
+ZENITH_SUNRISE = 90.833   # Upper limb on the horizon, with refraction
+ZENITH_CIVIL = 96.0       # Civil twilight
+
+# Julian day of 2000-01-01 12:00 UTC (epoch J2000)
+J2000 = 2451545.0
+UNIX_EPOCH_JD = 2440587.5
+
+
+def _julian_day(day: date, minutes: float = 0.0) -> float:
+    """Julian day for a UTC date plus minutes after midnight"""
+    epoch_days = (day - date(1970, 1, 1)).days
+    return UNIX_EPOCH_JD + epoch_days + minutes / 1440
+
+
+def _solar_position(jd: float) -> tuple[float, float]:
+    """Sun declination (degrees) and equation of time (minutes) at a Julian day"""
+    t = (jd - J2000) / 36525  # Julian centuries since J2000
+
+    mean_long = (280.46646 + t * (36000.76983 + t * 0.0003032)) % 360
+    mean_anom = 357.52911 + t * (35999.05029 - 0.0001537 * t)
+    eccent = 0.016708634 - t * (0.000042037 + 0.0000001267 * t)
+
+    m = radians(mean_anom)
+    center = (sin(m) * (1.914602 - t * (0.004817 + 0.000014 * t))
+              + sin(2 * m) * (0.019993 - 0.000101 * t)
+              + sin(3 * m) * 0.000289)
+    omega = radians(125.04 - 1934.136 * t)
+    app_long = radians(mean_long + center - 0.00569 - 0.00478 * sin(omega))
+
+    mean_obliq = 23 + (26 + (21.448 - t * (46.815 + t * (0.00059 - t * 0.001813))) / 60) / 60
+    obliq = radians(mean_obliq + 0.00256 * cos(omega))
+    declination = degrees(asin(sin(obliq) * sin(app_long)))
+
+    y = tan(obliq / 2) ** 2
+    l0 = radians(mean_long)
+    eq_time = 4 * degrees(
+        y * sin(2 * l0)
+        - 2 * eccent * sin(m)
+        + 4 * eccent * y * sin(m) * cos(2 * l0)
+        - 0.5 * y * y * sin(4 * l0)
+        - 1.25 * eccent * eccent * sin(2 * m)
+    )
+    return declination, eq_time
+
+
+def _hour_angle(lat: float, declination: float, zenith: float) -> float | None:
+    """Hour angle (degrees) when the sun reaches zenith, or None if it never does"""
+    lat_r, decl_r = radians(lat), radians(declination)
+    cos_ha = cos(radians(zenith)) / (cos(lat_r) * cos(decl_r)) - tan(lat_r) * tan(decl_r)
+    if not -1 <= cos_ha <= 1:
+        return None
+    return degrees(acos(cos_ha))
+
+
+def _event_minutes(day: date, lat: float, lng: float, zenith: float, rising: bool) -> float | None:
+    """Minutes after UTC midnight of a rise/set event, refined at the event time"""
+    minutes = 720 - 4 * lng
+    for _ in range(2):
+        declination, eq_time = _solar_position(_julian_day(day, minutes))
+        hour_angle = _hour_angle(lat, declination, zenith)
+        if hour_angle is None:
+            return None
+        noon = 720 - 4 * lng - eq_time
+        minutes = noon - 4 * hour_angle if rising else noon + 4 * hour_angle
+    return minutes
+
+
+def _to_datetime(day: date, minutes: float | None) -> datetime | None:
+    if minutes is None:
+        return None
+    midnight = datetime(day.year, day.month, day.day, tzinfo=timezone.utc)
+    return (midnight + timedelta(minutes=minutes)).replace(microsecond=0)
+
+
+def sun_times(lat: float, lng: float, day: date) -> dict[str, datetime | None]:
+    """
+    Sunrise, sunset and civil twilight (UTC datetimes) for a date.
+    Events that don't happen that day (polar day/night) are None.
+    """
+    return {
+        'sunrise': _to_datetime(day, _event_minutes(day, lat, lng, ZENITH_SUNRISE, True)),
+        'sunset': _to_datetime(day, _event_minutes(day, lat, lng, ZENITH_SUNRISE, False)),
+        'civil_twilight_begin': _to_datetime(day, _event_minutes(day, lat, lng, ZENITH_CIVIL, True)),
+        'civil_twilight_end': _to_datetime(day, _event_minutes(day, lat, lng, ZENITH_CIVIL, False))
+    }
+
+
+def day_length(times: dict[str, datetime | None]) -> int:
+    """Seconds between sunrise and sunset (0 if either is missing)"""
+    if times['sunrise'] is None or times['sunset'] is None:
+        return 0
+    return int((times['sunset'] - times['sunrise']).total_seconds())
+
+
+@lru_cache(maxsize=32)
+def sun_times_for_year(lat: float, lng: float, year: int) -> dict[str, list[Any]]:
+    """
+    Sun times for every day of a year as chart columns: dates plus
+    'HH:MM' UTC sunrise, sunset and civil twilight end, and day length
+    in seconds. Cached per (lat, lng, year); round coordinates first.
+    """
+    columns: dict[str, list[Any]] = {
+        'dates': [], 'sunrise': [], 'sunset': [], 'civil_twilight_end': [], 'day_length': []
+    }
+    day = date(year, 1, 1)
+    while day.year == year:
+        times = sun_times(lat, lng, day)
+        columns['dates'].append(day.isoformat())
+        for key in ('sunrise', 'sunset', 'civil_twilight_end'):
+            columns[key].append(times[key].strftime('%H:%M') if times[key] else None)
+        columns['day_length'].append(day_length(times))
+        day += timedelta(days=1)
+    return columns
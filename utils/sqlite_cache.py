@@ -0,0 +1,144 @@
+"""
+SQLite cache backend for Flask-Caching
+Keeps cached values in one SQLite file so they survive restarts and can be
+shared by several worker processes on the same host.
+"""
+from __future__ import annotations
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from typing import Any
+
+from flask_caching.backends.base import BaseCache
+
+# Prune expired/excess rows after this many writes
+PRUNE_EVERY = 100
+
+
+class SQLiteCache(BaseCache):
+    """Flask-Caching backend storing pickled values in a SQLite table"""
+
+    def __init__(
+        self,
+        path: str,
+        default_timeout: int = 300,
+        key_prefix: str = '',
+        threshold: int = 5000,
+        ignore_delete_many_errors: bool = False
+    ) -> None:
+        super().__init__(
+            default_timeout=default_timeout,
+            ignore_delete_many_errors=ignore_delete_many_errors
+        )
+        self.path = path
+        self.key_prefix = key_prefix
+        self.threshold = threshold
+        self._local = threading.local()
+        self._writes = 0
+        self._writes_lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn().execute(
+            'CREATE TABLE IF NOT EXISTS cache ('
+            'key TEXT PRIMARY KEY, value BLOB NOT NULL, expires REAL NOT NULL)'
+        )
+
+    @classmethod
+    def factory(cls, app, config, args, kwargs) -> 'SQLiteCache':
+        kwargs.update(
+            path=config['CACHE_SQLITE_PATH'],
+            key_prefix=config.get('CACHE_KEY_PREFIX') or '',
+            threshold=config['CACHE_THRESHOLD']
+        )
+        return cls(*args, **kwargs)
+
+    def _conn(self) -> sqlite3.Connection:
+        """Get this thread's connection, opening it on first use"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def _expiry(self, timeout: int | None) -> float:
+        timeout = self._normalize_timeout(timeout)
+        return 0 if timeout == 0 else time.time() + timeout
+
+    def _prune(self) -> None:
+        """Drop expired rows, then the soonest-expiring ones above threshold"""
+        conn = self._conn()
+        conn.execute('DELETE FROM cache WHERE expires != 0 AND expires <= ?', (time.time(),))
+        excess = conn.execute('SELECT COUNT(*) FROM cache').fetchone()[0] - self.threshold
+        if excess > 0:
+            conn.execute(
+                'DELETE FROM cache WHERE key IN '
+                '(SELECT key FROM cache ORDER BY expires = 0, expires LIMIT ?)',
+                (excess,)
+            )
+
+    def _after_write(self) -> None:
+        with self._writes_lock:
+            self._writes += 1
+            due = self._writes % PRUNE_EVERY == 0
+        if due:
+            self._prune()
+
+    def get(self, key: str) -> Any:
+        row = self._conn().execute(
+            'SELECT value, expires FROM cache WHERE key = ?', (self.key_prefix + key,)
+        ).fetchone()
+        if row is None:
+            return None
+        value, expires = row
+        if expires != 0 and expires <= time.time():
+            return None
+        try:
+            return pickle.loads(value)
+        except (pickle.PickleError, EOFError, AttributeError, ImportError):
+            return None
+
+    def set(self, key: str, value: Any, timeout: int | None = None) -> bool:
+        self._conn().execute(
+            'INSERT OR REPLACE INTO cache (key, value, expires) VALUES (?, ?, ?)',
+            (self.key_prefix + key, pickle.dumps(value, pickle.HIGHEST_PROTOCOL),
+             self._expiry(timeout))
+        )
+        self._after_write()
+        return True
+
+    def add(self, key: str, value: Any, timeout: int | None = None) -> bool:
+        conn = self._conn()
+        full_key = self.key_prefix + key
+        conn.execute(
+            'DELETE FROM cache WHERE key = ? AND expires != 0 AND expires <= ?',
+            (full_key, time.time())
+        )
+        added = conn.execute(
+            'INSERT OR IGNORE INTO cache (key, value, expires) VALUES (?, ?, ?)',
+            (full_key, pickle.dumps(value, pickle.HIGHEST_PROTOCOL), self._expiry(timeout))
+        ).rowcount == 1
+        if added:
+            self._after_write()
+        return added
+
+    def delete(self, key: str) -> bool:
+        return self._conn().execute(
+            'DELETE FROM cache WHERE key = ?', (self.key_prefix + key,)
+        ).rowcount == 1
+
+    def has(self, key: str) -> bool:
+        return self._conn().execute(
+            'SELECT 1 FROM cache WHERE key = ? AND (expires = 0 OR expires > ?)',
+            (self.key_prefix + key, time.time())
+        ).fetchone() is not None
+
+    def clear(self) -> bool:
+        prefix = self.key_prefix
+        self._conn().execute(
+            'DELETE FROM cache WHERE substr(key, 1, ?) = ?', (len(prefix), prefix)
+        )
+        return True
@@ -0,0 +1,293 @@
+"""
+Compact time-series storage for Yahoo Finance chart data
+
+A PriceSeries keeps timestamps as int64 and closes as float64 in parallel
+arrays with the null bars already masked out, so one parsed series can be
+cached and shared by every endpoint that derives a view from it. Labels are
+only formatted when a response is built.
+"""
+from __future__ import annotations
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from bisect import bisect_left
+from datetime import datetime
+from itertools import compress
+from math import isnan
+from typing import Any, Callable, Iterable
+
+# =============================================================================
+# CONSTANTS
+# =============================================================================
+
+# How long a parsed series is reused, by Yahoo interval (seconds)
+SERIES_TTL: dict[str, int] = {
+    '5m': 60,
+    '1h': 300,
+    '1d': 300,
+    '1wk': 300
+}
+DEFAULT_SERIES_TTL = 300
+
+# Max (symbol, range, interval) series kept; least recently used are evicted.
+# Symbols come from query strings, so this bounds memory for made-up tickers.
+SERIES_MAX_ENTRIES = 256
+
+DAY = 86400
+
+# Bar length by Yahoo interval (seconds)
+INTERVAL_SECONDS: dict[str, int] = {
+    '5m': 300,
+    '1h': 3600,
+    '1d': DAY,
+    '1wk': 7 * DAY
+}
+
+# Ranges refreshed incrementally once cached:
+# (range, interval) -> (range length, bar step) in seconds
+INCREMENTAL_RANGES: dict[tuple[str, str], tuple[int, int]] = {
+    ('1y', '1wk'): (365 * DAY, 7 * DAY),
+    ('1mo', '1d'): (31 * DAY, DAY)
+}
+
+# Series are re-fetched in full this long after their last full fetch, so
+# upstream corrections (splits, revised closes) are eventually picked up
+INCREMENTAL_MAX_AGE = 3 * DAY
+
+
+def format_timestamp(timestamp: int, period: str) -> str:
+    """Format timestamp based on period for chart display"""
+    date_obj = datetime.fromtimestamp(timestamp)
+    if period == '1d':
+        return date_obj.strftime('%H:%M')
+    elif period == '1wk':
+        return date_obj.strftime('%a %H:%M')
+    elif period == '5y':
+        return date_obj.strftime('%b %d %Y')
+    else:
+        return date_obj.strftime('%b %d')
+
+
+# =============================================================================
+# PRICE SERIES
+# =============================================================================
+
+class PriceSeries:
+    """Array-backed (timestamp, close) series with null bars removed"""
+
+    __slots__ = ('symbol', 'timestamps', 'closes')
+
+    def __init__(
+        self,
+        symbol: str,
+        timestamps: Iterable[int] = (),
+        closes: Iterable[float] = ()
+    ) -> None:
+        self.symbol = symbol
+        self.timestamps = timestamps if isinstance(timestamps, array) else array('q', timestamps)
+        self.closes = closes if isinstance(closes, array) else array('d', closes)
+
+    @classmethod
+    def from_yahoo(cls, data: dict[str, Any] | None, symbol: str = '') -> PriceSeries | None:
+        """Build a series from a Yahoo chart response, or None if it has no bars"""
+        if not data or 'chart' not in data or not data['chart']['result']:
+            return None
+
+        result = data['chart']['result'][0]
+        if 'timestamp' not in result or 'indicators' not in result:
+            return None
+        if not result['indicators'].get('quote'):
+            return None
+
+        timestamps = result['timestamp']
+        closes = result['indicators']['quote'][0]['close']
+        mask = [ts is not None and close is not None for ts, close in zip(timestamps, closes)]
+
+        series = cls(
+            symbol or result.get('meta', {}).get('symbol', ''),
+            compress(timestamps, mask),
+            compress(closes, mask)
+        )
+        return series if len(series) else None
+
+    def __len__(self) -> int:
+        return len(self.closes)
+
+    @property
+    def first(self) -> float:
+        return self.closes[0]
+
+    @property
+    def last(self) -> float:
+        return self.closes[-1]
+
+    def change_pct(self) -> float:
+        """Percentage change from the first to the last close"""
+        return ((self.last - self.first) / self.first) * 100
+
+    def map(self, fn: Callable[[float], float]) -> PriceSeries:
+        """New series with fn applied to every close (timestamps shared)"""
+        return PriceSeries(self.symbol, self.timestamps, array('d', map(fn, self.closes)))
+
+    def scale(self, factor: float) -> PriceSeries:
+        """New series with every close multiplied by factor"""
+        return self.map(lambda close: close * factor)
+
+    def merge(self, newer: PriceSeries) -> PriceSeries:
+        """New series with bars from newer's first timestamp onward replaced by newer"""
+        cut = bisect_left(self.timestamps, newer.timestamps[0])
+        return PriceSeries(
+            self.symbol,
+            self.timestamps[:cut] + newer.timestamps,
+            self.closes[:cut] + newer.closes
+        )
+
+    def trim(self, start: int) -> PriceSeries:
+        """New series without the bars before start"""
+        cut = bisect_left(self.timestamps, start)
+        return PriceSeries(self.symbol, self.timestamps[cut:], self.closes[cut:])
+
+    def asof(self, timestamps: Iterable[int], tolerance: int | None = None) -> array:
+        """
+        Closes as of each of the given (sorted) timestamps: the latest bar at
+        or before it (forward-filled), or NaN before the first bar or when that
+        bar is more than tolerance seconds old. Linear in both lengths.
+        """
+        own_ts, closes = self.timestamps, self.closes
+        nan = float('nan')
+        out = array('d')
+        j, n = -1, len(own_ts)
+        for ts in timestamps:
+            while j + 1 < n and own_ts[j + 1] <= ts:
+                j += 1
+            if j < 0 or (tolerance is not None and ts - own_ts[j] > tolerance):
+                out.append(nan)
+            else:
+                out.append(closes[j])
+        return out
+
+    def values(self, digits: int = 2) -> list[float]:
+        """Closes rounded for a JSON response"""
+        return [round(close, digits) for close in self.closes]
+
+    def labels(self, period: str) -> list[str]:
+        """Chart labels for the timestamps"""
+        return [format_timestamp(ts, period) for ts in self.timestamps]
+
+
+# =============================================================================
+# JOINS
+# =============================================================================
+
+def asof_join(
+    base: PriceSeries,
+    *others: PriceSeries,
+    tolerance: int | None = None
+) -> tuple[array, list[array]]:
+    """
+    As-of join of several series onto the base series' timestamps.
+    Each other series contributes its latest close at or before every base
+    bar, no older than tolerance seconds (None = unlimited forward-fill).
+    Base bars that any series can't fill are dropped. Returns the kept
+    timestamps and one close column per series, base first. Runs in
+    linear time over the sorted arrays.
+    """
+    filled = [other.asof(base.timestamps, tolerance) for other in others]
+    if not filled:
+        return base.timestamps, [base.closes]
+
+    mask = [not any(map(isnan, row)) for row in zip(*filled)]
+    return (
+        array('q', compress(base.timestamps, mask)),
+        [array('d', compress(column, mask)) for column in [base.closes, *filled]]
+    )
+
+
+# =============================================================================
+# SERIES CACHE
+# =============================================================================
+
+class SeriesCache:
+    """
+    In-process cache of parsed series keyed by (symbol, range, interval).
+    Each range maps to a single interval in PERIOD_MAP, so this is also a
+    per-(symbol, interval) store. Expired entries can be extended in place
+    until INCREMENTAL_MAX_AGE after their last full fetch. At most
+    max_entries series are kept, evicting the least recently used.
+    """
+
+    def __init__(
+        self,
+        ttls: dict[str, int] | None = None,
+        max_age: int = INCREMENTAL_MAX_AGE,
+        max_entries: int = SERIES_MAX_ENTRIES
+    ) -> None:
+        self.ttls = ttls if ttls is not None else SERIES_TTL
+        self.max_age = max_age
+        self.max_entries = max_entries
+        # key -> (stored_at, last full fetch, series), least recently used first
+        self._entries: OrderedDict[tuple[str, str, str], tuple[float, float, PriceSeries]] = OrderedDict()
+        self._fetches = {'full': 0, 'incremental': 0}
+        self._evictions = 0
+        self._lock = threading.Lock()
+
+    def ttl_for(self, interval: str) -> int:
+        return self.ttls.get(interval, DEFAULT_SERIES_TTL)
+
+    def _lookup(self, key: tuple[str, str, str]) -> tuple[float, float, PriceSeries] | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def get(self, symbol: str, range_param: str, interval: str) -> PriceSeries | None:
+        """Get a cached series if it is still within its TTL"""
+        entry = self._lookup((symbol, range_param, interval))
+        if entry is None or time.time() - entry[0] >= self.ttl_for(interval):
+            return None
+        return entry[2]
+
+    def get_stale(self, symbol: str, range_param: str, interval: str) -> PriceSeries | None:
+        """Get a cached series past its TTL but still young enough to extend"""
+        entry = self._lookup((symbol, range_param, interval))
+        if entry is None or time.time() - entry[1] >= self.max_age:
+            return None
+        return entry[2]
+
+    def put(
+        self,
+        symbol: str,
+        range_param: str,
+        interval: str,
+        series: PriceSeries,
+        incremental: bool = False
+    ) -> None:
+        key = (symbol, range_param, interval)
+        now = time.time()
+        with self._lock:
+            full_at = self._entries[key][1] if incremental and key in self._entries else now
+            self._entries[key] = (now, full_at, series)
+            self._entries.move_to_end(key)
+            self._fetches['incremental' if incremental else 'full'] += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def get_status(self) -> dict[str, Any]:
+        """Get entry count, total bars held and full vs incremental fetches"""
+        with self._lock:
+            entries = list(self._entries.values())
+            fetches = dict(self._fetches)
+            evictions = self._evictions
+        return {
+            'entries': len(entries),
+            'bars': sum(len(entry[2]) for entry in entries),
+            'fetches': fetches,
+            'evictions': evictions
+        }